@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
@@ -8,7 +10,14 @@ from app.api.deps import get_db, get_ingestion_service, get_pull_job_service
 from app.api.route_utils import resolve_subreddit_param
 from app.core.config import get_settings
 from app.models.pull_run import PullRun
-from app.schemas.api import PullJobStatus, PullRunStatusOut, PullStatusOverview, PullSummary, SubredditsResponse
+from app.schemas.api import (
+    PullJobStatus,
+    PullRunStatusOut,
+    PullStatusOverview,
+    PullSubredditProgress,
+    PullSummary,
+    SubredditsResponse,
+)
 from app.services.ingestion_service import IngestionService, PullExecutionResult
 from app.services.pull_job_service import PullJobService
 from app.utils.timezone import utc_now
@@ -148,8 +157,29 @@ def _pull_job_status_from_snapshot(snapshot) -> PullJobStatus:
         current_processed_submissions=snapshot.current_processed_submissions,
         current_phase=snapshot.current_phase,
     )
-    if snapshot.current_subreddit and snapshot.status in {'queued', 'running'} and completed_steps < total_steps_for_progress:
-        progress = min(max((completed_steps + current_subreddit_progress) / total_steps_for_progress, 0.0), 1.0)
+    active_subreddits = [
+        PullSubredditProgress(
+            subreddit=update.subreddit,
+            phase=update.phase,
+            progress=_current_subreddit_progress(
+                current_total_submissions=update.total_submissions,
+                current_processed_submissions=update.processed_submissions,
+                current_phase=update.phase,
+            ),
+            total_submissions=update.total_submissions,
+            processed_submissions=update.processed_submissions,
+            submissions=update.submissions,
+            comments=update.comments,
+            mentions=update.mentions,
+            stance_rows=update.stance_rows,
+            partial_errors=update.partial_errors,
+        )
+        for update in snapshot.active_progress
+    ]
+    if active_subreddits and snapshot.status in {'queued', 'running'} and completed_steps < total_steps_for_progress:
+        # Parallel pulls each contribute their own fraction on top of the finished subreddits.
+        in_flight_progress = sum(row.progress for row in active_subreddits)
+        progress = min(max((completed_steps + in_flight_progress) / total_steps_for_progress, 0.0), 1.0)
     else:
         progress = min(max(completed_steps / total_steps_for_progress, 0.0), 1.0)
 
@@ -174,6 +204,7 @@ def _pull_job_status_from_snapshot(snapshot) -> PullJobStatus:
         current_mentions=snapshot.current_mentions,
         current_stance_rows=snapshot.current_stance_rows,
         current_partial_errors=snapshot.current_partial_errors,
+        active_subreddits=active_subreddits,
         heartbeat_utc=snapshot.heartbeat_utc,
         summaries=[_pull_summary_from_result(row) for row in snapshot.results],
         error=snapshot.error,
@@ -199,6 +230,8 @@ def _current_subreddit_progress(
     return min(max(processed_submissions / total_submissions, 0.0), 1.0)
 
 
+# Job polls map the same finished results on every request; results are frozen, so each maps once.
+@lru_cache(maxsize=256)
 def _pull_summary_from_result(result: PullExecutionResult) -> PullSummary:
     return PullSummary(
         pull_run_id=result.pull_run_id,
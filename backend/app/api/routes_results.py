@@ -232,7 +232,7 @@ def _build_results_from_created_window(
     end_utc_exclusive: datetime,
     selected_subreddit: str | None,
 ) -> list[DailyScoreOut]:
-    submission_query = select(Submission).where(
+    submission_query = select(Submission.id, Submission.score, Submission.created_utc).where(
         Submission.created_utc >= start_utc,
         Submission.created_utc < end_utc_exclusive,
     )
@@ -240,10 +240,13 @@ def _build_results_from_created_window(
         submission_query = submission_query.where(Submission.subreddit == selected_subreddit)
     elif settings.subreddits:
         submission_query = submission_query.where(Submission.subreddit.in_(settings.subreddits))
-    submissions = db.execute(submission_query).scalars().all()
+    submission_meta = {
+        submission_id: (int(score), 0, created_utc)
+        for submission_id, score, created_utc in db.execute(submission_query)
+    }
 
     comment_query = (
-        select(Comment)
+        select(Comment.id, Comment.score, Comment.depth, Comment.created_utc)
         .join(Submission, Submission.id == Comment.submission_id)
         .where(
             Comment.created_utc >= start_utc,
@@ -254,55 +257,44 @@ def _build_results_from_created_window(
         comment_query = comment_query.where(Submission.subreddit == selected_subreddit)
     elif settings.subreddits:
         comment_query = comment_query.where(Submission.subreddit.in_(settings.subreddits))
-    comments = db.execute(comment_query).scalars().all()
+    comment_meta = {
+        comment_id: (int(score), int(depth), created_utc)
+        for comment_id, score, depth, created_utc in db.execute(comment_query)
+    }
 
-    submission_ids = [row.id for row in submissions]
-    comment_ids = [row.id for row in comments]
+    submission_ids = list(submission_meta.keys())
+    comment_ids = list(comment_meta.keys())
     if not submission_ids and not comment_ids:
         return []
 
-    submission_meta = {
-        row.id: {
-            'score': int(row.score),
-            'depth': 0,
-            'created_utc': row.created_utc,
-        }
-        for row in submissions
-    }
-    comment_meta = {
-        row.id: {
-            'score': int(row.score),
-            'depth': int(row.depth),
-            'created_utc': row.created_utc,
-        }
-        for row in comments
-    }
-
-    stance_query = select(Stance).where(
+    stance_query = select(
+        Stance.target_type,
+        Stance.target_id,
+        Stance.ticker,
+        Stance.stance_label,
+        Stance.stance_score,
+    ).where(
         or_(
             and_(Stance.target_type == 'submission', Stance.target_id.in_(submission_ids or ['__none__'])),
             and_(Stance.target_type == 'comment', Stance.target_id.in_(comment_ids or ['__none__'])),
         )
     )
-    stance_rows = db.execute(stance_query).scalars().all()
-    if not stance_rows:
-        return []
 
     records: list[AggregationRecord] = []
-    for stance in stance_rows:
-        meta = submission_meta.get(stance.target_id) if stance.target_type == 'submission' else comment_meta.get(stance.target_id)
+    for target_type, target_id, ticker, stance_label, stance_score in db.execute(stance_query):
+        meta = submission_meta.get(target_id) if target_type == 'submission' else comment_meta.get(target_id)
         if meta is None:
             continue
-        created = meta['created_utc']
+        upvote_score, depth, created = meta
         if created.tzinfo is None:
             created = created.replace(tzinfo=timezone.utc)
         records.append(
             AggregationRecord(
-                ticker=stance.ticker,
-                stance_label=stance.stance_label,
-                stance_score=stance.stance_score,
-                upvote_score=int(meta['score']),
-                depth=int(meta['depth']),
+                ticker=ticker,
+                stance_label=stance_label,
+                stance_score=stance_score,
+                upvote_score=upvote_score,
+                depth=depth,
                 created_utc=created,
             )
         )
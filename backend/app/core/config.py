@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -14,8 +15,12 @@ class Settings(BaseSettings):
 
     app_name: str = 'FinanceSentiment'
     environment: str = 'dev'
+    event_loop: Literal['auto', 'asyncio', 'uvloop'] = 'auto'
 
     database_url: str = 'sqlite:///./backend/data/app.db'
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_recycle_seconds: int = 1800
 
     reddit_use_official_api: bool = True
     reddit_base_url: str = 'https://oauth.reddit.com'
@@ -42,6 +47,8 @@ class Settings(BaseSettings):
     reddit_thread_depth: int = 32
     reddit_morechildren_chunk_size: int = 100
     reddit_morechildren_max_batches: int = 40
+    reddit_cache_max_entries: int = 256
+    reddit_thread_offload_min_comments: int = 500
 
     subreddits_csv: str = 'wallstreetbets,stocks,investing,finance'
     pull_sort: str = 'top'
@@ -49,12 +56,19 @@ class Settings(BaseSettings):
     pull_limit: int = 20
     pull_max_pages: int = 1
     pull_subreddit_pause_seconds: float = 2.0
+    pull_max_parallel_subreddits: int = 1
+    pull_commit_batch_size: int = 25
+    pull_progress_coalesce_interval_ms: int = 200
+    pull_job_retention_seconds: int = 86400
+    pull_job_max_retained: int = 50
 
     enable_external_extraction: bool = False
     extraction_text_cap: int = 50000
+    extraction_max_concurrency: int = 8
 
     download_images: bool = False
     image_max_size_bytes: int = 8_000_000
+    image_download_concurrency: int = 8
 
     use_finbert: bool = False
     use_llm_model: bool = False
@@ -65,6 +79,9 @@ class Settings(BaseSettings):
     llm_max_retries: int = 2
     llm_temperature: float = 0.0
     llm_max_output_tokens: int = 120
+    llm_output_token_limit: int = 8192
+    llm_batch_size: int = 16
+    llm_max_concurrency: int = 4
     llm_unclear_only: bool = True
     llm_low_confidence_threshold: float = 0.65
     llm_enable_sarcasm_trigger: bool = True
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.core.config import Settings
+
+
+def configure_event_loop(settings: Settings) -> str:
+    # Settings only admits auto, asyncio and uvloop, so a mistyped EVENT_LOOP fails at startup instead of meaning auto.
+    mode = settings.event_loop
+    if mode == 'asyncio':
+        return 'asyncio'
+    try:
+        import uvloop
+    except ImportError:
+        if mode == 'uvloop':
+            raise RuntimeError('EVENT_LOOP=uvloop requires the uvloop package')
+        return 'asyncio'
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return 'uvloop'
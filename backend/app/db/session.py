@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any
 
-from sqlalchemy import create_engine
+from sqlalchemy import Connection, create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import get_settings
@@ -13,8 +14,25 @@ database_url = settings.resolved_database_url
 if database_url.startswith('sqlite:///'):
     Path(settings.backend_root / 'data').mkdir(parents=True, exist_ok=True)
 
-engine = create_engine(
-    database_url,
-    connect_args={'check_same_thread': False} if database_url.startswith('sqlite') else {},
-)
+if database_url.startswith('sqlite'):
+    engine = create_engine(database_url, connect_args={'check_same_thread': False})
+
+    # pysqlite skips BEGIN before SAVEPOINT, so releasing a savepoint would commit on its own;
+    # let SQLAlchemy emit BEGIN itself so savepoints nest inside the session's transaction.
+    @event.listens_for(engine, 'connect')
+    def _disable_pysqlite_begin(dbapi_connection: Any, connection_record: Any) -> None:
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def _emit_sqlite_begin(conn: Connection) -> None:
+        conn.exec_driver_sql('BEGIN')
+else:
+    engine = create_engine(
+        database_url,
+        pool_size=max(settings.db_pool_size, 1),
+        max_overflow=max(settings.db_max_overflow, 0),
+        pool_pre_ping=True,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_use_lifo=True,
+    )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def upsert_statement(
+    session: Session,
+    model: type[Any],
+    *,
+    index_elements: list[str],
+    update_columns: tuple[str, ...],
+) -> Any:
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name == 'postgresql':
+        stmt = postgresql.insert(model)
+    elif dialect_name == 'sqlite':
+        stmt = sqlite.insert(model)
+    else:
+        raise RuntimeError(f'upsert is not supported for dialect: {dialect_name}')
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: stmt.excluded[column] for column in update_columns},
+    )
@@ -44,6 +44,19 @@ class PullStatusOverview(BaseModel):
     last_success_by_subreddit: list[PullRunStatusOut]
 
 
+class PullSubredditProgress(BaseModel):
+    subreddit: str
+    phase: str
+    progress: float
+    total_submissions: int | None = None
+    processed_submissions: int = 0
+    submissions: int = 0
+    comments: int = 0
+    mentions: int = 0
+    stance_rows: int = 0
+    partial_errors: int = 0
+
+
 class PullJobStatus(BaseModel):
     job_id: str
     mode: str
@@ -65,6 +78,7 @@ class PullJobStatus(BaseModel):
     current_mentions: int = 0
     current_stance_rows: int = 0
     current_partial_errors: int = 0
+    active_subreddits: list[PullSubredditProgress]
     heartbeat_utc: datetime | None = None
     summaries: list[PullSummary]
     error: str | None = None
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import math
-from collections import defaultdict
-from dataclasses import dataclass
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 
 
@@ -35,8 +35,20 @@ class AggregationMetrics:
     unclear_rate: float
 
 
+@dataclass(slots=True)
+class _TickerAccumulator:
+    mention_count: int = 0
+    bullish_count: int = 0
+    bearish_count: int = 0
+    neutral_count: int = 0
+    unclear_count: int = 0
+    valid_scores: list[float] = field(default_factory=list)
+    weighted_numerator: float = 0.0
+    weighted_denominator: float = 0.0
+
+
 def compute_daily_scores(
-    records: list[AggregationRecord],
+    records: Iterable[AggregationRecord],
     *,
     use_depth_decay: bool,
     lambda_depth: float,
@@ -47,75 +59,115 @@ def compute_daily_scores(
     if reference_time is None:
         reference_time = datetime.now(timezone.utc)
 
-    grouped: dict[str, list[AggregationRecord]] = defaultdict(list)
-    for record in records:
-        grouped[record.ticker].append(record)
+    accumulators: dict[str, _TickerAccumulator] = {}
+    upvote_weights: dict[int, float] = {}
+    for r in records:
+        acc = accumulators.get(r.ticker)
+        if acc is None:
+            acc = accumulators[r.ticker] = _TickerAccumulator()
+        acc.mention_count += 1
+        label = r.stance_label
+        if label == 'UNCLEAR':
+            acc.unclear_count += 1
+            continue
+        if label == 'BULLISH':
+            acc.bullish_count += 1
+        elif label == 'BEARISH':
+            acc.bearish_count += 1
+        elif label == 'NEUTRAL':
+            acc.neutral_count += 1
+        acc.valid_scores.append(r.stance_score)
+
+        upvotes = max(r.upvote_score, 0)
+        weight = upvote_weights.get(upvotes)
+        if weight is None:
+            weight = upvote_weights[upvotes] = math.log(1 + upvotes)
+        if use_depth_decay:
+            weight *= math.exp(-lambda_depth * max(r.depth, 0))
+        if use_time_decay:
+            age_hours = max((reference_time - r.created_utc).total_seconds() / 3600.0, 0.0)
+            weight *= math.exp(-lambda_time * age_hours)
+        acc.weighted_numerator += weight * r.stance_score
+        acc.weighted_denominator += weight
 
     output: dict[str, AggregationMetrics] = {}
-    for ticker, ticker_records in grouped.items():
-        mention_count = len(ticker_records)
-        bullish_count = sum(1 for r in ticker_records if r.stance_label == 'BULLISH')
-        bearish_count = sum(1 for r in ticker_records if r.stance_label == 'BEARISH')
-        neutral_count = sum(1 for r in ticker_records if r.stance_label == 'NEUTRAL')
-        unclear_count = sum(1 for r in ticker_records if r.stance_label == 'UNCLEAR')
-
-        valid = [r for r in ticker_records if r.stance_label != 'UNCLEAR']
+    for ticker, acc in accumulators.items():
+        valid = acc.valid_scores
         valid_count = len(valid)
-        score_sum_unweighted = sum(r.stance_score for r in valid)
-        if valid_count > 0:
-            score_unweighted = score_sum_unweighted / valid_count
-        else:
-            score_unweighted = 0.0
-
-        weighted_numerator = 0.0
-        weighted_denominator = 0.0
-        for r in valid:
-            weight = math.log(1 + max(r.upvote_score, 0))
-            if use_depth_decay:
-                weight *= math.exp(-lambda_depth * max(r.depth, 0))
-            if use_time_decay:
-                age_hours = max((reference_time - r.created_utc).total_seconds() / 3600.0, 0.0)
-                weight *= math.exp(-lambda_time * age_hours)
-            weighted_numerator += weight * r.stance_score
-            weighted_denominator += weight
-
-        if weighted_denominator > 0:
-            score_weighted = weighted_numerator / weighted_denominator
-        else:
-            score_weighted = score_unweighted
-
+        score_sum_unweighted = sum(valid)
+        score_stddev_unweighted = 0.0
         if valid_count > 1:
-            sq = sum((r.stance_score - score_unweighted) ** 2 for r in valid)
+            mean = score_sum_unweighted / valid_count
+            sq = sum((score - mean) ** 2 for score in valid)
             score_stddev_unweighted = math.sqrt(sq / (valid_count - 1))
-            se = score_stddev_unweighted / math.sqrt(valid_count)
-            margin = 1.96 * se
-            ci95_low_unweighted = max(score_unweighted - margin, -1.0)
-            ci95_high_unweighted = min(score_unweighted + margin, 1.0)
-        elif valid_count == 1:
-            score_stddev_unweighted = 0.0
-            ci95_low_unweighted = score_unweighted
-            ci95_high_unweighted = score_unweighted
-        else:
-            score_stddev_unweighted = 0.0
-            ci95_low_unweighted = 0.0
-            ci95_high_unweighted = 0.0
-
-        output[ticker] = AggregationMetrics(
-            score_unweighted=score_unweighted,
-            score_weighted=score_weighted,
-            score_stddev_unweighted=score_stddev_unweighted,
-            ci95_low_unweighted=ci95_low_unweighted,
-            ci95_high_unweighted=ci95_high_unweighted,
+
+        output[ticker] = metrics_from_totals(
+            mention_count=acc.mention_count,
+            bullish_count=acc.bullish_count,
+            bearish_count=acc.bearish_count,
+            neutral_count=acc.neutral_count,
+            unclear_count=acc.unclear_count,
             valid_count=valid_count,
             score_sum_unweighted=score_sum_unweighted,
-            weighted_numerator=weighted_numerator,
-            weighted_denominator=weighted_denominator,
-            mention_count=mention_count,
-            bullish_count=bullish_count,
-            bearish_count=bearish_count,
-            neutral_count=neutral_count,
-            unclear_count=unclear_count,
-            unclear_rate=(unclear_count / mention_count if mention_count else 0.0),
+            score_stddev_unweighted=score_stddev_unweighted,
+            weighted_numerator=acc.weighted_numerator,
+            weighted_denominator=acc.weighted_denominator,
         )
 
     return output
+
+
+def metrics_from_totals(
+    *,
+    mention_count: int,
+    bullish_count: int,
+    bearish_count: int,
+    neutral_count: int,
+    unclear_count: int,
+    valid_count: int,
+    score_sum_unweighted: float,
+    score_stddev_unweighted: float,
+    weighted_numerator: float,
+    weighted_denominator: float,
+) -> AggregationMetrics:
+    if valid_count > 0:
+        score_unweighted = score_sum_unweighted / valid_count
+    else:
+        score_unweighted = 0.0
+
+    if weighted_denominator > 0:
+        score_weighted = weighted_numerator / weighted_denominator
+    else:
+        score_weighted = score_unweighted
+
+    if valid_count > 1:
+        se = score_stddev_unweighted / math.sqrt(valid_count)
+        margin = 1.96 * se
+        ci95_low_unweighted = max(score_unweighted - margin, -1.0)
+        ci95_high_unweighted = min(score_unweighted + margin, 1.0)
+    elif valid_count == 1:
+        score_stddev_unweighted = 0.0
+        ci95_low_unweighted = score_unweighted
+        ci95_high_unweighted = score_unweighted
+    else:
+        score_stddev_unweighted = 0.0
+        ci95_low_unweighted = 0.0
+        ci95_high_unweighted = 0.0
+
+    return AggregationMetrics(
+        score_unweighted=score_unweighted,
+        score_weighted=score_weighted,
+        score_stddev_unweighted=score_stddev_unweighted,
+        ci95_low_unweighted=ci95_low_unweighted,
+        ci95_high_unweighted=ci95_high_unweighted,
+        valid_count=valid_count,
+        score_sum_unweighted=score_sum_unweighted,
+        weighted_numerator=weighted_numerator,
+        weighted_denominator=weighted_denominator,
+        mention_count=mention_count,
+        bullish_count=bullish_count,
+        bearish_count=bearish_count,
+        neutral_count=neutral_count,
+        unclear_count=unclear_count,
+        unclear_rate=(unclear_count / mention_count if mention_count else 0.0),
+    )
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 
-import httpx
-
 from app.core.config import Settings
+from app.utils.http import LoopBoundAsyncClient
 from app.utils.text import clamp_text, normalize_text
 
 
@@ -18,17 +18,28 @@ class ExtractionResult:
 class ExternalExtractor:
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
+        # One pooled client per service: repeat hosts reuse their connection instead of a fresh TCP+TLS handshake.
+        self._http = LoopBoundAsyncClient(
+            name='external extraction',
+            max_keepalive_connections=settings.extraction_max_concurrency,
+            user_agent=settings.reddit_user_agent,
+        )
+
+    async def close(self) -> None:
+        await self._http.aclose()
 
     async def extract(self, url: str) -> ExtractionResult:
-        timeout = httpx.Timeout(connect=3.0, read=8.0, write=8.0, pool=8.0)
+        client = self._http.get()
         try:
-            async with httpx.AsyncClient(timeout=timeout, follow_redirects=True, headers={'User-Agent': self._settings.reddit_user_agent}) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                html = response.text
+            response = await client.get(url)
+            response.raise_for_status()
+            html = response.text
         except Exception:
             return ExtractionResult(title='', text='', status='fetch_failed')
 
+        return await asyncio.to_thread(self._parse_html, html)
+
+    def _parse_html(self, html: str) -> ExtractionResult:
         text = ''
         title = ''
 
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from app.services.stance_model import StanceProbabilities
 
+FINBERT_BATCH_SIZE = 32
+
 
 class FinbertStanceModel:
     model_version = 'finbert-prosusai-v1'
@@ -22,7 +24,15 @@ class FinbertStanceModel:
         )
 
     def predict(self, context_text: str) -> StanceProbabilities:
-        outputs = self._pipeline(context_text[:2048])[0]
+        return self._to_probabilities(self._pipeline(context_text[:2048])[0])
+
+    def predict_batch(self, context_texts: list[str]) -> list[StanceProbabilities]:
+        if not context_texts:
+            return []
+        outputs = self._pipeline([text[:2048] for text in context_texts], batch_size=FINBERT_BATCH_SIZE)
+        return [self._to_probabilities(entry) for entry in outputs]
+
+    def _to_probabilities(self, outputs: list[dict]) -> StanceProbabilities:
         mapped = {'bullish': 0.0, 'bearish': 0.0, 'neutral': 0.0}
         for entry in outputs:
             label = str(entry.get('label', '')).lower()
@@ -8,9 +8,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from urllib.parse import urlparse
 
-import httpx
-
 from app.core.config import Settings
+from app.utils.http import LoopBoundAsyncClient
 
 IMAGE_EXT_RE = re.compile(r'\.(?:jpe?g|png|webp)(?:\?|$)', re.IGNORECASE)
 ALLOWED_TYPES = {'image/jpeg', 'image/png', 'image/webp'}
@@ -32,6 +31,15 @@ class ImageDownloadResult:
 class ImageService:
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
+        # Images mostly come from a couple of Reddit media hosts, so keep warm connections between downloads.
+        self._http = LoopBoundAsyncClient(
+            name='image download',
+            max_keepalive_connections=settings.image_download_concurrency,
+            user_agent=settings.reddit_user_agent,
+        )
+
+    async def close(self) -> None:
+        await self._http.aclose()
 
     def collect_candidates(self, submission_data: dict) -> list[ImageCandidate]:
         seen: set[str] = set()
@@ -71,36 +79,35 @@ class ImageService:
         folder = self._settings.image_root / date_bucket / submission_id
         folder.mkdir(parents=True, exist_ok=True)
 
-        timeout = httpx.Timeout(connect=3.0, read=8.0, write=8.0, pool=8.0)
+        client = self._http.get()
         try:
-            async with httpx.AsyncClient(timeout=timeout, follow_redirects=True, headers={'User-Agent': self._settings.reddit_user_agent}) as client:
-                async with client.stream('GET', url) as resp:
-                    if resp.status_code >= 400:
-                        return ImageDownloadResult(local_path=None, status=f'http_{resp.status_code}')
-
-                    ctype = (resp.headers.get('Content-Type') or '').split(';', 1)[0].strip().lower()
-                    if ctype not in ALLOWED_TYPES:
-                        return ImageDownloadResult(local_path=None, status='content_type_blocked')
-
-                    clen = resp.headers.get('Content-Length')
-                    if clen and int(clen) > self._settings.image_max_size_bytes:
-                        return ImageDownloadResult(local_path=None, status='too_large')
-
-                    ext = _ext_from_content_type(ctype) or _ext_from_url(url)
-                    file_id = hashlib.sha256(url.encode('utf-8')).hexdigest()[:24]
-                    file_name = f'{file_id}{ext}'
-                    target = folder / file_name
-
-                    total = 0
-                    with target.open('wb') as f:
-                        async for chunk in resp.aiter_bytes():
-                            total += len(chunk)
-                            if total > self._settings.image_max_size_bytes:
-                                f.close()
-                                if target.exists():
-                                    os.remove(target)
-                                return ImageDownloadResult(local_path=None, status='too_large')
-                            f.write(chunk)
+            async with client.stream('GET', url) as resp:
+                if resp.status_code >= 400:
+                    return ImageDownloadResult(local_path=None, status=f'http_{resp.status_code}')
+
+                ctype = (resp.headers.get('Content-Type') or '').split(';', 1)[0].strip().lower()
+                if ctype not in ALLOWED_TYPES:
+                    return ImageDownloadResult(local_path=None, status='content_type_blocked')
+
+                clen = resp.headers.get('Content-Length')
+                if clen and int(clen) > self._settings.image_max_size_bytes:
+                    return ImageDownloadResult(local_path=None, status='too_large')
+
+                ext = _ext_from_content_type(ctype) or _ext_from_url(url)
+                file_id = hashlib.sha256(url.encode('utf-8')).hexdigest()[:24]
+                file_name = f'{file_id}{ext}'
+                target = folder / file_name
+
+                total = 0
+                with target.open('wb') as f:
+                    async for chunk in resp.aiter_bytes():
+                        total += len(chunk)
+                        if total > self._settings.image_max_size_bytes:
+                            f.close()
+                            if target.exists():
+                                os.remove(target)
+                            return ImageDownloadResult(local_path=None, status='too_large')
+                        f.write(chunk)
 
             return ImageDownloadResult(local_path=str(target.relative_to(self._settings.repo_root)), status='downloaded')
         except Exception:
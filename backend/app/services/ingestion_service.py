@@ -1,16 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, datetime
+from functools import lru_cache
 import logging
+import math
+import sqlite3
+import threading
+from operator import itemgetter
 import time
-from typing import Callable
-from urllib.parse import urlparse
+from typing import Any, Callable
+from urllib.parse import urlsplit
 
-from sqlalchemy import and_, delete, or_, select
+from sqlalchemy import CTE, ColumnElement, Float, and_, case, cast, delete, extract, func, insert, literal, select, tuple_, union_all
 from sqlalchemy.orm import Session
 
 from app.core.config import Settings
+from app.db.upsert import upsert_statement
 from app.models.comment import Comment
 from app.models.daily_score import DailyScore
 from app.models.external_content import ExternalContent
@@ -20,17 +30,18 @@ from app.models.pull_run import PullRun
 from app.models.stance import Stance
 from app.models.submission import Submission
 from app.schemas.common import TargetType
-from app.services.aggregation_service import AggregationRecord, compute_daily_scores
-from app.services.external_extractor import ExternalExtractor
-from app.services.image_service import ImageService
+from app.schemas.reddit import ParsedComment, ParsedSubmission
+from app.services.aggregation_service import AggregationMetrics, AggregationRecord, compute_daily_scores, metrics_from_totals
+from app.services.external_extractor import ExternalExtractor, ExtractionResult
+from app.services.image_service import ImageDownloadResult, ImageService
 from app.services.reddit_client import RedditClient
 from app.services.reddit_parser import PendingMore, parse_listing_posts, parse_morechildren, parse_thread_with_more
-from app.services.stance_service import StanceService
+from app.services.stance_service import StanceResult, StanceRuntimeMetrics, StanceService, StanceTarget
 from app.services.ticker_extractor import TickerExtractor
 from app.utils.timezone import to_berlin_date, utc_now
 
 
-@dataclass(slots=True)
+@dataclass(frozen=True, slots=True)
 class PullExecutionResult:
     pull_run_id: int
     subreddit: str
@@ -43,7 +54,7 @@ class PullExecutionResult:
     error: str | None = None
 
 
-@dataclass(slots=True)
+@dataclass(frozen=True, slots=True)
 class PullProgressUpdate:
     subreddit: str
     phase: str
@@ -56,9 +67,92 @@ class PullProgressUpdate:
     stance_rows: int
     partial_errors: int
 
+    def __post_init__(self) -> None:
+        # Counts are clamped once here so the job service can store them as-is.
+        for name in _PROGRESS_COUNT_FIELDS:
+            if getattr(self, name) < 0:
+                object.__setattr__(self, name, 0)
+
+
+@dataclass(slots=True)
+class _FetchedSubmission:
+    parsed_submission: ParsedSubmission
+    comments: list[ParsedComment]
+    extraction: ExtractionResult | None = None
+    error: Exception | None = None
+
+
+@dataclass(slots=True)
+class _PreparedSubmission:
+    fetched: _FetchedSubmission
+    mention_rows: list[dict]
+    stance_rows: list[dict]
+    image_rows: list[dict]
+
 
 PullProgressCallback = Callable[[PullProgressUpdate], None]
 LOGGER = logging.getLogger(__name__)
+_PROGRESS_COUNT_FIELDS = (
+    'processed_submissions',
+    'submissions',
+    'comments',
+    'mentions',
+    'stance_rows',
+    'partial_errors',
+)
+SUBMISSION_UPSERT_COLUMNS = (
+    'subreddit',
+    'created_utc',
+    'title',
+    'selftext',
+    'url',
+    'score',
+    'num_comments',
+    'permalink',
+    'pull_run_id',
+)
+COMMENT_UPSERT_COLUMNS = (
+    'submission_id',
+    'parent_id',
+    'depth',
+    'author',
+    'created_utc',
+    'score',
+    'body',
+    'permalink',
+)
+STANCE_YIELD_PER = 2000
+REDDIT_URL_PREFIXES = (
+    'https://www.reddit.com/',
+    'https://old.reddit.com/',
+    'https://reddit.com/',
+    'https://redd.it/',
+    'https://i.redd.it/',
+    'https://v.redd.it/',
+)
+REDDIT_HOSTS = frozenset({'reddit.com', 'redd.it'})
+REDDIT_HOST_SUFFIXES = ('.reddit.com', '.redd.it')
+DAILY_SCORE_COLUMNS = (
+    'date_bucket_berlin',
+    'subreddit',
+    'ticker',
+    'score_unweighted',
+    'score_weighted',
+    'score_stddev_unweighted',
+    'ci95_low_unweighted',
+    'ci95_high_unweighted',
+    'valid_count',
+    'score_sum_unweighted',
+    'weighted_numerator',
+    'weighted_denominator',
+    'mention_count',
+    'bullish_count',
+    'bearish_count',
+    'neutral_count',
+    'unclear_count',
+    'unclear_rate',
+)
+_daily_score_values = itemgetter(*DAILY_SCORE_COLUMNS)
 
 
 class IngestionService:
@@ -68,6 +162,16 @@ class IngestionService:
         self._stance_service = StanceService(settings, self._ticker_extractor)
         self._external_extractor = ExternalExtractor(settings)
         self._image_service = ImageService(settings)
+        self._reddit_client = RedditClient(settings)
+        self._analysis_lock = threading.Lock()
+        # Pulls running on the event loop right now; they share the run and model caches.
+        self._active_pulls = 0
+
+    async def close(self) -> None:
+        await self._reddit_client.close()
+        await self._external_extractor.close()
+        await self._image_service.close()
+        await asyncio.to_thread(self._stance_service.close)
 
     async def pull_subreddit(
         self,
@@ -75,8 +179,7 @@ class IngestionService:
         subreddit: str,
         on_progress: PullProgressCallback | None = None,
     ) -> PullExecutionResult:
-        async with RedditClient(self._settings) as reddit_client:
-            reddit_client.reset_run_cache()
+        async with self._open_pull() as reddit_client:
             return await self._pull_with_client(
                 session=session,
                 subreddit=subreddit,
@@ -86,9 +189,8 @@ class IngestionService:
 
     async def pull_all(self, session: Session) -> list[PullExecutionResult]:
         results: list[PullExecutionResult] = []
-        async with RedditClient(self._settings) as reddit_client:
-            for subreddit in self._settings.subreddits:
-                reddit_client.reset_run_cache()
+        for subreddit in self._settings.subreddits:
+            async with self._open_pull() as reddit_client:
                 results.append(
                     await self._pull_with_client(
                         session=session,
@@ -98,6 +200,19 @@ class IngestionService:
                 )
         return results
 
+    @asynccontextmanager
+    async def _open_pull(self) -> AsyncIterator[RedditClient]:
+        async with self._reddit_client as reddit_client:
+            # Parallel pulls share these caches, so only a pull that starts with none running may clear them.
+            if self._active_pulls == 0:
+                reddit_client.reset_run_cache()
+                self._stance_service.reset_model_cache()
+            self._active_pulls += 1
+            try:
+                yield reddit_client
+            finally:
+                self._active_pulls -= 1
+
     async def _pull_with_client(
         self,
         session: Session,
@@ -105,7 +220,8 @@ class IngestionService:
         reddit_client: RedditClient,
         on_progress: PullProgressCallback | None = None,
     ) -> PullExecutionResult:
-        self._stance_service.reset_runtime_metrics()
+        # Pulls may run concurrently against the shared stance service, so each keeps its own counters.
+        stance_metrics = StanceRuntimeMetrics()
         started_mono = time.perf_counter()
         pulled_at = utc_now()
         date_bucket = to_berlin_date(pulled_at)
@@ -164,82 +280,70 @@ class IngestionService:
                 partial_errors=len(partial_errors),
             )
 
-            for parsed_submission in parsed_submissions:
-                self._emit_progress(
-                    on_progress=on_progress,
-                    subreddit=subreddit,
-                    phase='processing_submission',
-                    total_submissions=total_submissions,
-                    processed_submissions=processed_submissions,
-                    current_submission_id=parsed_submission.id,
-                    submissions=submissions_count,
-                    comments=comments_count,
-                    mentions=mentions_count,
-                    stance_rows=stance_rows_count,
-                    partial_errors=len(partial_errors),
-                )
-                try:
-                    submission = self._upsert_submission(session, parsed_submission, pull_run.id)
-                    submissions_count += 1
-
-                    thread_payload = await reddit_client.get_thread(
-                        parsed_submission.id,
-                        limit=self._settings.reddit_thread_limit,
-                        depth=self._settings.reddit_thread_depth,
-                    )
-                    _, parsed_comments, pending_more = parse_thread_with_more(thread_payload)
-                    parsed_comments = await self._expand_morechildren(
+            existing_comment_ids_by_submission = self._comment_ids_by_submission(
+                session,
+                [parsed.id for parsed in parsed_submissions],
+            )
+            submission_ids_with_images = self._submission_ids_with_images(
+                session,
+                [parsed.id for parsed in parsed_submissions],
+            )
+            commit_batch_size = max(int(self._settings.pull_commit_batch_size), 1)
+            semaphore = asyncio.BoundedSemaphore(max(int(self._settings.reddit_max_concurrency), 1))
+            extraction_semaphore = asyncio.Semaphore(max(int(self._settings.extraction_max_concurrency), 1))
+            thread_limit = self._settings.reddit_thread_limit
+            thread_depth = self._settings.reddit_thread_depth
+            extract_external = self._settings.enable_external_extraction
+            fetch_tasks = [
+                asyncio.create_task(
+                    self._fetch_submission_comments(
                         reddit_client=reddit_client,
-                        submission_id=parsed_submission.id,
-                        initial_comments=parsed_comments,
-                        initial_pending_more=pending_more,
+                        parsed_submission=parsed_submission,
+                        semaphore=semaphore,
+                        thread_limit=thread_limit,
+                        thread_depth=thread_depth,
+                        extraction_semaphore=extraction_semaphore if extract_external else None,
                     )
-                    comments_count += len(parsed_comments)
-
-                    comment_ids = [c.id for c in parsed_comments]
-                    existing_comment_ids = self._comment_ids_for_submission(session, submission.id)
-                    all_comment_ids = sorted(existing_comment_ids.union(comment_ids))
-
-                    self._clear_analysis_rows(session, submission.id, all_comment_ids)
-
-                    stale_comment_ids = sorted(existing_comment_ids.difference(comment_ids))
-                    self._delete_comments(session, stale_comment_ids)
-
-                    parent_lookup = {c.id: c.body for c in parsed_comments}
-                    for parsed_comment in parsed_comments:
-                        self._upsert_comment(session, parsed_comment)
-
-                    submission_mentions, submission_stance = self._analyze_submission(session, submission)
-                    mentions_count += submission_mentions
-                    stance_rows_count += submission_stance
-
-                    comment_mentions, comment_stance = self._analyze_comments(
-                        session=session,
-                        submission=submission,
-                        parsed_comments=parsed_comments,
-                        parent_lookup=parent_lookup,
-                    )
-                    mentions_count += comment_mentions
-                    stance_rows_count += comment_stance
-
-                    if self._settings.enable_external_extraction and self._is_external_url(submission.url):
-                        extraction = await self._external_extractor.extract(submission.url)
-                        self._upsert_external_content(
-                            session=session,
-                            submission_id=submission.id,
-                            url=submission.url,
-                            title=extraction.title,
-                            text=extraction.text,
-                            status=extraction.status,
+                )
+                for parsed_submission in parsed_submissions
+            ]
+            pending: list[_PreparedSubmission] = []
+            try:
+                for next_fetched in asyncio.as_completed(fetch_tasks):
+                    fetched = await next_fetched
+                    parsed_submission = fetched.parsed_submission
+                    try:
+                        if fetched.error is not None:
+                            raise fetched.error
+                        # Inference and image downloads finish before any write, so no transaction waits on them.
+                        pending.append(
+                            await self._prepare_submission(
+                                fetched=fetched,
+                                stance_metrics=stance_metrics,
+                                date_bucket=date_bucket,
+                            )
                         )
-
-                    await self._store_images(session, submission, parsed_submission.raw, str(date_bucket))
-                    session.commit()
-                except Exception as exc:
-                    session.rollback()
-                    partial_errors.append(f'{parsed_submission.id}: {exc}')
-                finally:
+                    except Exception as exc:
+                        partial_errors.append(f'{parsed_submission.id}: {exc}')
                     processed_submissions += 1
+                    if pending and (len(pending) >= commit_batch_size or processed_submissions == total_submissions):
+                        # Fetch tasks never touch the session, so the batch write can leave the event loop.
+                        written, write_errors = await asyncio.to_thread(
+                            self._write_batch,
+                            session=session,
+                            batch=pending,
+                            existing_comment_ids_by_submission=existing_comment_ids_by_submission,
+                            submission_ids_with_images=submission_ids_with_images,
+                            pull_run_id=pull_run.id,
+                        )
+                        pending = []
+                        # Counters only move once the batch is committed, so a failed commit cannot over-report.
+                        submissions_count += len(written)
+                        for comments, mentions, stance_rows in written:
+                            comments_count += comments
+                            mentions_count += mentions
+                            stance_rows_count += stance_rows
+                        partial_errors.extend(write_errors)
                     self._emit_progress(
                         on_progress=on_progress,
                         subreddit=subreddit,
@@ -253,6 +357,10 @@ class IngestionService:
                         stance_rows=stance_rows_count,
                         partial_errors=len(partial_errors),
                     )
+            finally:
+                for task in fetch_tasks:
+                    if not task.done():
+                        task.cancel()
 
             self._emit_progress(
                 on_progress=on_progress,
@@ -267,7 +375,13 @@ class IngestionService:
                 stance_rows=stance_rows_count,
                 partial_errors=len(partial_errors),
             )
-            self._recompute_daily_scores(session=session, date_bucket=date_bucket, subreddit=subreddit)
+            # The recompute is a run of blocking aggregate queries; keep job polls and progress responsive meanwhile.
+            await asyncio.to_thread(
+                self._recompute_daily_scores,
+                session=session,
+                date_bucket=date_bucket,
+                subreddit=subreddit,
+            )
             warning = None
             if partial_errors:
                 warning = f'partial errors: {len(partial_errors)}; sample: ' + ' | '.join(partial_errors[:3])
@@ -299,6 +413,7 @@ class IngestionService:
                 stance_rows=stance_rows_count,
                 partial_errors=len(partial_errors),
                 reddit_client=reddit_client,
+                stance_metrics=stance_metrics,
             )
 
             return PullExecutionResult(
@@ -343,6 +458,7 @@ class IngestionService:
                 stance_rows=stance_rows_count,
                 partial_errors=len(partial_errors),
                 reddit_client=reddit_client,
+                stance_metrics=stance_metrics,
             )
             return PullExecutionResult(
                 pull_run_id=pull_run.id,
@@ -356,87 +472,231 @@ class IngestionService:
                 error=str(exc),
             )
 
-    def _upsert_submission(self, session: Session, parsed_submission, pull_run_id: int) -> Submission:
-        row = session.get(Submission, parsed_submission.id)
-        if row is None:
-            row = Submission(
-                id=parsed_submission.id,
-                subreddit=parsed_submission.subreddit,
-                created_utc=parsed_submission.created_utc,
-                title=parsed_submission.title,
-                selftext=parsed_submission.selftext,
-                url=parsed_submission.url,
-                score=parsed_submission.score,
-                num_comments=parsed_submission.num_comments,
-                permalink=parsed_submission.permalink,
-                pull_run_id=pull_run_id,
+    async def _fetch_submission_comments(
+        self,
+        *,
+        reddit_client: RedditClient,
+        parsed_submission: ParsedSubmission,
+        semaphore: asyncio.Semaphore,
+        thread_limit: int,
+        thread_depth: int,
+        extraction_semaphore: asyncio.Semaphore | None,
+    ) -> _FetchedSubmission:
+        extraction_task: asyncio.Task | None = None
+        if extraction_semaphore is not None and self._is_external_url(parsed_submission.url):
+            # Linked pages are on other hosts, so fetch them alongside the thread instead of after it.
+            extraction_task = asyncio.create_task(
+                self._extract_external(parsed_submission.url, extraction_semaphore)
             )
-            session.add(row)
-            session.flush()
-            return row
-
-        row.subreddit = parsed_submission.subreddit
-        row.created_utc = parsed_submission.created_utc
-        row.title = parsed_submission.title
-        row.selftext = parsed_submission.selftext
-        row.url = parsed_submission.url
-        row.score = parsed_submission.score
-        row.num_comments = parsed_submission.num_comments
-        row.permalink = parsed_submission.permalink
-        row.pull_run_id = pull_run_id
-        session.add(row)
-        session.flush()
-        return row
-
-    def _upsert_comment(self, session: Session, parsed_comment) -> Comment:
-        row = session.get(Comment, parsed_comment.id)
-        if row is None:
-            row = Comment(
-                id=parsed_comment.id,
-                submission_id=parsed_comment.submission_id,
-                parent_id=parsed_comment.parent_id,
-                depth=parsed_comment.depth,
-                author=parsed_comment.author,
-                created_utc=parsed_comment.created_utc,
-                score=parsed_comment.score,
-                body=parsed_comment.body,
-                permalink=parsed_comment.permalink,
+        try:
+            # The semaphore gates Reddit requests only; parsing runs outside it so waiting fetches start sooner.
+            async with semaphore:
+                thread_payload = await reddit_client.get_thread(
+                    parsed_submission.id,
+                    limit=thread_limit,
+                    depth=thread_depth,
+                )
+            _, parsed_comments, pending_more = parse_thread_with_more(thread_payload)
+            parsed_comments = await self._expand_morechildren(
+                reddit_client=reddit_client,
+                submission_id=parsed_submission.id,
+                initial_comments=parsed_comments,
+                initial_pending_more=pending_more,
+                semaphore=semaphore,
             )
-            session.add(row)
-            return row
-
-        row.submission_id = parsed_comment.submission_id
-        row.parent_id = parsed_comment.parent_id
-        row.depth = parsed_comment.depth
-        row.author = parsed_comment.author
-        row.created_utc = parsed_comment.created_utc
-        row.score = parsed_comment.score
-        row.body = parsed_comment.body
-        row.permalink = parsed_comment.permalink
-        session.add(row)
-        return row
+            extraction = await extraction_task if extraction_task is not None else None
+        except Exception as exc:
+            return _FetchedSubmission(parsed_submission=parsed_submission, comments=[], error=exc)
+        finally:
+            if extraction_task is not None and not extraction_task.done():
+                extraction_task.cancel()
+        return _FetchedSubmission(parsed_submission=parsed_submission, comments=parsed_comments, extraction=extraction)
 
-    def _clear_analysis_rows(self, session: Session, submission_id: str, comment_ids: list[str]) -> None:
+    async def _extract_external(self, url: str, semaphore: asyncio.Semaphore) -> ExtractionResult:
+        async with semaphore:
+            return await self._external_extractor.extract(url)
+
+    async def _prepare_submission(
+        self,
+        *,
+        fetched: _FetchedSubmission,
+        stance_metrics: StanceRuntimeMetrics,
+        date_bucket: date,
+    ) -> _PreparedSubmission:
+        submission = fetched.parsed_submission
+        (mention_rows, stance_rows), image_rows = await asyncio.gather(
+            self._analyze_thread(
+                submission=submission,
+                parsed_comments=fetched.comments,
+                stance_metrics=stance_metrics,
+            ),
+            self._download_images(submission, submission.raw, str(date_bucket)),
+        )
+        return _PreparedSubmission(
+            fetched=fetched,
+            mention_rows=mention_rows,
+            stance_rows=stance_rows,
+            image_rows=image_rows,
+        )
+
+    def _write_batch(
+        self,
+        *,
+        session: Session,
+        batch: list[_PreparedSubmission],
+        existing_comment_ids_by_submission: dict[str, set[str]],
+        submission_ids_with_images: set[str],
+        pull_run_id: int,
+    ) -> tuple[list[tuple[int, int, int]], list[str]]:
+        written: list[tuple[int, int, int]] = []
+        errors: list[str] = []
+        for prepared in batch:
+            submission_id = prepared.fetched.parsed_submission.id
+            try:
+                # A savepoint per submission keeps failures isolated while commits are batched.
+                with session.begin_nested():
+                    written.append(
+                        self._write_submission(
+                            session=session,
+                            prepared=prepared,
+                            existing_comment_ids=existing_comment_ids_by_submission.get(submission_id, set()),
+                            has_existing_images=submission_id in submission_ids_with_images,
+                            pull_run_id=pull_run_id,
+                        )
+                    )
+            except Exception as exc:
+                errors.append(f'{submission_id}: {exc}')
+        session.commit()
+        return written, errors
+
+    def _write_submission(
+        self,
+        *,
+        session: Session,
+        prepared: _PreparedSubmission,
+        existing_comment_ids: set[str],
+        has_existing_images: bool,
+        pull_run_id: int,
+    ) -> tuple[int, int, int]:
+        submission = prepared.fetched.parsed_submission
+        parsed_comments = prepared.fetched.comments
+        self._upsert_submission(session, submission, pull_run_id)
+
+        comment_ids = [c.id for c in parsed_comments]
+        all_comment_ids = list(existing_comment_ids.union(comment_ids))
+
+        self._clear_analysis_rows(session, submission.id, all_comment_ids)
+
+        stale_comment_ids = list(existing_comment_ids.difference(comment_ids))
+        self._delete_comments(session, stale_comment_ids)
+
+        self._upsert_comments(session, parsed_comments)
+        self._insert_analysis_rows(session, prepared.mention_rows, prepared.stance_rows)
+
+        extraction = prepared.fetched.extraction
+        if extraction is not None:
+            self._upsert_external_content(
+                session=session,
+                submission_id=submission.id,
+                url=submission.url,
+                title=extraction.title,
+                text=extraction.text,
+                status=extraction.status,
+            )
+
+        self._store_images(
+            session,
+            submission.id,
+            prepared.image_rows,
+            has_existing_images=has_existing_images,
+        )
+        return len(parsed_comments), len(prepared.mention_rows), len(prepared.stance_rows)
+
+    def _upsert_submission(self, session: Session, parsed_submission: ParsedSubmission, pull_run_id: int) -> None:
+        stmt = upsert_statement(
+            session,
+            Submission,
+            index_elements=['id'],
+            update_columns=SUBMISSION_UPSERT_COLUMNS,
+        )
         session.execute(
-            delete(Mention).where(and_(Mention.target_type == 'submission', Mention.target_id == submission_id))
+            stmt,
+            [
+                {
+                    'id': parsed_submission.id,
+                    'subreddit': parsed_submission.subreddit,
+                    'created_utc': parsed_submission.created_utc,
+                    'title': parsed_submission.title,
+                    'selftext': parsed_submission.selftext,
+                    'url': parsed_submission.url,
+                    'score': parsed_submission.score,
+                    'num_comments': parsed_submission.num_comments,
+                    'permalink': parsed_submission.permalink,
+                    'pull_run_id': pull_run_id,
+                }
+            ],
+        )
+
+    def _upsert_comments(self, session: Session, parsed_comments: list[ParsedComment]) -> None:
+        if not parsed_comments:
+            return
+        stmt = upsert_statement(
+            session,
+            Comment,
+            index_elements=['id'],
+            update_columns=COMMENT_UPSERT_COLUMNS,
         )
         session.execute(
-            delete(Stance).where(and_(Stance.target_type == 'submission', Stance.target_id == submission_id))
+            stmt,
+            [
+                {
+                    'id': c.id,
+                    'submission_id': c.submission_id,
+                    'parent_id': c.parent_id,
+                    'depth': c.depth,
+                    'author': c.author,
+                    'created_utc': c.created_utc,
+                    'score': c.score,
+                    'body': c.body,
+                    'permalink': c.permalink,
+                }
+                for c in parsed_comments
+            ],
         )
 
-        if comment_ids:
-            session.execute(
-                delete(Mention).where(and_(Mention.target_type == 'comment', Mention.target_id.in_(comment_ids)))
-            )
-            session.execute(
-                delete(Stance).where(and_(Stance.target_type == 'comment', Stance.target_id.in_(comment_ids)))
-            )
+    def _analyze_batch(
+        self,
+        targets: list[StanceTarget],
+        stance_metrics: StanceRuntimeMetrics | None,
+    ) -> list[list[StanceResult]]:
+        # The stance models keep per-call state (LLM usage, prediction cache), so concurrent pulls take turns.
+        with self._analysis_lock:
+            return self._stance_service.analyze_batch(targets, stance_metrics)
+
+    def _clear_analysis_rows(self, session: Session, submission_id: str, comment_ids: list[str]) -> None:
+        targets = [('submission', submission_id)] + [('comment', comment_id) for comment_id in comment_ids]
+        for model in (Mention, Stance):
+            session.execute(delete(model).where(tuple_(model.target_type, model.target_id).in_(targets)))
 
-    def _comment_ids_for_submission(self, session: Session, submission_id: str) -> set[str]:
+    def _comment_ids_by_submission(self, session: Session, submission_ids: list[str]) -> dict[str, set[str]]:
+        out: dict[str, set[str]] = defaultdict(set)
+        if not submission_ids:
+            return out
         rows = session.execute(
-            select(Comment.id).where(Comment.submission_id == submission_id)
-        ).scalars().all()
-        return set(rows)
+            select(Comment.submission_id, Comment.id).where(Comment.submission_id.in_(submission_ids))
+        ).all()
+        for submission_id, comment_id in rows:
+            out[submission_id].add(comment_id)
+        return out
+
+    def _submission_ids_with_images(self, session: Session, submission_ids: list[str]) -> set[str]:
+        if not submission_ids:
+            return set()
+        return set(
+            session.execute(
+                select(Image.submission_id).where(Image.submission_id.in_(submission_ids)).distinct()
+            ).scalars()
+        )
 
     def _delete_comments(self, session: Session, comment_ids: list[str]) -> None:
         if not comment_ids:
@@ -445,92 +705,73 @@ class IngestionService:
             delete(Comment).where(Comment.id.in_(comment_ids))
         )
 
-    def _analyze_submission(self, session: Session, submission: Submission) -> tuple[int, int]:
-        mentions_count = 0
-        stance_count = 0
-        text = f'{submission.title}\n{submission.selftext}'.strip()
-
-        results = self._stance_service.analyze_target(
-            target_type=TargetType.submission,
-            text=text,
-            title=submission.title,
-            selftext=submission.selftext,
-            parent_text='',
-        )
-        for r in results:
-            session.add(
-                Mention(
-                    target_type='submission',
-                    target_id=submission.id,
-                    ticker=r.mention.ticker,
-                    confidence=r.mention.confidence,
-                    source=r.mention.source,
-                    span_start=r.mention.span_start,
-                    span_end=r.mention.span_end,
-                )
-            )
-            session.add(
-                Stance(
-                    target_type='submission',
-                    target_id=submission.id,
-                    ticker=r.mention.ticker,
-                    stance_label=r.label.value,
-                    stance_score=r.score,
-                    confidence=r.confidence,
-                    model_version=r.model_version,
-                    context_text=r.context_text,
-                )
-            )
-            mentions_count += 1
-            stance_count += 1
-        return mentions_count, stance_count
-
-    def _analyze_comments(
+    async def _analyze_thread(
         self,
-        session: Session,
-        submission: Submission,
-        parsed_comments: list,
-        parent_lookup: dict[str, str],
-    ) -> tuple[int, int]:
-        mentions_count = 0
-        stance_count = 0
-
-        for c in parsed_comments:
-            parent_text = parent_lookup.get(c.parent_id or '', '')
-            results = self._stance_service.analyze_target(
+        submission: ParsedSubmission,
+        parsed_comments: list[ParsedComment],
+        stance_metrics: StanceRuntimeMetrics | None = None,
+    ) -> tuple[list[dict], list[dict]]:
+        body_by_id = {c.id: c.body for c in parsed_comments}
+        targets = [
+            StanceTarget(
+                target_type=TargetType.submission,
+                text=f'{submission.title}\n{submission.selftext}'.strip(),
+                title=submission.title,
+                selftext=submission.selftext,
+                parent_text='',
+            )
+        ]
+        targets.extend(
+            StanceTarget(
                 target_type=TargetType.comment,
                 text=c.body,
                 title=submission.title,
                 selftext=submission.selftext,
-                parent_text=parent_text,
+                parent_text=body_by_id[c.parent_id] if c.parent_id in body_by_id else '',
             )
+            for c in parsed_comments
+        )
+        # Model inference (and LLM HTTP calls) block, so run them off the event loop while other threads keep fetching.
+        batch_results = await asyncio.to_thread(self._analyze_batch, targets, stance_metrics)
+
+        target_keys = [('submission', submission.id)] + [('comment', c.id) for c in parsed_comments]
+        mention_rows: list[dict] = []
+        stance_rows: list[dict] = []
+        for (target_type, target_id), results in zip(target_keys, batch_results):
             for r in results:
-                session.add(
-                    Mention(
-                        target_type='comment',
-                        target_id=c.id,
-                        ticker=r.mention.ticker,
-                        confidence=r.mention.confidence,
-                        source=r.mention.source,
-                        span_start=r.mention.span_start,
-                        span_end=r.mention.span_end,
-                    )
-                )
-                session.add(
-                    Stance(
-                        target_type='comment',
-                        target_id=c.id,
-                        ticker=r.mention.ticker,
-                        stance_label=r.label.value,
-                        stance_score=r.score,
-                        confidence=r.confidence,
-                        model_version=r.model_version,
-                        context_text=r.context_text,
-                    )
-                )
-                mentions_count += 1
-                stance_count += 1
-        return mentions_count, stance_count
+                mention_rows.append(self._mention_row(target_type, target_id, r))
+                stance_rows.append(self._stance_row(target_type, target_id, r))
+        return mention_rows, stance_rows
+
+    def _mention_row(self, target_type: str, target_id: str, result: StanceResult) -> dict:
+        return {
+            'target_type': target_type,
+            'target_id': target_id,
+            'ticker': result.mention.ticker,
+            'confidence': result.mention.confidence,
+            'source': result.mention.source,
+            'span_start': result.mention.span_start,
+            'span_end': result.mention.span_end,
+        }
+
+    def _stance_row(self, target_type: str, target_id: str, result: StanceResult) -> dict:
+        return {
+            'target_type': target_type,
+            'target_id': target_id,
+            'ticker': result.mention.ticker,
+            'stance_label': result.label.value,
+            'stance_score': result.score,
+            'confidence': result.confidence,
+            'model_version': result.model_version,
+            'context_text': result.context_text,
+        }
+
+    def _insert_analysis_rows(self, session: Session, mention_rows: list[dict], stance_rows: list[dict]) -> None:
+        # Core executemany lets SQLAlchemy batch these into multi-row VALUES statements.
+        if mention_rows:
+            session.execute(insert(Mention), mention_rows)
+        if stance_rows:
+            session.execute(insert(Stance), stance_rows)
 
     def _upsert_external_content(
         self,
@@ -541,109 +782,134 @@ class IngestionService:
         text: str,
         status: str,
     ) -> None:
-        row = session.execute(
-            select(ExternalContent).where(ExternalContent.submission_id == submission_id)
-        ).scalar_one_or_none()
-        if row is None:
-            row = ExternalContent(
-                submission_id=submission_id,
-                external_url=url,
-                title=title,
-                text=text,
-                status=status,
-                fetched_at=utc_now(),
-            )
-        else:
-            row.external_url = url
-            row.title = title
-            row.text = text
-            row.status = status
-            row.fetched_at = utc_now()
-        session.add(row)
-
-    async def _store_images(self, session: Session, submission: Submission, raw_submission: dict, date_bucket: str) -> None:
+        stmt = upsert_statement(
+            session,
+            ExternalContent,
+            index_elements=['submission_id'],
+            update_columns=('external_url', 'title', 'text', 'status', 'fetched_at'),
+        )
         session.execute(
-            delete(Image).where(Image.submission_id == submission.id)
+            stmt,
+            [
+                {
+                    'submission_id': submission_id,
+                    'external_url': url,
+                    'title': title,
+                    'text': text,
+                    'status': status,
+                    'fetched_at': utc_now(),
+                }
+            ],
         )
 
+    async def _download_images(
+        self,
+        submission: ParsedSubmission,
+        raw_submission: dict,
+        date_bucket: str,
+    ) -> list[dict]:
         candidates = self._image_service.collect_candidates(raw_submission)
         if not candidates:
-            return
-
-        for candidate in candidates:
-            download = await self._image_service.download_if_enabled(candidate.url, date_bucket, submission.id)
-            session.add(
-                Image(
-                    submission_id=submission.id,
-                    image_url=candidate.url,
-                    local_path=download.local_path,
-                    width=candidate.width,
-                    height=candidate.height,
-                    status=download.status,
-                )
+            return []
+
+        semaphore = asyncio.Semaphore(max(int(self._settings.image_download_concurrency), 1))
+
+        async def download(url: str) -> ImageDownloadResult:
+            async with semaphore:
+                return await self._image_service.download_if_enabled(url, date_bucket, submission.id)
+
+        downloads = await asyncio.gather(*(download(candidate.url) for candidate in candidates))
+        return [
+            {
+                'submission_id': submission.id,
+                'image_url': candidate.url,
+                'local_path': result.local_path,
+                'width': candidate.width,
+                'height': candidate.height,
+                'status': result.status,
+            }
+            for candidate, result in zip(candidates, downloads)
+        ]
+
+    def _store_images(
+        self,
+        session: Session,
+        submission_id: str,
+        image_rows: list[dict],
+        *,
+        has_existing_images: bool = True,
+    ) -> None:
+        if has_existing_images:
+            session.execute(
+                delete(Image).where(Image.submission_id == submission_id)
             )
+        if image_rows:
+            session.execute(insert(Image), image_rows)
 
     def _recompute_daily_scores(self, session: Session, date_bucket: date, subreddit: str) -> None:
-        submissions = session.execute(
-            select(Submission)
+        bucket_scope = (PullRun.date_bucket_berlin == date_bucket, PullRun.subreddit == subreddit)
+        has_submissions = session.execute(
+            select(Submission.id)
             .join(PullRun, PullRun.id == Submission.pull_run_id)
-            .where(PullRun.date_bucket_berlin == date_bucket, PullRun.subreddit == subreddit)
-        ).scalars().all()
-
-        submission_ids = [s.id for s in submissions]
-        if not submission_ids:
+            .where(*bucket_scope)
+            .limit(1)
+        ).first()
+        if has_submissions is None:
             return
 
-        comments = session.execute(
-            select(Comment).where(Comment.submission_id.in_(submission_ids))
-        ).scalars().all()
-
-        submission_meta = {
-            s.id: {'score': s.score, 'depth': 0, 'created_utc': s.created_utc}
-            for s in submissions
-        }
-        comment_meta = {
-            c.id: {'score': c.score, 'depth': c.depth, 'created_utc': c.created_utc}
-            for c in comments
-        }
-
-        comment_ids = list(comment_meta.keys())
-        stance_rows = session.execute(
-            select(Stance).where(
-                or_(
-                    and_(Stance.target_type == 'submission', Stance.target_id.in_(submission_ids)),
-                    and_(Stance.target_type == 'comment', Stance.target_id.in_(comment_ids or ['__none__'])),
-                )
+        # Stance rows are joined to their submission or comment in SQL so the records come back ready to aggregate.
+        submission_stances = (
+            select(
+                Stance.ticker,
+                Stance.stance_label,
+                Stance.stance_score,
+                Submission.score.label('upvote_score'),
+                literal(0).label('depth'),
+                Submission.created_utc,
             )
-        ).scalars().all()
-
-        records: list[AggregationRecord] = []
-        for stance in stance_rows:
-            if stance.target_type == 'submission':
-                meta = submission_meta.get(stance.target_id)
-            else:
-                meta = comment_meta.get(stance.target_id)
-            if not meta:
-                continue
-            records.append(
-                AggregationRecord(
-                    ticker=stance.ticker,
-                    stance_label=stance.stance_label,
-                    stance_score=stance.stance_score,
-                    upvote_score=int(meta['score']),
-                    depth=int(meta['depth']),
-                    created_utc=meta['created_utc'],
-                )
+            .join(Submission, and_(Stance.target_type == 'submission', Stance.target_id == Submission.id))
+            .join(PullRun, PullRun.id == Submission.pull_run_id)
+            .where(*bucket_scope)
+        )
+        comment_stances = (
+            select(
+                Stance.ticker,
+                Stance.stance_label,
+                Stance.stance_score,
+                Comment.score.label('upvote_score'),
+                Comment.depth,
+                Comment.created_utc,
             )
-
-        metrics_by_ticker = compute_daily_scores(
-            records,
-            use_depth_decay=self._settings.use_depth_decay,
-            lambda_depth=self._settings.lambda_depth,
-            use_time_decay=self._settings.use_time_decay,
-            lambda_time=self._settings.lambda_time,
-            reference_time=utc_now(),
+            .join(Comment, and_(Stance.target_type == 'comment', Stance.target_id == Comment.id))
+            .join(Submission, Submission.id == Comment.submission_id)
+            .join(PullRun, PullRun.id == Submission.pull_run_id)
+            .where(*bucket_scope)
         )
+        merged = union_all(submission_stances, comment_stances)
+        reference_time = utc_now()
+
+        if self._supports_sql_aggregation(session):
+            metrics_by_ticker = self._aggregate_daily_scores_in_sql(session, merged.cte('merged_stances'), reference_time)
+        else:
+            rows = session.execute(merged.execution_options(yield_per=STANCE_YIELD_PER))
+            metrics_by_ticker = compute_daily_scores(
+                (
+                    AggregationRecord(
+                        ticker=ticker,
+                        stance_label=stance_label,
+                        stance_score=stance_score,
+                        upvote_score=int(upvote_score),
+                        depth=int(depth),
+                        created_utc=created_utc,
+                    )
+                    for ticker, stance_label, stance_score, upvote_score, depth, created_utc in rows
+                ),
+                use_depth_decay=self._settings.use_depth_decay,
+                lambda_depth=self._settings.lambda_depth,
+                use_time_decay=self._settings.use_time_decay,
+                lambda_time=self._settings.lambda_time,
+                reference_time=reference_time,
+            )
 
         session.execute(
             delete(DailyScore).where(
@@ -654,29 +920,137 @@ class IngestionService:
             )
         )
 
-        for ticker, metrics in metrics_by_ticker.items():
-            session.add(
-                DailyScore(
-                    date_bucket_berlin=date_bucket,
-                    subreddit=subreddit,
-                    ticker=ticker,
-                    score_unweighted=metrics.score_unweighted,
-                    score_weighted=metrics.score_weighted,
-                    score_stddev_unweighted=metrics.score_stddev_unweighted,
-                    ci95_low_unweighted=metrics.ci95_low_unweighted,
-                    ci95_high_unweighted=metrics.ci95_high_unweighted,
-                    valid_count=metrics.valid_count,
-                    score_sum_unweighted=metrics.score_sum_unweighted,
-                    weighted_numerator=metrics.weighted_numerator,
-                    weighted_denominator=metrics.weighted_denominator,
-                    mention_count=metrics.mention_count,
-                    bullish_count=metrics.bullish_count,
-                    bearish_count=metrics.bearish_count,
-                    neutral_count=metrics.neutral_count,
-                    unclear_count=metrics.unclear_count,
-                    unclear_rate=metrics.unclear_rate,
-                )
+        score_rows = [
+            {
+                'date_bucket_berlin': date_bucket,
+                'subreddit': subreddit,
+                'ticker': ticker,
+                'score_unweighted': metrics.score_unweighted,
+                'score_weighted': metrics.score_weighted,
+                'score_stddev_unweighted': metrics.score_stddev_unweighted,
+                'ci95_low_unweighted': metrics.ci95_low_unweighted,
+                'ci95_high_unweighted': metrics.ci95_high_unweighted,
+                'valid_count': metrics.valid_count,
+                'score_sum_unweighted': metrics.score_sum_unweighted,
+                'weighted_numerator': metrics.weighted_numerator,
+                'weighted_denominator': metrics.weighted_denominator,
+                'mention_count': metrics.mention_count,
+                'bullish_count': metrics.bullish_count,
+                'bearish_count': metrics.bearish_count,
+                'neutral_count': metrics.neutral_count,
+                'unclear_count': metrics.unclear_count,
+                'unclear_rate': metrics.unclear_rate,
+            }
+            for ticker, metrics in metrics_by_ticker.items()
+        ]
+        self._insert_daily_scores(session, score_rows)
+
+    def _supports_sql_aggregation(self, session: Session) -> bool:
+        dialect_name = session.get_bind().dialect.name
+        if dialect_name == 'postgresql':
+            return True
+        if dialect_name == 'sqlite':
+            return _sqlite_has_math_functions()
+        return False
+
+    def _aggregate_daily_scores_in_sql(
+        self,
+        session: Session,
+        merged: CTE,
+        reference_time: datetime,
+    ) -> dict[str, AggregationMetrics]:
+        valid = merged.c.stance_label != 'UNCLEAR'
+        score = merged.c.stance_score
+        upvotes = case((merged.c.upvote_score > 0, merged.c.upvote_score), else_=0)
+        weight = func.ln(cast(1 + upvotes, Float))
+        if self._settings.use_depth_decay:
+            depth = case((merged.c.depth > 0, merged.c.depth), else_=0)
+            weight = weight * func.exp(-float(self._settings.lambda_depth) * depth)
+        if self._settings.use_time_decay:
+            age_hours = (literal(reference_time.timestamp()) - cast(extract('epoch', merged.c.created_utc), Float)) / 3600.0
+            weight = weight * func.exp(-float(self._settings.lambda_time) * case((age_hours > 0, age_hours), else_=0.0))
+
+        def count_where(condition: ColumnElement[bool]) -> ColumnElement[Any]:
+            return func.sum(case((condition, 1), else_=0))
+
+        def sum_valid(value: ColumnElement[Any]) -> ColumnElement[Any]:
+            return func.sum(case((valid, value), else_=0.0))
+
+        # Two passes like compute_daily_scores: per-ticker means first, then squared deviations from them.
+        # A one-pass sum of squares cancels catastrophically when scores cluster away from zero.
+        means = (
+            select(merged.c.ticker, func.avg(case((valid, score), else_=None)).label('mean_score'))
+            .group_by(merged.c.ticker)
+            .subquery()
+        )
+        deviation = score - means.c.mean_score
+
+        rows = session.execute(
+            select(
+                merged.c.ticker,
+                func.count(),
+                count_where(merged.c.stance_label == 'BULLISH'),
+                count_where(merged.c.stance_label == 'BEARISH'),
+                count_where(merged.c.stance_label == 'NEUTRAL'),
+                count_where(merged.c.stance_label == 'UNCLEAR'),
+                count_where(valid),
+                sum_valid(score),
+                sum_valid(deviation * deviation),
+                sum_valid(weight * score),
+                sum_valid(weight),
             )
+            .select_from(merged.join(means, means.c.ticker == merged.c.ticker))
+            .group_by(merged.c.ticker)
+        )
+
+        metrics_by_ticker: dict[str, AggregationMetrics] = {}
+        for (
+            ticker,
+            mention_count,
+            bullish_count,
+            bearish_count,
+            neutral_count,
+            unclear_count,
+            valid_count,
+            score_sum,
+            squared_deviation_sum,
+            weighted_numerator,
+            weighted_denominator,
+        ) in rows:
+            valid_count = int(valid_count)
+            score_sum = float(score_sum)
+            score_stddev = 0.0
+            if valid_count > 1:
+                score_stddev = math.sqrt(max(float(squared_deviation_sum), 0.0) / (valid_count - 1))
+            metrics_by_ticker[ticker] = metrics_from_totals(
+                mention_count=int(mention_count),
+                bullish_count=int(bullish_count),
+                bearish_count=int(bearish_count),
+                neutral_count=int(neutral_count),
+                unclear_count=int(unclear_count),
+                valid_count=valid_count,
+                score_sum_unweighted=score_sum,
+                score_stddev_unweighted=score_stddev,
+                weighted_numerator=float(weighted_numerator),
+                weighted_denominator=float(weighted_denominator),
+            )
+        return metrics_by_ticker
+
+    def _insert_daily_scores(self, session: Session, rows: list[dict]) -> None:
+        if not rows:
+            return
+
+        dialect = session.get_bind().dialect
+        if dialect.name == 'postgresql' and dialect.driver == 'psycopg':
+            columns = ', '.join(DAILY_SCORE_COLUMNS)
+            raw_connection = session.connection().connection
+            with raw_connection.cursor() as cursor:
+                with cursor.copy(f'COPY daily_scores ({columns}) FROM STDIN') as copy:
+                    for row in rows:
+                        copy.write_row(_daily_score_values(row))
+            return
+
+        session.execute(insert(DailyScore), rows)
 
     async def _fetch_listing_posts(
         self,
@@ -689,32 +1063,45 @@ class IngestionService:
 
         submissions: list = []
         seen_submission_ids: set[str] = set()
-        after: str | None = None
 
-        for _ in range(max_pages):
-            try:
-                listing_payload = await reddit_client.get_top_listing(
+        def request_page(after: str | None) -> asyncio.Task:
+            return asyncio.create_task(
+                reddit_client.get_top_listing(
                     subreddit=subreddit,
                     sort=self._settings.pull_sort,
                     t_param=self._settings.pull_t_param,
                     limit=page_limit,
                     after=after,
                 )
-            except Exception:
-                if submissions:
+            )
+
+        page_task: asyncio.Task | None = request_page(None)
+        try:
+            for page_idx in range(max_pages):
+                if page_task is None:
                     break
-                raise
-            parsed_page = parse_listing_posts(listing_payload)
-            for parsed in parsed_page:
-                if parsed.id in seen_submission_ids:
-                    continue
-                seen_submission_ids.add(parsed.id)
-                submissions.append(parsed)
-
-            next_after = listing_payload.get('data', {}).get('after') if isinstance(listing_payload, dict) else None
-            if not next_after:
-                break
-            after = str(next_after)
+                try:
+                    listing_payload = await page_task
+                except Exception:
+                    if submissions:
+                        break
+                    raise
+                page_task = None
+
+                next_after = listing_payload.get('data', {}).get('after') if isinstance(listing_payload, dict) else None
+                if next_after and page_idx + 1 < max_pages:
+                    # Start the next page request before parsing this one so the two overlap.
+                    page_task = request_page(str(next_after))
+
+                parsed_page = parse_listing_posts(listing_payload)
+                for parsed in parsed_page:
+                    if parsed.id in seen_submission_ids:
+                        continue
+                    seen_submission_ids.add(parsed.id)
+                    submissions.append(parsed)
+        finally:
+            if page_task is not None and not page_task.done():
+                page_task.cancel()
 
         return submissions
 
@@ -766,8 +1153,8 @@ class IngestionService:
         stance_rows: int,
         partial_errors: int,
         reddit_client: RedditClient,
+        stance_metrics: StanceRuntimeMetrics,
     ) -> None:
-        stance_metrics = self._stance_service.get_runtime_metrics()
         limits = reddit_client.get_rate_limit_snapshot()
         if limits is None:
             LOGGER.info(
@@ -813,10 +1200,7 @@ class IngestionService:
         )
 
     def _is_external_url(self, url: str) -> bool:
-        host = urlparse(url).netloc.lower()
-        if not host:
-            return False
-        return 'reddit.com' not in host and 'redd.it' not in host
+        return _url_is_external(url)
 
     async def _expand_morechildren(
         self,
@@ -824,6 +1208,7 @@ class IngestionService:
         submission_id: str,
         initial_comments: list,
         initial_pending_more: list[PendingMore],
+        semaphore: asyncio.Semaphore | None = None,
     ) -> list:
         if not initial_pending_more:
             return initial_comments
@@ -842,9 +1227,18 @@ class IngestionService:
             if not unresolved:
                 continue
 
-            for chunk in self._chunked(unresolved, self._settings.reddit_morechildren_chunk_size):
+            chunks = self._chunked(unresolved, self._settings.reddit_morechildren_chunk_size)
+            if not unlimited_batches:
+                chunks = chunks[:max_batches - api_calls]
+            # Chunks of one MoreComments node are independent, so fetch them together and merge in request order.
+            payloads = await asyncio.gather(
+                *(self._fetch_morechildren_chunk(reddit_client, submission_id, chunk, semaphore) for chunk in chunks)
+            )
+            for chunk in chunks:
                 requested_ids.update(chunk)
-                payload = await reddit_client.get_morechildren(post_id=submission_id, children=chunk)
+            api_calls += len(chunks)
+
+            for payload in payloads:
                 parsed_comments, extra_pending = parse_morechildren(
                     payload,
                     submission_id=submission_id,
@@ -860,12 +1254,44 @@ class IngestionService:
                         parent_depths[parsed.id] = parsed.depth
 
                 queue.extend(extra_pending)
-                api_calls += 1
-                if not unlimited_batches and api_calls >= max_batches:
-                    break
 
         return sorted(comments_by_id.values(), key=lambda c: (c.depth, c.created_utc))
 
+    async def _fetch_morechildren_chunk(
+        self,
+        reddit_client: RedditClient,
+        submission_id: str,
+        chunk: list[str],
+        semaphore: asyncio.Semaphore | None,
+    ) -> dict:
+        if semaphore is None:
+            return await reddit_client.get_morechildren(post_id=submission_id, children=chunk)
+        async with semaphore:
+            return await reddit_client.get_morechildren(post_id=submission_id, children=chunk)
+
     def _chunked(self, items: list[str], size: int) -> list[list[str]]:
         chunk_size = max(size, 1)
         return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+@lru_cache(maxsize=4096)
+def _url_is_external(url: str) -> bool:
+    if url.startswith(REDDIT_URL_PREFIXES):
+        return False
+    host = urlsplit(url).hostname
+    if not host:
+        return False
+    return host not in REDDIT_HOSTS and not host.endswith(REDDIT_HOST_SUFFIXES)
+
+
+@lru_cache(maxsize=1)
+def _sqlite_has_math_functions() -> bool:
+    # exp/ln are only available when SQLite is built with math functions.
+    connection = sqlite3.connect(':memory:')
+    try:
+        connection.execute('SELECT exp(0.0), ln(1.0)')
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import hashlib
 import json
 import logging
+import random
 import re
 import time
-from typing import Any
+from typing import Any, Callable, TypeVar
 
 import httpx
 
@@ -12,6 +18,67 @@ from app.core.config import Settings
 from app.services.stance_model import StanceProbabilities
 
 LOGGER = logging.getLogger(__name__)
+T = TypeVar('T')
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRY_AFTER_SECONDS = 30.0
+LLM_CACHE_SIZE = 2048
+EMPTY_USAGE: dict[str, int | None] = {'prompt_tokens': 0, 'output_tokens': 0, 'total_tokens': 0}
+STANCE_LABELS = ['BULLISH', 'BEARISH', 'NEUTRAL', 'UNCLEAR']
+SYSTEM_PROMPT_TEMPLATE = (
+    'Du bist ein Finanz-Experte fuer Social Media Sentiment. '
+    'Analysiere den folgenden Kommentar im Kontext des Titels (/vorherigen Kommentars). '
+    'Ist die Haltung gegenueber dem Ticker {ticker} BULLISH, BEARISH oder NEUTRAL? '
+    'Achte besonders auf Sarkasmus (z.B. WallStreetBets-Slang). '
+    'Antworte nur mit JSON.'
+)
+USER_PROMPT_PREFIX = (
+    'Nutze nur diese JSON-Struktur:\n'
+    '{"label":"BULLISH|BEARISH|NEUTRAL|UNCLEAR","confidence":0.0-1.0}\n\n'
+    'Kontext:\n'
+)
+RESPONSE_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'label': {'type': 'string', 'enum': STANCE_LABELS},
+        'confidence': {'type': 'number'},
+    },
+    'required': ['label'],
+}
+BATCH_SYSTEM_INSTRUCTION = {
+    'parts': [
+        {
+            'text': (
+                'Du bist ein Finanz-Experte fuer Social Media Sentiment. '
+                'Analysiere jeden der folgenden nummerierten Kontexte im Kontext des Titels (/vorherigen Kommentars). '
+                'Ist die Haltung gegenueber dem jeweils unter TICKER genannten Ticker BULLISH, BEARISH oder NEUTRAL? '
+                'Achte besonders auf Sarkasmus (z.B. WallStreetBets-Slang). '
+                'Antworte nur mit JSON.'
+            )
+        }
+    ],
+}
+BATCH_USER_PROMPT_PREFIX = (
+    'Nutze nur diese JSON-Struktur mit genau einem Eintrag pro Kontext:\n'
+    '{"items":[{"index":0,"label":"BULLISH|BEARISH|NEUTRAL|UNCLEAR","confidence":0.0-1.0}]}\n\n'
+)
+BATCH_RESPONSE_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'items': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'index': {'type': 'integer'},
+                    'label': {'type': 'string', 'enum': STANCE_LABELS},
+                    'confidence': {'type': 'number'},
+                },
+                'required': ['index', 'label'],
+            },
+        },
+    },
+    'required': ['items'],
+}
 TICKER_RE = re.compile(r'\bTICKER:\s*([A-Z][A-Z\.]{0,5})\b')
 
 
@@ -29,13 +96,38 @@ class LLMStanceModel:
         self._max_retries = max(int(settings.llm_max_retries), 0)
         self._temperature = max(float(settings.llm_temperature), 0.0)
         self._max_output_tokens = max(int(settings.llm_max_output_tokens), 32)
+        self._output_token_limit = max(int(settings.llm_output_token_limit), self._max_output_tokens)
+        # A chunk must fit every item's answer into the model's output limit, or the tail gets truncated away.
+        self._batch_size = max(min(int(settings.llm_batch_size), self._output_token_limit // self._max_output_tokens), 1)
+        self._max_concurrency = max(int(settings.llm_max_concurrency), 1)
         self._timeout_seconds = max(float(settings.llm_timeout_seconds), 1.0)
+        # Base delay before jitter for each retry attempt, capped at 6s.
+        self._backoff_delays = tuple(min(1.5 * (1 << attempt), 6.0) for attempt in range(self._max_retries + 1))
         self.model_version = f'gemini-{self._model}'
+        # Parsed once; httpx reuses a URL instance as-is instead of re-parsing the string on every post.
+        self._endpoint = httpx.URL(f'{self._base_url}/models/{self._model}:generateContent')
+        self._generation_config = {
+            'temperature': self._temperature,
+            'maxOutputTokens': self._max_output_tokens,
+            'responseMimeType': 'application/json',
+            'responseJsonSchema': RESPONSE_SCHEMA,
+        }
+        self._batch_generation_config = {
+            'temperature': self._temperature,
+            'responseMimeType': 'application/json',
+            'responseJsonSchema': BATCH_RESPONSE_SCHEMA,
+        }
         self._last_usage: dict[str, int | None] = {
             'prompt_tokens': None,
             'output_tokens': None,
             'total_tokens': None,
         }
+        self._cache: OrderedDict[bytes, StanceProbabilities] = OrderedDict()
+        # Chunk requests fan out over one pool for the model's lifetime; shut down in close().
+        # A thread pool rather than httpx.AsyncClient: predict_batch runs inside StanceService.analyze_batch,
+        # which ingestion already calls off the event loop via asyncio.to_thread, so there is no loop to await on.
+        # HTTP/2 would need the optional h2 package, which requirements.txt does not pull in.
+        self._executor = ThreadPoolExecutor(max_workers=self._max_concurrency, thread_name_prefix='llm-stance')
 
         self._client = httpx.Client(
             timeout=httpx.Timeout(
@@ -44,80 +136,212 @@ class LLMStanceModel:
                 write=min(self._timeout_seconds, 10.0),
                 pool=min(self._timeout_seconds, 10.0),
             ),
+            limits=httpx.Limits(
+                max_connections=self._max_concurrency,
+                max_keepalive_connections=self._max_concurrency,
+            ),
             headers={
                 'Content-Type': 'application/json',
                 'x-goog-api-key': self._api_key,
             },
         )
 
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._client.close()
+
+    def reset_cache(self) -> None:
+        # Swap rather than clear so an analysis thread still holding the old cache never sees it mutate underneath.
+        self._cache = OrderedDict()
+
     def predict(self, context_text: str) -> StanceProbabilities:
-        ticker = self._extract_ticker(context_text)
-        system_prompt = (
-            'Du bist ein Finanz-Experte fuer Social Media Sentiment. '
-            f'Analysiere den folgenden Kommentar im Kontext des Titels (/vorherigen Kommentars). '
-            f'Ist die Haltung gegenueber dem Ticker {ticker} BULLISH, BEARISH oder NEUTRAL? '
-            'Achte besonders auf Sarkasmus (z.B. WallStreetBets-Slang). '
-            'Antworte nur mit JSON.'
-        )
-        user_prompt = (
-            'Nutze nur diese JSON-Struktur:\n'
-            '{"label":"BULLISH|BEARISH|NEUTRAL|UNCLEAR","confidence":0.0-1.0}\n\n'
-            'Kontext:\n'
-            f'{context_text[:4000]}'
-        )
+        key = _context_key(context_text)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self._last_usage = dict(EMPTY_USAGE)
+            return cached.copy()
+        probs = self._predict_uncached(context_text)
+        self._cache_put(key, probs)
+        return probs
+
+    def _predict_uncached(self, context_text: str) -> StanceProbabilities:
+        usage, probs = self._request_single(context_text)
+        self._last_usage = usage
+        return probs
 
+    def _request_single(self, context_text: str) -> tuple[dict[str, int | None], StanceProbabilities]:
+        ticker = self._extract_ticker(context_text)
         payload = {
             'systemInstruction': {
-                'parts': [{'text': system_prompt}],
+                'parts': [{'text': SYSTEM_PROMPT_TEMPLATE.format(ticker=ticker)}],
             },
             'contents': [
                 {
                     'role': 'user',
-                    'parts': [{'text': user_prompt}],
+                    'parts': [{'text': USER_PROMPT_PREFIX + context_text[:4000]}],
+                }
+            ],
+            'generationConfig': self._generation_config,
+        }
+
+        response_payload, probs = self._generate(payload, self._parse_response_to_probs)
+        return self._extract_usage(response_payload), probs
+
+    def predict_batch(self, context_texts: list[str]) -> list[StanceProbabilities | None]:
+        # None marks a context the model never answered, even when asked on its own; callers keep their base label.
+        keys = [_context_key(context_text) for context_text in context_texts]
+        resolved: dict[bytes, StanceProbabilities | None] = {}
+        pending: dict[bytes, str] = {}
+        for key, context_text in zip(keys, context_texts):
+            if key in resolved or key in pending:
+                continue
+            cached = self._cache_get(key)
+            if cached is not None:
+                resolved[key] = cached
+            else:
+                pending[key] = context_text
+
+        if not pending:
+            self._last_usage = dict(EMPTY_USAGE)
+        elif len(pending) == 1:
+            [(key, context_text)] = pending.items()
+            try:
+                resolved[key] = self._predict_uncached(context_text)
+            except RuntimeError as exc:
+                # Only this context goes unanswered; the ones served from the cache still come back.
+                LOGGER.warning('LLM stance request failed for one uncached context: %s', exc)
+                self._last_usage = dict(EMPTY_USAGE)
+                resolved[key] = None
+        else:
+            resolved.update(zip(pending, self._predict_many(list(pending.values()))))
+        for key in pending:
+            probs = resolved[key]
+            if probs is not None:
+                self._cache_put(key, probs)
+        return [_copy_probs(resolved[key]) for key in keys]
+
+    def _predict_many(self, context_texts: list[str]) -> list[StanceProbabilities | None]:
+        chunks = [
+            context_texts[start:start + self._batch_size]
+            for start in range(0, len(context_texts), self._batch_size)
+        ]
+        if len(chunks) == 1:
+            chunk_results = [self._predict_chunk(chunks[0])]
+        else:
+            # httpx.Client is thread-safe, so chunks share its keep-alive pool while in flight together.
+            chunk_results = list(self._executor.map(self._predict_chunk, chunks))
+
+        self._last_usage = _sum_usage([usage for usage, _ in chunk_results])
+        return [probs for _, chunk_probs in chunk_results for probs in chunk_probs]
+
+    def _cache_get(self, key: bytes) -> StanceProbabilities | None:
+        cache = self._cache
+        probs = cache.get(key)
+        if probs is not None:
+            cache.move_to_end(key)
+        return probs
+
+    def _cache_put(self, key: bytes, probs: StanceProbabilities) -> None:
+        cache = self._cache
+        cache[key] = probs
+        cache.move_to_end(key)
+        while len(cache) > LLM_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    def _predict_chunk(
+        self,
+        context_texts: list[str],
+    ) -> tuple[dict[str, int | None], list[StanceProbabilities | None]]:
+        try:
+            response_payload, by_index = self._generate(
+                self._build_batch_payload(context_texts),
+                lambda payload: self._parse_batch_response_to_probs(payload, len(context_texts)),
+            )
+        except RuntimeError as exc:
+            # A chunk that exhausted its retries must not take the answers of its sibling chunks down with it.
+            LOGGER.warning('LLM stance request failed for a batch of %d contexts: %s', len(context_texts), exc)
+            return dict(EMPTY_USAGE), [None] * len(context_texts)
+        usages = [self._extract_usage(response_payload)]
+        probs: list[StanceProbabilities | None] = [by_index.get(idx) for idx in range(len(context_texts))]
+        missing = [idx for idx, item in enumerate(probs) if item is None]
+        if missing:
+            # Keep the answered items and ask for the skipped ones individually instead of redoing the whole chunk.
+            LOGGER.info('Gemini batch output covered %d of %d items; re-requesting the rest', len(by_index), len(probs))
+        for idx in missing:
+            try:
+                usage, probs[idx] = self._request_single(context_texts[idx])
+            except RuntimeError as exc:
+                LOGGER.warning('LLM stance request failed for a skipped batch item: %s', exc)
+                continue
+            usages.append(usage)
+        return _sum_usage(usages), probs
+
+    def _build_batch_payload(self, context_texts: list[str]) -> dict[str, Any]:
+        contexts = '\n\n'.join(
+            f'Kontext {idx}:\n{context_text[:4000]}'
+            for idx, context_text in enumerate(context_texts)
+        )
+        return {
+            'systemInstruction': BATCH_SYSTEM_INSTRUCTION,
+            'contents': [
+                {
+                    'role': 'user',
+                    'parts': [{'text': BATCH_USER_PROMPT_PREFIX + contexts}],
                 }
             ],
             'generationConfig': {
-                'temperature': self._temperature,
-                'maxOutputTokens': self._max_output_tokens,
-                'responseMimeType': 'application/json',
-                'responseJsonSchema': {
-                    'type': 'object',
-                    'properties': {
-                        'label': {
-                            'type': 'string',
-                            'enum': ['BULLISH', 'BEARISH', 'NEUTRAL', 'UNCLEAR'],
-                        },
-                        'confidence': {'type': 'number'},
-                    },
-                    'required': ['label'],
-                },
+                **self._batch_generation_config,
+                'maxOutputTokens': min(self._max_output_tokens * len(context_texts), self._output_token_limit),
             },
         }
 
-        endpoint = f'{self._base_url}/models/{self._model}:generateContent'
+    def _generate(
+        self,
+        payload: dict[str, Any],
+        parse: Callable[[dict[str, Any]], T],
+    ) -> tuple[dict[str, Any], T]:
+        # Serialize once; retries resend the same bytes.
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        # Failed statuses are kept as plain ints; an exception is only built once, for the final error.
         last_error: Exception | None = None
+        last_status: int | None = None
         for attempt in range(self._max_retries + 1):
+            retry_after: float | None = None
             try:
-                response = self._client.post(endpoint, json=payload)
-                response.raise_for_status()
-                response_payload = response.json()
-                self._last_usage = self._extract_usage(response_payload)
-                return self._parse_response_to_probs(response_payload)
-            except (httpx.HTTPError, ValueError, KeyError, json.JSONDecodeError) as exc:
-                last_error = exc
-                if attempt >= self._max_retries:
-                    break
-                delay = min(1.5 * (2 ** attempt), 6.0)
-                time.sleep(delay)
-
-        detail = str(last_error) if last_error is not None else 'unknown llm error'
+                response = self._client.post(self._endpoint, content=body)
+            except httpx.HTTPError as exc:
+                last_error, last_status = exc, None
+            else:
+                status = response.status_code
+                if response.is_success:
+                    try:
+                        response_payload = response.json()
+                        return response_payload, parse(response_payload)
+                    except (ValueError, KeyError) as exc:
+                        last_error, last_status = exc, None
+                else:
+                    last_error, last_status = None, status
+                    if status not in RETRYABLE_STATUS_CODES:
+                        break
+                    retry_after = _parse_retry_after(response.headers.get('retry-after'))
+            if attempt >= self._max_retries:
+                break
+            delay = retry_after if retry_after is not None else self._backoff_delays[attempt]
+            time.sleep(delay * (1.0 + 0.3 * random.random()))
+
+        if last_status is not None:
+            detail = f'HTTP {last_status} from {self._endpoint}'
+        else:
+            detail = str(last_error) if last_error is not None else 'unknown llm error'
         raise RuntimeError(f'Gemini stance request failed: {detail}')
 
     def get_last_usage(self) -> dict[str, int | None]:
         return dict(self._last_usage)
 
     def _extract_ticker(self, context_text: str) -> str:
-        match = TICKER_RE.search(context_text)
+        # StanceService appends the ticker line last, so anchor there instead of scanning the whole context.
+        start = context_text.rfind('TICKER:')
+        match = TICKER_RE.match(context_text, start) if start >= 0 else None
         if match:
             return match.group(1)
         return 'UNKNOWN'
@@ -134,6 +358,26 @@ class LLMStanceModel:
             raise ValueError(f'invalid label from Gemini: {label}')
         return _label_to_probabilities(label=label, confidence=confidence)
 
+    def _parse_batch_response_to_probs(self, payload: dict[str, Any], count: int) -> dict[int, StanceProbabilities]:
+        text = self._extract_text(payload)
+        if not text:
+            raise ValueError('Gemini response did not include text output')
+
+        items = self._parse_json_text(text).get('items')
+        if not isinstance(items, list):
+            raise ValueError('Gemini batch output has no items list')
+
+        by_index: dict[int, StanceProbabilities] = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            index = _to_int(item.get('index'))
+            label = str(item.get('label', '')).upper().strip()
+            if index is None or index >= count or label not in {'BULLISH', 'BEARISH', 'NEUTRAL', 'UNCLEAR'}:
+                continue
+            by_index[index] = _label_to_probabilities(label=label, confidence=_coerce_confidence(item.get('confidence')))
+        return by_index
+
     def _extract_text(self, payload: dict[str, Any]) -> str:
         candidates = payload.get('candidates', [])
         if isinstance(candidates, list):
@@ -190,6 +434,30 @@ class LLMStanceModel:
         }
 
 
+def _context_key(context_text: str) -> bytes:
+    return hashlib.blake2b(context_text.encode('utf-8'), digest_size=16).digest()
+
+
+def _copy_probs(probs: StanceProbabilities | None) -> StanceProbabilities | None:
+    return probs.copy() if probs is not None else None
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER_SECONDS)
+
+
 def _coerce_confidence(value: Any) -> float:
     if value is None:
         return 0.75
@@ -204,6 +472,14 @@ def _coerce_confidence(value: Any) -> float:
     return conf
 
 
+def _sum_usage(usages: list[dict[str, int | None]]) -> dict[str, int | None]:
+    out: dict[str, int | None] = {}
+    for key in ('prompt_tokens', 'output_tokens', 'total_tokens'):
+        values = [value for usage in usages if (value := usage.get(key)) is not None]
+        out[key] = sum(values) if values else None
+    return out
+
+
 def _to_int(value: Any) -> int | None:
     if value is None:
         return None
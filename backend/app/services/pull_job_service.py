@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass, field
-from datetime import datetime, timezone
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
 from threading import Lock
+from typing import Any
 from uuid import uuid4
 
 from app.core.config import Settings
@@ -12,33 +14,8 @@ from app.services.ingestion_service import IngestionService, PullExecutionResult
 from app.utils.timezone import to_berlin_date, utc_now
 
 
-@dataclass(slots=True)
+@dataclass(frozen=True, slots=True)
 class PullJobSnapshot:
-    job_id: str
-    mode: str
-    requested_subreddit: str | None
-    status: str
-    started_at_utc: datetime
-    finished_at_utc: datetime | None
-    total_steps: int
-    completed_steps: int
-    current_subreddit: str | None
-    current_phase: str | None
-    current_total_submissions: int | None
-    current_processed_submissions: int
-    current_submission_id: str | None
-    current_submissions: int
-    current_comments: int
-    current_mentions: int
-    current_stance_rows: int
-    current_partial_errors: int
-    heartbeat_utc: datetime | None
-    results: list[PullExecutionResult]
-    error: str | None
-
-
-@dataclass(slots=True)
-class _PullJobState:
     job_id: str
     mode: str
     requested_subreddit: str | None
@@ -57,49 +34,40 @@ class _PullJobState:
     current_mentions: int = 0
     current_stance_rows: int = 0
     current_partial_errors: int = 0
-    heartbeat_utc: datetime | None = None
-    results: list[PullExecutionResult] = field(default_factory=list)
+    # Latest update of every subreddit still being pulled; current_* mirror the one in current_subreddit.
+    active_progress: tuple[PullProgressUpdate, ...] = ()
+    heartbeat_epoch: float | None = None
+    results: tuple[PullExecutionResult, ...] = ()
     error: str | None = None
 
+    @property
+    def heartbeat_utc(self) -> datetime | None:
+        # Heartbeats are written on every progress update, so they stay epoch floats until someone reads them.
+        if self.heartbeat_epoch is None:
+            return None
+        return datetime.fromtimestamp(self.heartbeat_epoch, timezone.utc)
+
 
 class PullJobService:
     def __init__(self, settings: Settings, ingestion_service: IngestionService) -> None:
         self._settings = settings
         self._ingestion_service = ingestion_service
-        self._jobs: dict[str, _PullJobState] = {}
+        # Job states are immutable snapshots: readers take no lock and writers swap in a replacement.
+        self._jobs: dict[str, PullJobSnapshot] = {}
         self._lock = Lock()
         self._active_job_id: str | None = None
+        self._progress_interval_seconds = max(int(settings.pull_progress_coalesce_interval_ms), 0) / 1000.0
+        self._last_progress_monotonic: dict[str, dict[str, float]] = {}
 
     def start_job(self, subreddit: str | None) -> PullJobSnapshot:
         with self._lock:
             if self._active_job_id:
                 active = self._jobs.get(self._active_job_id)
                 if active and active.status in {'queued', 'running'}:
-                    return PullJobSnapshot(
-                        job_id=active.job_id,
-                        mode=active.mode,
-                        requested_subreddit=active.requested_subreddit,
-                        status=active.status,
-                        started_at_utc=active.started_at_utc,
-                        finished_at_utc=active.finished_at_utc,
-                        total_steps=active.total_steps,
-                        completed_steps=active.completed_steps,
-                        current_subreddit=active.current_subreddit,
-                        current_phase=active.current_phase,
-                        current_total_submissions=active.current_total_submissions,
-                        current_processed_submissions=active.current_processed_submissions,
-                        current_submission_id=active.current_submission_id,
-                        current_submissions=active.current_submissions,
-                        current_comments=active.current_comments,
-                        current_mentions=active.current_mentions,
-                        current_stance_rows=active.current_stance_rows,
-                        current_partial_errors=active.current_partial_errors,
-                        heartbeat_utc=active.heartbeat_utc,
-                        results=list(active.results),
-                        error=active.error,
-                    )
+                    return active
                 self._active_job_id = None
 
+            self._evict_finished_jobs()
             if subreddit:
                 subreddits = [subreddit]
                 mode = 'single'
@@ -107,159 +75,221 @@ class PullJobService:
                 subreddits = list(self._settings.subreddits)
                 mode = 'all'
 
-            now = datetime.now(timezone.utc)
-            job_id = uuid4().hex
-            job = _PullJobState(
-                job_id=job_id,
+            job = PullJobSnapshot(
+                job_id=uuid4().hex,
                 mode=mode,
                 requested_subreddit=subreddit,
                 status='queued',
-                started_at_utc=now,
+                started_at_utc=datetime.now(timezone.utc),
                 total_steps=len(subreddits),
             )
-            self._jobs[job_id] = job
-            self._active_job_id = job_id
+            self._jobs[job.job_id] = job
+            self._active_job_id = job.job_id
 
         loop = asyncio.get_running_loop()
-        loop.create_task(self._run_job(job_id=job_id, subreddits=subreddits))
-        return self._snapshot(job_id)
+        loop.create_task(self._run_job(job_id=job.job_id, subreddits=subreddits))
+        return job
 
     def get_job(self, job_id: str) -> PullJobSnapshot | None:
-        with self._lock:
-            if job_id not in self._jobs:
-                return None
-        return self._snapshot(job_id)
+        return self._jobs.get(job_id)
 
-    def _snapshot(self, job_id: str) -> PullJobSnapshot:
-        with self._lock:
-            job = self._jobs[job_id]
-            return PullJobSnapshot(
-                job_id=job.job_id,
-                mode=job.mode,
-                requested_subreddit=job.requested_subreddit,
-                status=job.status,
-                started_at_utc=job.started_at_utc,
-                finished_at_utc=job.finished_at_utc,
-                total_steps=job.total_steps,
-                completed_steps=job.completed_steps,
-                current_subreddit=job.current_subreddit,
-                current_phase=job.current_phase,
-                current_total_submissions=job.current_total_submissions,
-                current_processed_submissions=job.current_processed_submissions,
-                current_submission_id=job.current_submission_id,
-                current_submissions=job.current_submissions,
-                current_comments=job.current_comments,
-                current_mentions=job.current_mentions,
-                current_stance_rows=job.current_stance_rows,
-                current_partial_errors=job.current_partial_errors,
-                heartbeat_utc=job.heartbeat_utc,
-                results=list(job.results),
-                error=job.error,
-            )
+    def _evict_finished_jobs(self) -> None:
+        # Called under self._lock before a new job is added; finished jobs keep their results, so drop old ones.
+        retention_seconds = max(int(self._settings.pull_job_retention_seconds), 0)
+        max_retained = max(int(self._settings.pull_job_max_retained), 1)
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=retention_seconds)
+        finished_ids = [job_id for job_id, job in self._jobs.items() if job.finished_at_utc is not None]
+        expired = {job_id for job_id in finished_ids if self._jobs[job_id].finished_at_utc < cutoff}
+        # Jobs are inserted in start order, so the front of the dict holds the oldest finished jobs.
+        overflow = len(self._jobs) - len(expired) - (max_retained - 1)
+        for job_id in finished_ids:
+            if overflow <= 0:
+                break
+            if job_id not in expired:
+                expired.add(job_id)
+                overflow -= 1
+        for job_id in expired:
+            self._jobs.pop(job_id, None)
+            self._last_progress_monotonic.pop(job_id, None)
+
+    def _update_job(self, job_id: str, **changes: Any) -> PullJobSnapshot | None:
+        # Every writer runs on the event loop thread, so load-replace-store cannot interleave with another writer.
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        updated = replace(job, **changes)
+        self._jobs[job_id] = updated
+        return updated
 
     async def _run_job(self, *, job_id: str, subreddits: list[str]) -> None:
-        with self._lock:
-            job = self._jobs.get(job_id)
-            if job is None:
-                return
-            job.status = 'running'
+        if self._update_job(job_id, status='running') is None:
+            return
 
         fatal_error: str | None = None
-        for subreddit in subreddits:
-            with self._lock:
+        parallelism = max(int(self._settings.pull_max_parallel_subreddits), 1)
+        if self._settings.resolved_database_url.startswith('sqlite'):
+            # SQLite has a single writer, so parallel pulls would only queue on (or fail with) its database lock.
+            parallelism = 1
+        semaphore = asyncio.Semaphore(parallelism)
+
+        async def run_subreddit(subreddit: str) -> None:
+            nonlocal fatal_error
+            async with semaphore:
                 job = self._jobs.get(job_id)
                 if job is None:
                     return
-                job.current_subreddit = subreddit
-                job.current_phase = 'subreddit_started'
-                job.current_total_submissions = None
-                job.current_processed_submissions = 0
-                job.current_submission_id = None
-                job.current_submissions = 0
-                job.current_comments = 0
-                job.current_mentions = 0
-                job.current_stance_rows = 0
-                job.current_partial_errors = 0
-                job.heartbeat_utc = datetime.now(timezone.utc)
+                started = _started_progress(subreddit)
+                self._update_job(
+                    job_id,
+                    current_subreddit=subreddit,
+                    active_progress=(*job.active_progress, started),
+                    heartbeat_epoch=time.time(),
+                    **_current_fields(started),
+                )
 
-            def on_progress(update: PullProgressUpdate) -> None:
-                self._apply_progress_update(job_id=job_id, update=update)
+                def on_progress(update: PullProgressUpdate) -> None:
+                    self._apply_progress_update(job_id=job_id, update=update)
 
-            try:
-                with SessionLocal() as session:
-                    result = await self._ingestion_service.pull_subreddit(
-                        session,
+                try:
+                    with SessionLocal() as session:
+                        result = await self._ingestion_service.pull_subreddit(
+                            session,
+                            subreddit=subreddit,
+                            on_progress=on_progress,
+                        )
+                except Exception as exc:  # pragma: no cover - safety net
+                    fatal_error = str(exc)
+                    result = PullExecutionResult(
+                        pull_run_id=-1,
                         subreddit=subreddit,
-                        on_progress=on_progress,
+                        date_bucket_berlin=to_berlin_date(utc_now()),
+                        status='failed',
+                        submissions=0,
+                        comments=0,
+                        mentions=0,
+                        stance_rows=0,
+                        error=fatal_error[:4000],
                     )
-            except Exception as exc:  # pragma: no cover - safety net
-                fatal_error = str(exc)
-                result = PullExecutionResult(
-                    pull_run_id=-1,
-                    subreddit=subreddit,
-                    date_bucket_berlin=to_berlin_date(utc_now()),
-                    status='failed',
-                    submissions=0,
-                    comments=0,
-                    mentions=0,
-                    stance_rows=0,
-                    error=fatal_error[:4000],
-                )
 
-            with self._lock:
                 job = self._jobs.get(job_id)
                 if job is None:
                     return
-                job.results.append(result)
-                job.completed_steps += 1
-                job.current_phase = 'subreddit_done'
-                job.current_total_submissions = max(job.current_total_submissions or 0, job.current_processed_submissions)
-                job.current_submission_id = None
-                job.heartbeat_utc = datetime.now(timezone.utc)
-            if job.completed_steps < len(subreddits):
-                pause = max(float(self._settings.pull_subreddit_pause_seconds), 0.0)
-                if pause > 0:
-                    await asyncio.sleep(pause)
+                remaining = tuple(progress for progress in job.active_progress if progress.subreddit != subreddit)
+                self._last_progress_monotonic.get(job_id, {}).pop(subreddit, None)
+                if job.current_subreddit != subreddit:
+                    current_changes: dict[str, Any] = {}
+                elif remaining:
+                    # Hand the current_* fields to the most recently started sibling that is still running.
+                    current_changes = {'current_subreddit': remaining[-1].subreddit, **_current_fields(remaining[-1])}
+                else:
+                    current_changes = {
+                        'current_phase': 'subreddit_done',
+                        'current_total_submissions': max(job.current_total_submissions or 0, job.current_processed_submissions),
+                        'current_submission_id': None,
+                    }
+                job = self._update_job(
+                    job_id,
+                    results=(*job.results, result),
+                    completed_steps=job.completed_steps + 1,
+                    active_progress=remaining,
+                    heartbeat_epoch=time.time(),
+                    **current_changes,
+                )
+                # The inter-subreddit pause only spaces out sequential pulls; parallel ones are paced by the semaphore.
+                if job is not None and parallelism == 1 and job.completed_steps < len(subreddits):
+                    pause = max(float(self._settings.pull_subreddit_pause_seconds), 0.0)
+                    if pause > 0:
+                        await asyncio.sleep(pause)
+
+        await asyncio.gather(*(run_subreddit(subreddit) for subreddit in subreddits))
 
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        failed = [row for row in job.results if row.status != 'success']
+        if fatal_error:
+            status, error = 'failed', fatal_error[:4000]
+        elif failed and len(failed) < len(job.results):
+            status, error = 'partial_success', '; '.join(f'{row.subreddit}:{row.status}' for row in failed[:6])
+        elif failed:
+            status, error = 'failed', '; '.join(f'{row.subreddit}:{row.status}' for row in failed[:6])
+        else:
+            status, error = 'success', None
+        now = time.time()
+        self._update_job(
+            job_id,
+            status=status,
+            error=error,
+            current_subreddit=None,
+            current_phase='finished',
+            current_submission_id=None,
+            finished_at_utc=datetime.fromtimestamp(now, timezone.utc),
+            heartbeat_epoch=now,
+        )
+        self._last_progress_monotonic.pop(job_id, None)
         with self._lock:
-            job = self._jobs.get(job_id)
-            if job is None:
-                return
-            failed = [row for row in job.results if row.status != 'success']
-            if fatal_error:
-                job.status = 'failed'
-                job.error = fatal_error[:4000]
-            elif failed and len(failed) < len(job.results):
-                job.status = 'partial_success'
-                job.error = '; '.join(f'{row.subreddit}:{row.status}' for row in failed[:6])
-            elif failed:
-                job.status = 'failed'
-                job.error = '; '.join(f'{row.subreddit}:{row.status}' for row in failed[:6])
-            else:
-                job.status = 'success'
-                job.error = None
-            job.current_subreddit = None
-            job.current_phase = 'finished'
-            job.current_submission_id = None
-            job.finished_at_utc = datetime.now(timezone.utc)
-            job.heartbeat_utc = datetime.now(timezone.utc)
             if self._active_job_id == job_id:
                 self._active_job_id = None
 
     def _apply_progress_update(self, *, job_id: str, update: PullProgressUpdate) -> None:
-        with self._lock:
-            job = self._jobs.get(job_id)
-            if job is None:
-                return
-            if job.current_subreddit and update.subreddit != job.current_subreddit:
-                return
-            job.current_phase = update.phase
-            job.current_total_submissions = update.total_submissions
-            job.current_processed_submissions = max(update.processed_submissions, 0)
-            job.current_submission_id = update.current_submission_id
-            job.current_submissions = max(update.submissions, 0)
-            job.current_comments = max(update.comments, 0)
-            job.current_mentions = max(update.mentions, 0)
-            job.current_stance_rows = max(update.stance_rows, 0)
-            job.current_partial_errors = max(update.partial_errors, 0)
-            job.heartbeat_utc = datetime.now(timezone.utc)
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        index = next(
+            (idx for idx, progress in enumerate(job.active_progress) if progress.subreddit == update.subreddit),
+            None,
+        )
+        if index is None:
+            return
+        previous = job.active_progress[index]
+        # Repeated identical updates (e.g. the forced final tick) would only swap in an equal snapshot.
+        if previous == update:
+            return
+        now = time.monotonic()
+        # Pollers only need a few updates a second; coalesce bursts unless the phase changes or the listing completes.
+        is_last = update.total_submissions is not None and update.processed_submissions >= update.total_submissions
+        last_by_subreddit = self._last_progress_monotonic.setdefault(job_id, {})
+        if (
+            update.phase == previous.phase
+            and not is_last
+            and now - last_by_subreddit.get(update.subreddit, float('-inf')) < self._progress_interval_seconds
+        ):
+            return
+        last_by_subreddit[update.subreddit] = now
+        active_progress = (*job.active_progress[:index], update, *job.active_progress[index + 1:])
+        current_changes = _current_fields(update) if update.subreddit == job.current_subreddit else {}
+        self._update_job(
+            job_id,
+            active_progress=active_progress,
+            heartbeat_epoch=time.time(),
+            **current_changes,
+        )
+
+
+def _started_progress(subreddit: str) -> PullProgressUpdate:
+    return PullProgressUpdate(
+        subreddit=subreddit,
+        phase='subreddit_started',
+        total_submissions=None,
+        processed_submissions=0,
+        current_submission_id=None,
+        submissions=0,
+        comments=0,
+        mentions=0,
+        stance_rows=0,
+        partial_errors=0,
+    )
+
+
+def _current_fields(progress: PullProgressUpdate) -> dict[str, Any]:
+    return {
+        'current_phase': progress.phase,
+        'current_total_submissions': progress.total_submissions,
+        'current_processed_submissions': progress.processed_submissions,
+        'current_submission_id': progress.current_submission_id,
+        'current_submissions': progress.submissions,
+        'current_comments': progress.comments,
+        'current_mentions': progress.mentions,
+        'current_stance_rows': progress.stance_rows,
+        'current_partial_errors': progress.partial_errors,
+    }
@@ -1,46 +1,99 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
 
 import asyncpraw
+from asyncpraw.models import MoreComments as _MoreComments
 
 from app.core.config import Settings
 
+LOGGER = logging.getLogger(__name__)
+
+INFO_BATCH_SIZE = 100
+# Cache keys are tuples of the request kind and its arguments, hashed as-is without building a string.
+_CacheKey = tuple[Any, ...]
+_LISTING_DISPATCH: dict[str, Callable[[Any, str, int, dict[str, str] | None], Any]] = {
+    'top': lambda ref, t_param, limit, params: ref.top(time_filter=t_param, limit=limit, params=params),
+    'controversial': lambda ref, t_param, limit, params: ref.controversial(time_filter=t_param, limit=limit, params=params),
+    'new': lambda ref, _t_param, limit, params: ref.new(limit=limit, params=params),
+    'hot': lambda ref, _t_param, limit, params: ref.hot(limit=limit, params=params),
+    'rising': lambda ref, _t_param, limit, params: ref.rising(limit=limit, params=params),
+}
+
 
 class RedditClient:
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
-        self._cache: dict[str, Any] = {}
+        self._cache: OrderedDict[_CacheKey, Any] = OrderedDict()
+        self._cache_max_entries = max(int(settings.reddit_cache_max_entries), 1)
+        self._inflight: dict[_CacheKey, asyncio.Future[Any]] = {}
+        self._thread_offload_min_comments = max(int(settings.reddit_thread_offload_min_comments), 0)
+        # The asyncpraw session and its lock belong to the event loop that created them; see _bind_to_running_loop().
         self._reddit: Any | None = None
+        self._reddit_loop: asyncio.AbstractEventLoop | None = None
+        self._reddit_lock: asyncio.Lock | None = None
 
     async def __aenter__(self) -> 'RedditClient':
-        client_id = self._settings.reddit_client_id.strip()
-        client_secret = self._settings.reddit_client_secret.strip()
-        user_agent = self._settings.reddit_user_agent.strip()
-        if not client_id:
-            raise RuntimeError('REDDIT_CLIENT_ID is required for Reddit API access')
-        if not client_secret:
-            raise RuntimeError('REDDIT_CLIENT_SECRET is required for Reddit API access')
-        if not user_agent:
-            raise RuntimeError('REDDIT_USER_AGENT is required for Reddit API access')
-
-        timeout_seconds = max(float(self._settings.reddit_timeout_read), 1.0)
-        self._reddit = asyncpraw.Reddit(
-            client_id=client_id,
-            client_secret=client_secret,
-            user_agent=user_agent,
-            ratelimit_seconds=90,
-            requestor_kwargs={'timeout': timeout_seconds},
-        )
+        await self._get_or_create_reddit()
         return self
 
     async def __aexit__(self, exc_type, exc, tb) -> None:
-        if self._reddit is not None:
-            await self._reddit.close()
+        # Pulls on the same event loop reuse the asyncpraw session and its OAuth token; the owner calls close().
+        return None
+
+    async def close(self) -> None:
+        reddit = self._reddit
+        owner_loop = self._reddit_loop
         self._reddit = None
+        self._reddit_loop = None
+        self._reddit_lock = None
+        self._inflight.clear()
+        if reddit is not None and owner_loop is asyncio.get_running_loop():
+            await reddit.close()
+
+    def _bind_to_running_loop(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._reddit_loop is not loop or self._reddit_lock is None:
+            if self._reddit is not None:
+                # Its aiohttp session cannot be awaited from this loop; the previous loop's owner should have closed it.
+                LOGGER.warning('Discarding asyncpraw session left open by a previous event loop')
+            self._reddit = None
+            self._inflight.clear()
+            self._reddit_loop = loop
+            self._reddit_lock = asyncio.Lock()
+        return self._reddit_lock
+
+    async def _get_or_create_reddit(self) -> Any:
+        async with self._bind_to_running_loop():
+            if self._reddit is not None:
+                return self._reddit
+
+            client_id = self._settings.reddit_client_id.strip()
+            client_secret = self._settings.reddit_client_secret.strip()
+            user_agent = self._settings.reddit_user_agent.strip()
+            if not client_id:
+                raise RuntimeError('REDDIT_CLIENT_ID is required for Reddit API access')
+            if not client_secret:
+                raise RuntimeError('REDDIT_CLIENT_SECRET is required for Reddit API access')
+            if not user_agent:
+                raise RuntimeError('REDDIT_USER_AGENT is required for Reddit API access')
+
+            timeout_seconds = max(float(self._settings.reddit_timeout_read), 1.0)
+            self._reddit = asyncpraw.Reddit(
+                client_id=client_id,
+                client_secret=client_secret,
+                user_agent=user_agent,
+                ratelimit_seconds=90,
+                requestor_kwargs={'timeout': timeout_seconds},
+            )
+            return self._reddit
 
     def reset_run_cache(self) -> None:
-        self._cache = {}
+        self._cache.clear()
 
     def get_rate_limit_snapshot(self) -> dict[str, float | None] | None:
         reddit = self._reddit
@@ -75,11 +128,25 @@ class RedditClient:
         after: str | None = None,
     ) -> dict[str, Any]:
         reddit = self._require_reddit()
-        cache_key = f'listing:{subreddit}:{sort}:{t_param}:{limit}:{after or ""}'
-        cached = self._cache.get(cache_key)
+        cache_key = ('listing', subreddit, sort, t_param, limit, after or '')
+        cached = self._cache_get(cache_key)
         if cached is not None:
             return cached
+        return await self._load_shared(
+            cache_key,
+            lambda: self._load_listing(reddit, subreddit, sort, t_param, limit, after=after),
+        )
 
+    async def _load_listing(
+        self,
+        reddit: Any,
+        subreddit: str,
+        sort: str,
+        t_param: str,
+        limit: int,
+        *,
+        after: str | None,
+    ) -> dict[str, Any]:
         subreddit_ref = await reddit.subreddit(subreddit)
         listing_params: dict[str, str] = {}
         if after:
@@ -87,45 +154,35 @@ class RedditClient:
         params = listing_params or None
 
         normalized_sort = (sort or 'top').strip().lower()
-        listing_gen: Any
-        if normalized_sort == 'top':
-            listing_gen = subreddit_ref.top(time_filter=t_param, limit=limit, params=params)
-        elif normalized_sort == 'controversial':
-            listing_gen = subreddit_ref.controversial(time_filter=t_param, limit=limit, params=params)
-        elif normalized_sort == 'new':
-            listing_gen = subreddit_ref.new(limit=limit, params=params)
-        elif normalized_sort == 'hot':
-            listing_gen = subreddit_ref.hot(limit=limit, params=params)
-        elif normalized_sort == 'rising':
-            listing_gen = subreddit_ref.rising(limit=limit, params=params)
-        else:
+        dispatch = _LISTING_DISPATCH.get(normalized_sort)
+        if dispatch is None:
             raise RuntimeError(f'unsupported listing sort: {sort}')
+        listing_gen = dispatch(subreddit_ref, t_param, limit, params)
 
-        submissions: list[Any] = []
+        children: list[dict[str, Any]] = []
+        last_fullname = ''
         async for item in listing_gen:
-            submissions.append(item)
+            children.append({'kind': 't3', 'data': self._submission_to_dict(item)})
+            last_fullname = str(getattr(item, 'fullname', '') or '')
 
         payload = {
             'kind': 'Listing',
             'data': {
-                'children': [{'kind': 't3', 'data': self._submission_to_dict(item)} for item in submissions],
-                'after': (
-                    str(getattr(submissions[-1], 'fullname', '') or '')
-                    if submissions and len(submissions) >= max(int(limit), 1)
-                    else None
-                ),
+                'children': children,
+                'after': last_fullname if children and len(children) >= max(int(limit), 1) else None,
             },
         }
-        self._cache[cache_key] = payload
         return payload
 
     async def get_thread(self, post_id: str, limit: int | None = None, depth: int | None = None) -> Any:
         reddit = self._require_reddit()
-        cache_key = f'thread:{post_id}:{limit}:{depth}'
-        cached = self._cache.get(cache_key)
+        cache_key = ('thread', post_id, limit, depth)
+        cached = self._cache_get(cache_key)
         if cached is not None:
             return cached
+        return await self._load_shared(cache_key, lambda: self._load_thread(reddit, post_id, limit, depth))
 
+    async def _load_thread(self, reddit: Any, post_id: str, limit: int | None, depth: int | None) -> Any:
         submission = await reddit.submission(id=post_id)
         await submission.load()
 
@@ -139,11 +196,15 @@ class RedditClient:
             replace_limit = configured_batches
         await submission.comments.replace_more(limit=replace_limit)
 
-        comments = []
-        for node in submission.comments:
-            converted = self._comment_node_to_listing(node=node, depth=0, max_depth=depth)
-            if converted is not None:
-                comments.append(converted)
+        # Converting a thread with thousands of comments is pure CPU; do it off the loop so other fetches keep moving.
+        if int(getattr(submission, 'num_comments', 0) or 0) >= self._thread_offload_min_comments:
+            comments = await asyncio.to_thread(
+                self._comment_forest_to_listing,
+                nodes=submission.comments,
+                max_depth=depth,
+            )
+        else:
+            comments = self._comment_forest_to_listing(nodes=submission.comments, max_depth=depth)
 
         payload = [
             {
@@ -164,32 +225,76 @@ class RedditClient:
                 },
             },
         ]
-        self._cache[cache_key] = payload
         return payload
 
     async def get_morechildren(self, post_id: str, children: list[str], sort: str = 'confidence') -> Any:
         if not children:
             return {}
         reddit = self._require_reddit()
-        cache_key = f'more:{post_id}:{sort}:{",".join(children)}'
-        cached = self._cache.get(cache_key)
+        # A long morechildren batch would make a multi-kilobyte key; a fixed-size digest keeps probes cheap.
+        children_digest = hashlib.blake2b(','.join(children).encode(), digest_size=16).hexdigest()
+        cache_key = ('more', post_id, sort, children_digest)
+        cached = self._cache_get(cache_key)
         if cached is not None:
             return cached
+        return await self._load_shared(cache_key, lambda: self._load_morechildren(reddit, children))
 
+    async def _load_morechildren(self, reddit: Any, children: list[str]) -> Any:
         fullnames = [f't1_{child_id}' for child_id in children if child_id]
+        # /api/info caps each request at 100 ids; send the chunks together instead of letting the generator page serially.
+        chunk_results = await asyncio.gather(
+            *(
+                self._fetch_comment_info(reddit, fullnames[start:start + INFO_BATCH_SIZE])
+                for start in range(0, len(fullnames), INFO_BATCH_SIZE)
+            )
+        )
         comment_by_id: dict[str, dict[str, Any]] = {}
-        info_gen = reddit.info(fullnames=fullnames)
-        async for item in info_gen:
-            item_id = str(getattr(item, 'id', '') or '')
-            if not item_id:
-                continue
-            comment_by_id[item_id] = {'kind': 't1', 'data': self._comment_to_data(item)}
+        for chunk_result in chunk_results:
+            comment_by_id.update(chunk_result)
 
         ordered = [comment_by_id[child_id] for child_id in children if child_id in comment_by_id]
-        payload = {'json': {'data': {'things': ordered}}}
-        self._cache[cache_key] = payload
+        return {'json': {'data': {'things': ordered}}}
+
+    async def _load_shared(self, cache_key: _CacheKey, load: Callable[[], Awaitable[Any]]) -> Any:
+        # Cache hits return from the public methods before reaching here, without building a load closure.
+        # Concurrent callers for the same key share one in-flight load instead of each hitting Reddit.
+        pending = self._inflight.get(cache_key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._load_and_cache(cache_key, load))
+            self._inflight[cache_key] = pending
+        return await asyncio.shield(pending)
+
+    async def _load_and_cache(self, cache_key: _CacheKey, load: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            payload = await load()
+        finally:
+            # Failed loads are dropped with the in-flight entry so the next caller retries.
+            self._inflight.pop(cache_key, None)
+        self._cache_put(cache_key, payload)
         return payload
 
+    def _cache_get(self, cache_key: _CacheKey) -> Any | None:
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self._cache.move_to_end(cache_key)
+        return cached
+
+    def _cache_put(self, cache_key: _CacheKey, payload: Any) -> None:
+        # Thread payloads carry whole comment trees, so evict the least recently used instead of growing all run.
+        self._cache[cache_key] = payload
+        self._cache.move_to_end(cache_key)
+        while len(self._cache) > self._cache_max_entries:
+            self._cache.popitem(last=False)
+
+    async def _fetch_comment_info(self, reddit: Any, fullnames: list[str]) -> dict[str, dict[str, Any]]:
+        out: dict[str, dict[str, Any]] = {}
+        async for item in reddit.info(fullnames=fullnames):
+            item_id = str(getattr(item, 'id', '') or '')
+            if not item_id:
+                continue
+            out[item_id] = {'kind': 't1', 'data': self._comment_to_data(item)}
+        return out
+
     def _require_reddit(self) -> Any:
         if self._reddit is None:
             raise RuntimeError('RedditClient is not initialized')
@@ -205,26 +310,44 @@ class RedditClient:
         preview = getattr(submission, 'preview', None)
         if not isinstance(preview, dict):
             preview = {}
+        # asyncpraw sets the core listing fields on every fetched submission, so only optional ones go through getattr.
         return {
-            'id': str(getattr(submission, 'id', '') or ''),
+            'id': str(submission.id or ''),
             'subreddit': subreddit_name,
-            'created_utc': float(getattr(submission, 'created_utc', 0) or 0),
-            'title': str(getattr(submission, 'title', '') or ''),
-            'selftext': str(getattr(submission, 'selftext', '') or ''),
+            'created_utc': float(submission.created_utc or 0),
+            'title': str(submission.title or ''),
+            'selftext': str(submission.selftext or ''),
             'url': str(getattr(submission, 'url', '') or ''),
-            'score': int(getattr(submission, 'score', 0) or 0),
-            'num_comments': int(getattr(submission, 'num_comments', 0) or 0),
-            'permalink': str(getattr(submission, 'permalink', '') or ''),
+            'score': int(submission.score or 0),
+            'num_comments': int(submission.num_comments or 0),
+            'permalink': str(submission.permalink or ''),
             'preview': preview,
         }
 
-    def _comment_node_to_listing(
-        self,
-        *,
-        node: Any,
-        depth: int,
-        max_depth: int | None,
-    ) -> dict[str, Any] | None:
+    def _comment_forest_to_listing(self, *, nodes: Any, max_depth: int | None) -> list[dict[str, Any]]:
+        # Pre-order walk with an explicit stack: each node appends itself to its parent's children list,
+        # so sibling order is kept and deep reply chains never hit the recursion limit.
+        roots: list[dict[str, Any]] = []
+        stack: list[tuple[Any, int, list[dict[str, Any]]]] = [(node, 0, roots) for node in reversed(list(nodes))]
+        while stack:
+            node, depth, siblings = stack.pop()
+            converted = self._comment_node_to_listing(node)
+            if converted is None:
+                continue
+            siblings.append(converted)
+            if converted['kind'] != 't1' or (max_depth is not None and depth >= max_depth):
+                continue
+            reply_nodes: list[dict[str, Any]] = []
+            converted['data']['replies'] = {
+                'kind': 'Listing',
+                'data': {
+                    'children': reply_nodes,
+                },
+            }
+            stack.extend((child, depth + 1, reply_nodes) for child in reversed(list(getattr(node, 'replies', []))))
+        return roots
+
+    def _comment_node_to_listing(self, node: Any) -> dict[str, Any] | None:
         if self._is_more_node(node):
             children = [str(child_id) for child_id in getattr(node, 'children', []) if child_id]
             if not children:
@@ -238,42 +361,10 @@ class RedditClient:
                 },
             }
 
-        comment_id = str(getattr(node, 'id', '') or '')
-        if not comment_id:
+        data = self._comment_to_data(node)
+        if not data['id']:
             return None
-
-        author = getattr(node, 'author', None)
-        author_str = str(author) if author is not None else None
-        if author_str == '[deleted]':
-            author_str = None
-
-        replies: Any = ''
-        if max_depth is None or depth < max_depth:
-            reply_nodes = []
-            for child in getattr(node, 'replies', []):
-                converted = self._comment_node_to_listing(node=child, depth=depth + 1, max_depth=max_depth)
-                if converted is not None:
-                    reply_nodes.append(converted)
-            replies = {
-                'kind': 'Listing',
-                'data': {
-                    'children': reply_nodes,
-                },
-            }
-
-        return {
-            'kind': 't1',
-            'data': {
-                'id': comment_id,
-                'parent_id': str(getattr(node, 'parent_id', '') or ''),
-                'author': author_str,
-                'created_utc': float(getattr(node, 'created_utc', 0) or 0),
-                'score': int(getattr(node, 'score', 0) or 0),
-                'body': str(getattr(node, 'body', '') or ''),
-                'permalink': str(getattr(node, 'permalink', '') or ''),
-                'replies': replies,
-            },
-        }
+        return {'kind': 't1', 'data': data}
 
     def _comment_to_data(self, comment: Any) -> dict[str, Any]:
         author = getattr(comment, 'author', None)
@@ -281,18 +372,18 @@ class RedditClient:
         if author_str == '[deleted]':
             author_str = None
         return {
-            'id': str(getattr(comment, 'id', '') or ''),
+            'id': str(comment.id or ''),
             'parent_id': str(getattr(comment, 'parent_id', '') or ''),
             'author': author_str,
-            'created_utc': float(getattr(comment, 'created_utc', 0) or 0),
-            'score': int(getattr(comment, 'score', 0) or 0),
-            'body': str(getattr(comment, 'body', '') or ''),
-            'permalink': str(getattr(comment, 'permalink', '') or ''),
+            'created_utc': float(comment.created_utc or 0),
+            'score': int(comment.score or 0),
+            'body': str(comment.body or ''),
+            'permalink': str(comment.permalink or ''),
             'replies': '',
         }
 
     def _is_more_node(self, node: Any) -> bool:
-        return node.__class__.__name__ == 'MoreComments'
+        return isinstance(node, _MoreComments)
 
 
 def _to_float(value: Any) -> float | None:
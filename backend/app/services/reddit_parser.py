@@ -7,6 +7,10 @@ from typing import Any
 from app.schemas.reddit import ParsedComment, ParsedSubmission
 from app.utils.ids import normalize_parent_id
 
+# Bound once: a positional call on the bound method skips the attribute and keyword lookups on every parsed row.
+_from_timestamp = datetime.fromtimestamp
+_UTC = timezone.utc
+
 
 @dataclass(slots=True)
 class PendingMore:
@@ -16,20 +20,19 @@ class PendingMore:
 
 
 def parse_listing_posts(payload: dict[str, Any]) -> list[ParsedSubmission]:
-    children = payload.get('data', {}).get('children', [])
     submissions: list[ParsedSubmission] = []
-    for child in children:
+    for child in _listing_children(payload):
         if child.get('kind') != 't3':
             continue
-        data = child.get('data', {})
-        post_id = data.get('id')
+        data = child.get('data')
+        post_id = data.get('id') if isinstance(data, dict) else None
         if not post_id:
             continue
         submissions.append(
             ParsedSubmission(
                 id=post_id,
                 subreddit=str(data.get('subreddit', '')),
-                created_utc=datetime.fromtimestamp(float(data.get('created_utc', 0)), tz=timezone.utc),
+                created_utc=_from_timestamp(float(data.get('created_utc', 0) or 0), _UTC),
                 title=str(data.get('title', '')),
                 selftext=str(data.get('selftext', '')),
                 url=str(data.get('url', '')),
@@ -61,9 +64,7 @@ def parse_thread_with_more(payload: Any) -> tuple[ParsedSubmission | None, list[
     if submission is None:
         return None, comments, pending_more
 
-    children = comment_listing.get('data', {}).get('children', []) if isinstance(comment_listing, dict) else []
-    for child in children:
-        _walk_comment_tree(child, submission.id, comments, pending_more, depth=0)
+    _walk_comment_nodes(_listing_children(comment_listing), submission.id, comments, pending_more, depth=0)
 
     return submission, comments, pending_more
 
@@ -76,26 +77,23 @@ def parse_morechildren(
     fallback_parent_id: str | None,
     fallback_depth: int,
 ) -> tuple[list[ParsedComment], list[PendingMore]]:
-    if not isinstance(payload, dict):
+    try:
+        things = payload['json']['data']['things']
+    except (KeyError, TypeError):
         return [], []
-
-    things = (
-        payload.get('json', {})
-        .get('data', {})
-        .get('things', [])
-    )
     if not isinstance(things, list):
         return [], []
 
     comments: list[ParsedComment] = []
     pending_more: list[PendingMore] = []
-    resolved_parent_depths = dict(parent_depths)
+    # Depths resolved from this payload sit in front of the caller's map, which can span the whole thread and is not copied.
+    local_depths: dict[str, int] = {}
     for thing in things:
         if not isinstance(thing, dict):
             continue
 
         kind = thing.get('kind')
-        data = thing.get('data', {})
+        data = thing.get('data')
         if not isinstance(data, dict):
             continue
 
@@ -103,26 +101,25 @@ def parse_morechildren(
             parsed = _parse_comment_from_data(
                 data,
                 submission_id=submission_id,
-                parent_depths=resolved_parent_depths,
+                parent_depths=parent_depths,
+                local_depths=local_depths,
                 fallback_parent_id=fallback_parent_id,
                 fallback_depth=fallback_depth,
             )
             if parsed is None:
                 continue
             comments.append(parsed)
-            resolved_parent_depths[parsed.id] = parsed.depth
+            local_depths[parsed.id] = parsed.depth
 
             replies = data.get('replies')
             if isinstance(replies, dict):
-                reply_children = replies.get('data', {}).get('children', [])
-                for child in reply_children:
-                    _walk_comment_tree(
-                        child,
-                        submission_id=submission_id,
-                        out=comments,
-                        out_more=pending_more,
-                        depth=parsed.depth + 1,
-                    )
+                _walk_comment_nodes(
+                    _listing_children(replies),
+                    submission_id=submission_id,
+                    out=comments,
+                    out_more=pending_more,
+                    depth=parsed.depth + 1,
+                )
             continue
 
         if kind == 'more':
@@ -133,7 +130,8 @@ def parse_morechildren(
             depth = _resolve_depth(
                 parent_id=parent_id,
                 submission_id=submission_id,
-                parent_depths=resolved_parent_depths,
+                parent_depths=parent_depths,
+                local_depths=local_depths,
                 fallback_depth=fallback_depth,
             )
             pending_more.append(PendingMore(parent_id=parent_id, depth=depth, children=children))
@@ -142,20 +140,17 @@ def parse_morechildren(
 
 
 def _parse_submission_from_listing(listing: Any) -> ParsedSubmission | None:
-    if not isinstance(listing, dict):
-        return None
-    children = listing.get('data', {}).get('children', [])
-    for child in children:
+    for child in _listing_children(listing):
         if child.get('kind') != 't3':
             continue
-        data = child.get('data', {})
-        post_id = data.get('id')
+        data = child.get('data')
+        post_id = data.get('id') if isinstance(data, dict) else None
         if not post_id:
             continue
         return ParsedSubmission(
             id=post_id,
             subreddit=str(data.get('subreddit', '')),
-            created_utc=datetime.fromtimestamp(float(data.get('created_utc', 0)), tz=timezone.utc),
+            created_utc=_from_timestamp(float(data.get('created_utc', 0) or 0), _UTC),
             title=str(data.get('title', '')),
             selftext=str(data.get('selftext', '')),
             url=str(data.get('url', '')),
@@ -167,50 +162,63 @@ def _parse_submission_from_listing(listing: Any) -> ParsedSubmission | None:
     return None
 
 
-def _walk_comment_tree(
-    node: dict[str, Any],
+def _listing_children(listing: Any) -> list[Any]:
+    # Plain lookups instead of .get('data', {}).get('children', []) chains, which build two throwaway defaults per node.
+    try:
+        children = listing['data']['children']
+    except (KeyError, TypeError):
+        return []
+    return children if isinstance(children, list) else []
+
+
+def _walk_comment_nodes(
+    nodes: list[dict[str, Any]],
     submission_id: str,
     out: list[ParsedComment],
     out_more: list[PendingMore],
     depth: int,
 ) -> None:
-    kind = node.get('kind')
-    if kind == 'more':
-        data = node.get('data', {})
-        if not isinstance(data, dict):
-            return
-        children = [str(c) for c in data.get('children', []) if isinstance(c, str) and c]
-        if not children:
-            return
-        out_more.append(
-            PendingMore(
-                parent_id=normalize_parent_id(data.get('parent_id')),
-                depth=max(depth, 0),
-                children=children,
+    # Explicit stack instead of recursion; siblings are pushed in reverse so the output stays in pre-order.
+    stack: list[tuple[dict[str, Any], int]] = [(node, depth) for node in reversed(nodes)]
+    while stack:
+        node, depth = stack.pop()
+        kind = node.get('kind')
+        if kind == 'more':
+            data = node.get('data')
+            if not isinstance(data, dict):
+                continue
+            children = [str(c) for c in data.get('children', []) if isinstance(c, str) and c]
+            if not children:
+                continue
+            out_more.append(
+                PendingMore(
+                    parent_id=normalize_parent_id(data.get('parent_id')),
+                    depth=max(depth, 0),
+                    children=children,
+                )
             )
-        )
-        return
+            continue
 
-    if kind != 't1':
-        return
+        if kind != 't1':
+            continue
 
-    data = node.get('data', {})
-    parsed = _parse_comment_from_data(
-        data,
-        submission_id=submission_id,
-        parent_depths={},
-        fallback_parent_id=None,
-        fallback_depth=depth,
-    )
-    if parsed is None:
-        return
-    out.append(parsed)
+        data = node.get('data')
+        if not isinstance(data, dict):
+            continue
+        parsed = _parse_comment_from_data(
+            data,
+            submission_id=submission_id,
+            parent_depths={},
+            fallback_parent_id=None,
+            fallback_depth=depth,
+        )
+        if parsed is None:
+            continue
+        out.append(parsed)
 
-    replies = data.get('replies')
-    if isinstance(replies, dict):
-        reply_children = replies.get('data', {}).get('children', [])
-        for child in reply_children:
-            _walk_comment_tree(child, submission_id, out, out_more, depth=depth + 1)
+        replies = data.get('replies')
+        if isinstance(replies, dict):
+            stack.extend((child, depth + 1) for child in reversed(_listing_children(replies)))
 
 
 def _parse_comment_from_data(
@@ -220,6 +228,7 @@ def _parse_comment_from_data(
     parent_depths: dict[str, int],
     fallback_parent_id: str | None,
     fallback_depth: int,
+    local_depths: dict[str, int] | None = None,
 ) -> ParsedComment | None:
     comment_id = data.get('id')
     if not comment_id:
@@ -230,6 +239,7 @@ def _parse_comment_from_data(
         parent_id=parent_id,
         submission_id=submission_id,
         parent_depths=parent_depths,
+        local_depths=local_depths,
         fallback_depth=fallback_depth,
     )
     return ParsedComment(
@@ -238,19 +248,27 @@ def _parse_comment_from_data(
         parent_id=parent_id,
         depth=depth,
         author=(None if data.get('author') in {'[deleted]', None} else str(data.get('author'))),
-        created_utc=datetime.fromtimestamp(float(data.get('created_utc', 0)), tz=timezone.utc),
+        created_utc=_from_timestamp(float(data.get('created_utc', 0) or 0), _UTC),
         score=int(data.get('score', 0) or 0),
         body=str(data.get('body', '')),
         permalink=str(data.get('permalink', '')),
     )
 
 
-def _resolve_depth(parent_id: str | None, submission_id: str, parent_depths: dict[str, int], fallback_depth: int) -> int:
+def _resolve_depth(
+    parent_id: str | None,
+    submission_id: str,
+    parent_depths: dict[str, int],
+    fallback_depth: int,
+    local_depths: dict[str, int] | None = None,
+) -> int:
     if parent_id is None:
         return max(fallback_depth, 0)
     if parent_id == submission_id:
         return 0
-    parent_depth = parent_depths.get(parent_id)
+    parent_depth = local_depths.get(parent_id) if local_depths else None
+    if parent_depth is None:
+        parent_depth = parent_depths.get(parent_id)
     if parent_depth is not None:
         return parent_depth + 1
     return max(fallback_depth, 0)
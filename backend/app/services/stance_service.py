@@ -9,7 +9,7 @@ from app.schemas.common import StanceLabel, TargetType
 from app.services.deterministic_model import DeterministicStanceModel
 from app.services.finbert_model import FinbertStanceModel
 from app.services.llm_stance_model import LLMStanceModel
-from app.services.stance_model import StanceModel
+from app.services.stance_model import StanceModel, StanceProbabilities
 from app.services.ticker_extractor import ExtractedTicker, TickerExtractor
 from app.utils.text import normalize_text
 
@@ -21,6 +21,12 @@ SARCASM_CUES = (
     'sure jan',
     'as if',
 )
+MENTION_SOURCE_RANK = {
+    'cashtag': 4,
+    'token': 3,
+    'synonym': 2,
+    'context': 1,
+}
 
 
 @dataclass(slots=True)
@@ -33,6 +39,15 @@ class StanceResult:
     context_text: str
 
 
+@dataclass(slots=True)
+class StanceTarget:
+    target_type: TargetType
+    text: str
+    title: str
+    selftext: str
+    parent_text: str
+
+
 @dataclass(slots=True)
 class StanceRuntimeMetrics:
     base_model_calls: int = 0
@@ -67,6 +82,16 @@ class StanceService:
     def reset_runtime_metrics(self) -> None:
         self._runtime_metrics = StanceRuntimeMetrics()
 
+    def close(self) -> None:
+        close = getattr(self._llm_model, 'close', None)
+        if callable(close):
+            close()
+
+    def reset_model_cache(self) -> None:
+        reset_cache = getattr(self._llm_model, 'reset_cache', None)
+        if callable(reset_cache):
+            reset_cache()
+
     def get_runtime_metrics(self) -> StanceRuntimeMetrics:
         current = self._runtime_metrics
         return StanceRuntimeMetrics(
@@ -91,84 +116,165 @@ class StanceService:
         selftext: str,
         parent_text: str,
     ) -> list[StanceResult]:
-        current_mentions = self._merge_mentions_by_ticker(self._ticker_extractor.extract(text))
-        parent_tickers = self._ticker_extractor.extract_tickers_only(parent_text)
-
-        mentions = list(current_mentions)
-        if not mentions and target_type == TargetType.comment and self._settings.inherit_parent_tickers_for_comments:
-            inherited = set(parent_tickers)
-            if self._settings.inherit_title_tickers_for_comments:
-                inherited |= self._ticker_extractor.extract_tickers_only(title)
-            for ticker in sorted(inherited):
-                mentions.append(
-                    ExtractedTicker(
-                        ticker=ticker,
-                        confidence=0.4,
-                        source='context',
-                        span_start=-1,
-                        span_end=-1,
-                    )
+        return self.analyze_batch(
+            [
+                StanceTarget(
+                    target_type=target_type,
+                    text=text,
+                    title=title,
+                    selftext=selftext,
+                    parent_text=parent_text,
                 )
-            mentions = self._merge_mentions_by_ticker(mentions)
+            ]
+        )[0]
+
+    def analyze_batch(
+        self,
+        targets: list[StanceTarget],
+        metrics: StanceRuntimeMetrics | None = None,
+    ) -> list[list[StanceResult]]:
+        metrics = metrics if metrics is not None else self._runtime_metrics
+        pending: list[tuple[int, ExtractedTicker, str, str]] = []
+        # Normalized once per target; every mention of that target reuses it for the short-text and sarcasm checks.
+        normalized_texts: list[str] = [''] * len(targets)
+        for idx, target in enumerate(targets):
+            mentions = self._mentions_for_target(target)
+            if not mentions:
+                continue
+            normalized_texts[idx] = normalize_text(target.text)
+            context = self.build_context(
+                title=target.title,
+                selftext=target.selftext,
+                parent_text=target.parent_text,
+                text=target.text,
+            )
+            context_prefix = f'{context}\nTICKER: '
+            pending.extend((idx, mention, context, context_prefix + mention.ticker) for mention in mentions)
 
-        if not mentions:
-            return []
+        results: list[list[StanceResult]] = [[] for _ in targets]
+        if not pending:
+            return results
 
-        results: list[StanceResult] = []
-        context = self.build_context(title=title, selftext=selftext, parent_text=parent_text, text=text)
+        metrics.base_model_calls += len(pending)
+        batch_probs = self._predict_many(self._model, [item[3] for item in pending])
 
-        for mention in mentions:
-            context_with_ticker = f'{context}\nTICKER: {mention.ticker}'
-            self._runtime_metrics.base_model_calls += 1
-            probs = self._model.predict(context_text=context_with_ticker)
+        scored: list[tuple[StanceLabel, float, float, float, float, str]] = []
+        llm_positions: list[int] = []
+        for pos, ((idx, mention, _, _), probs) in enumerate(zip(pending, batch_probs)):
+            normalized_text = normalized_texts[idx]
             bullish = float(probs['bullish'])
             bearish = float(probs['bearish'])
             neutral = float(probs['neutral'])
             label, confidence = self._label_from_probs(
                 mention=mention,
-                text=text,
+                normalized_text=normalized_text,
                 bullish=bullish,
                 bearish=bearish,
                 neutral=neutral,
             )
-            used_model_version = self._model.model_version
-
-            if self._should_use_llm(text=text, mention=mention, label=label, confidence=confidence):
-                self._runtime_metrics.llm_calls += 1
-                try:
-                    llm_model = self._llm_model
-                    if llm_model is None:
-                        raise RuntimeError('llm model unavailable')
-                    llm_probs = llm_model.predict(context_text=context_with_ticker)
-                    bullish = float(llm_probs['bullish'])
-                    bearish = float(llm_probs['bearish'])
-                    neutral = float(llm_probs['neutral'])
-                    label, confidence = self._label_from_probs(
-                        mention=mention,
-                        text=text,
-                        bullish=bullish,
-                        bearish=bearish,
-                        neutral=neutral,
-                    )
-                    used_model_version = llm_model.model_version
-                    self._record_llm_usage(llm_model)
-                except Exception as exc:
-                    self._runtime_metrics.llm_failures += 1
-                    LOGGER.warning('LLM stance fallback failed for ticker=%s: %s', mention.ticker, exc)
+            scored.append((label, confidence, bullish, bearish, neutral, self._model.model_version))
+            if self._should_use_llm(
+                normalized_text=normalized_text,
+                mention=mention,
+                label=label,
+                confidence=confidence,
+            ):
+                llm_positions.append(pos)
+
+        llm_model = self._llm_model
+        if llm_positions and llm_model is not None:
+            llm_probs = self._predict_llm(llm_model, [pending[pos][3] for pos in llm_positions], metrics)
+            for pos, probs in zip(llm_positions, llm_probs):
+                if probs is None:
+                    continue
+                idx, mention, _, _ = pending[pos]
+                bullish = float(probs['bullish'])
+                bearish = float(probs['bearish'])
+                neutral = float(probs['neutral'])
+                label, confidence = self._label_from_probs(
+                    mention=mention,
+                    normalized_text=normalized_texts[idx],
+                    bullish=bullish,
+                    bearish=bearish,
+                    neutral=neutral,
+                )
+                scored[pos] = (label, confidence, bullish, bearish, neutral, llm_model.model_version)
 
-            results.append(
+        for (idx, mention, context, _), (label, confidence, bullish, bearish, _, model_version) in zip(pending, scored):
+            results[idx].append(
                 StanceResult(
                     mention=mention,
                     label=label,
                     score=max(min(bullish - bearish, 1.0), -1.0),
                     confidence=confidence,
-                    model_version=used_model_version,
+                    model_version=model_version,
                     context_text=context,
                 )
             )
 
         return results
 
+    def _predict_llm(
+        self,
+        llm_model: StanceModel,
+        context_texts: list[str],
+        metrics: StanceRuntimeMetrics,
+    ) -> list[StanceProbabilities | None]:
+        metrics.llm_calls += len(context_texts)
+        batch_predict = getattr(llm_model, 'predict_batch', None)
+        if callable(batch_predict):
+            try:
+                batch_probs = list(batch_predict(context_texts))
+            except Exception as exc:
+                metrics.llm_failures += len(context_texts)
+                LOGGER.warning('LLM stance fallback failed for %d mentions: %s', len(context_texts), exc)
+                return [None] * len(context_texts)
+            # Items the model left unanswered come back as None and keep the base-model label.
+            metrics.llm_failures += sum(1 for probs in batch_probs if probs is None)
+            self._record_llm_usage(llm_model, metrics)
+            return batch_probs
+
+        output: list[StanceProbabilities | None] = []
+        for context_text in context_texts:
+            try:
+                output.append(llm_model.predict(context_text=context_text))
+                self._record_llm_usage(llm_model, metrics)
+            except Exception as exc:
+                metrics.llm_failures += 1
+                LOGGER.warning('LLM stance fallback failed: %s', exc)
+                output.append(None)
+        return output
+
+    def _mentions_for_target(self, target: StanceTarget) -> list[ExtractedTicker]:
+        mentions = self._merge_mentions_by_ticker(self._ticker_extractor.extract(target.text))
+        if (
+            not mentions
+            and target.target_type == TargetType.comment
+            and self._settings.inherit_parent_tickers_for_comments
+        ):
+            inherited = self._ticker_extractor.extract_tickers_only(target.parent_text)
+            if self._settings.inherit_title_tickers_for_comments:
+                inherited |= self._ticker_extractor.extract_tickers_only(target.title)
+            mentions = self._merge_mentions_by_ticker(
+                [
+                    ExtractedTicker(
+                        ticker=ticker,
+                        confidence=0.4,
+                        source='context',
+                        span_start=-1,
+                        span_end=-1,
+                    )
+                    for ticker in sorted(inherited)
+                ]
+            )
+        return mentions
+
+    def _predict_many(self, model: StanceModel, context_texts: list[str]) -> list[StanceProbabilities]:
+        batch_predict = getattr(model, 'predict_batch', None)
+        if callable(batch_predict):
+            return list(batch_predict(context_texts))
+        return [model.predict(context_text=context_text) for context_text in context_texts]
+
     def _build_model(self, settings: Settings) -> StanceModel:
         if settings.use_finbert:
             try:
@@ -190,32 +296,33 @@ class StanceService:
         self,
         *,
         mention: ExtractedTicker,
-        text: str,
+        normalized_text: str,
         bullish: float,
         bearish: float,
         neutral: float,
     ) -> tuple[StanceLabel, float]:
-        max_label = max((('BULLISH', bullish), ('BEARISH', bearish), ('NEUTRAL', neutral)), key=lambda x: x[1])
-        confidence = max_label[1]
+        # Ties resolve bullish, then bearish, then neutral.
+        if bullish >= bearish and bullish >= neutral:
+            top_label, confidence = StanceLabel.bullish, bullish
+        elif bearish >= neutral:
+            top_label, confidence = StanceLabel.bearish, bearish
+        else:
+            top_label, confidence = StanceLabel.neutral, neutral
         ticker_in_text = mention.source != 'context'
-        short_text = len(normalize_text(text)) < self._settings.unclear_short_text_len
+        short_text = len(normalized_text) < self._settings.unclear_short_text_len
 
         if mention.source == 'context' and not self._settings.allow_context_label_inference:
             label = StanceLabel.unclear
         elif confidence < self._settings.unclear_threshold or (short_text and not ticker_in_text):
             label = StanceLabel.unclear
-        elif max_label[0] == 'BULLISH':
-            label = StanceLabel.bullish
-        elif max_label[0] == 'BEARISH':
-            label = StanceLabel.bearish
         else:
-            label = StanceLabel.neutral
+            label = top_label
         return label, confidence
 
     def _should_use_llm(
         self,
         *,
-        text: str,
+        normalized_text: str,
         mention: ExtractedTicker,
         label: StanceLabel,
         confidence: float,
@@ -224,25 +331,25 @@ class StanceService:
             return False
         if mention.source == 'context' and not self._settings.allow_context_label_inference:
             return False
-        if self._settings.llm_enable_sarcasm_trigger and self._contains_sarcasm_cue(text):
+        if self._settings.llm_enable_sarcasm_trigger and self._contains_sarcasm_cue(normalized_text):
             return True
         if self._settings.llm_unclear_only:
             return label == StanceLabel.unclear or confidence < self._settings.llm_low_confidence_threshold
         return True
 
-    def _contains_sarcasm_cue(self, text: str) -> bool:
-        normalized = normalize_text(text).lower()
-        return any(cue in normalized for cue in SARCASM_CUES)
+    def _contains_sarcasm_cue(self, normalized_text: str) -> bool:
+        lowered = normalized_text.lower()
+        return any(cue in lowered for cue in SARCASM_CUES)
 
-    def _record_llm_usage(self, llm_model: StanceModel) -> None:
+    def _record_llm_usage(self, llm_model: StanceModel, metrics: StanceRuntimeMetrics) -> None:
         getter = getattr(llm_model, 'get_last_usage', None)
         if not callable(getter):
-            self._runtime_metrics.llm_calls_without_usage += 1
+            metrics.llm_calls_without_usage += 1
             return
 
         usage_raw = getter()
         if not isinstance(usage_raw, dict):
-            self._runtime_metrics.llm_calls_without_usage += 1
+            metrics.llm_calls_without_usage += 1
             return
 
         prompt_tokens = self._as_non_negative_int(usage_raw.get('prompt_tokens'))
@@ -252,12 +359,12 @@ class StanceService:
             total_tokens = prompt_tokens + output_tokens
 
         if prompt_tokens == 0 and output_tokens == 0 and total_tokens == 0:
-            self._runtime_metrics.llm_calls_without_usage += 1
+            metrics.llm_calls_without_usage += 1
             return
 
-        self._runtime_metrics.llm_prompt_tokens += prompt_tokens
-        self._runtime_metrics.llm_output_tokens += output_tokens
-        self._runtime_metrics.llm_total_tokens += total_tokens
+        metrics.llm_prompt_tokens += prompt_tokens
+        metrics.llm_output_tokens += output_tokens
+        metrics.llm_total_tokens += total_tokens
 
         input_cost = (
             prompt_tokens * float(self._settings.llm_input_price_per_million_tokens)
@@ -265,7 +372,7 @@ class StanceService:
         output_cost = (
             output_tokens * float(self._settings.llm_output_price_per_million_tokens)
         ) / 1_000_000.0
-        self._runtime_metrics.llm_estimated_cost_usd += (input_cost + output_cost)
+        metrics.llm_estimated_cost_usd += (input_cost + output_cost)
 
     def _as_non_negative_int(self, value: Any) -> int:
         if value is None:
@@ -277,28 +384,16 @@ class StanceService:
         return parsed if parsed > 0 else 0
 
     def _merge_mentions_by_ticker(self, mentions: list[ExtractedTicker]) -> list[ExtractedTicker]:
+        # The stable sort puts each ticker's best mention first (earliest wins ties), so setdefault keeps exactly that one.
         selected: dict[str, ExtractedTicker] = {}
-        for mention in mentions:
-            previous = selected.get(mention.ticker)
-            if previous is None or self._is_better_mention(mention, previous):
-                selected[mention.ticker] = mention
-        return sorted(selected.values(), key=lambda m: m.ticker)
-
-    def _is_better_mention(self, candidate: ExtractedTicker, current: ExtractedTicker) -> bool:
-        source_rank = {
-            'cashtag': 4,
-            'token': 3,
-            'synonym': 2,
-            'context': 1,
-        }
-        candidate_key = (
-            candidate.confidence,
-            source_rank.get(candidate.source, 0),
-            candidate.span_end - candidate.span_start,
-        )
-        current_key = (
-            current.confidence,
-            source_rank.get(current.source, 0),
-            current.span_end - current.span_start,
+        for mention in sorted(mentions, key=self._mention_merge_key):
+            selected.setdefault(mention.ticker, mention)
+        return list(selected.values())
+
+    def _mention_merge_key(self, mention: ExtractedTicker) -> tuple[str, float, int, int]:
+        return (
+            mention.ticker,
+            -mention.confidence,
+            -MENTION_SOURCE_RANK.get(mention.source, 0),
+            mention.span_start - mention.span_end,
         )
-        return candidate_key > current_key
@@ -5,6 +5,7 @@ import json
 import re
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterator
 
 from app.core.config import Settings
 
@@ -64,7 +65,8 @@ class TickerExtractor:
         self._settings = settings
         self._tickers = self._load_ticker_master(settings.ticker_master_file)
         self._synonyms = self._load_synonyms(settings.synonyms_file)
-        self._synonym_patterns: list[tuple[re.Pattern[str], str, str]] = self._build_synonym_patterns(self._synonyms)
+        self._synonym_pattern = self._build_synonym_pattern(self._synonyms)
+        self._synonym_prefixes = self._build_synonym_prefixes(self._synonyms)
         self._stoplist = self._load_stoplist(settings.stoplist_file)
         self._hard_ignore_without_cashtag = set(HARD_IGNORE_WITHOUT_CASHTAG)
         self._ambiguous_tickers_require_context = set(AMBIGUOUS_TICKERS_REQUIRE_CONTEXT)
@@ -118,25 +120,27 @@ class TickerExtractor:
                 conf = self._confidence(text, match.start(), match.end(), base=0.65)
                 candidates.append(ExtractedTicker(ticker=ticker, confidence=conf, source='token', span_start=match.start(), span_end=match.end()))
 
-        for pattern, ticker, phrase in self._synonym_patterns:
-            for match in pattern.finditer(text):
+        if self._synonym_pattern is not None:
+            for span_start, phrase in self._iter_synonym_matches(text):
+                ticker = self._synonyms[phrase]
+                span_end = span_start + len(phrase)
                 if not self._is_valid_ticker(
                     ticker,
                     source='synonym',
                     text=text,
-                    span_start=match.start(),
-                    span_end=match.end(),
+                    span_start=span_start,
+                    span_end=span_end,
                     synonym_phrase=phrase,
                 ):
                     continue
-                conf = self._confidence(text, match.start(), match.end(), base=0.70)
+                conf = self._confidence(text, span_start, span_end, base=0.70)
                 candidates.append(
                     ExtractedTicker(
                         ticker=ticker,
                         confidence=conf,
                         source='synonym',
-                        span_start=match.start(),
-                        span_end=match.end(),
+                        span_start=span_start,
+                        span_end=span_end,
                     )
                 )
 
@@ -151,6 +155,23 @@ class TickerExtractor:
     def extract_tickers_only(self, text: str) -> set[str]:
         return {m.ticker for m in self.extract(text)}
 
+    def _iter_synonym_matches(self, text: str) -> Iterator[tuple[int, str]]:
+        # The zero-width pattern reports every start position, so overlapping phrases are all found. At each start
+        # the alternation captures the longest phrase; shorter phrases there are its prefixes and are checked directly.
+        pattern = self._synonym_pattern
+        if pattern is None:
+            return
+        for match in pattern.finditer(text):
+            start = match.start()
+            longest = match.group(1).lower()
+            if longest not in self._synonyms:
+                continue
+            yield start, longest
+            for prefix in self._synonym_prefixes.get(longest, ()):
+                end = start + len(prefix)
+                if end == len(text) or not text[end].isascii() or not text[end].isalnum():
+                    yield start, prefix
+
     def _confidence(self, text: str, start: int, end: int, base: float) -> float:
         bonus = 0.1 if self._has_finance_context(text, start, end) else 0.0
         return min(base + bonus, 0.99)
@@ -216,10 +237,18 @@ class TickerExtractor:
         data = json.loads(path.read_text(encoding='utf-8'))
         return {str(item).upper() for item in data}
 
-    def _build_synonym_patterns(self, synonyms: dict[str, str]) -> list[tuple[re.Pattern[str], str, str]]:
-        patterns: list[tuple[re.Pattern[str], str, str]] = []
-        for phrase, ticker in sorted(synonyms.items(), key=lambda item: len(item[0]), reverse=True):
-            escaped = re.escape(phrase)
-            pattern = re.compile(rf'(?<![A-Za-z0-9]){escaped}(?![A-Za-z0-9])', re.IGNORECASE)
-            patterns.append((pattern, ticker, phrase))
-        return patterns
+    def _build_synonym_pattern(self, synonyms: dict[str, str]) -> re.Pattern[str] | None:
+        if not synonyms:
+            return None
+        # One alternation (longest phrase first) scans each text once instead of once per synonym.
+        alternation = '|'.join(re.escape(phrase) for phrase in sorted(synonyms, key=len, reverse=True))
+        return re.compile(rf'(?<![A-Za-z0-9])(?=({alternation})(?![A-Za-z0-9]))', re.IGNORECASE)
+
+    def _build_synonym_prefixes(self, synonyms: dict[str, str]) -> dict[str, tuple[str, ...]]:
+        # Shorter synonyms that start the same way, longest first, e.g. 'apple inc' -> ('apple',).
+        prefixes: dict[str, tuple[str, ...]] = {}
+        for phrase in synonyms:
+            shorter = sorted((other for other in synonyms if other != phrase and phrase.startswith(other)), key=len, reverse=True)
+            if shorter:
+                prefixes[phrase] = tuple(shorter)
+        return prefixes
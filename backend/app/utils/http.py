@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import httpx
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LoopBoundAsyncClient:
+    """Lazily opens one pooled httpx.AsyncClient and reopens it when used from a different event loop."""
+
+    def __init__(self, *, name: str, max_keepalive_connections: int, user_agent: str) -> None:
+        self._name = name
+        self._max_keepalive_connections = max(int(max_keepalive_connections), 1)
+        self._user_agent = user_agent
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def get(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # Pooled connections belong to the loop that opened them; a later asyncio.run() gets its own client.
+            if self._client is not None:
+                LOGGER.debug('Reopening %s HTTP client for a new event loop', self._name)
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(connect=3.0, read=8.0, write=8.0, pool=8.0),
+                limits=httpx.Limits(max_keepalive_connections=self._max_keepalive_connections, keepalive_expiry=30.0),
+                follow_redirects=True,
+                headers={'User-Agent': self._user_agent},
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        client = self._client
+        owner_loop = self._loop
+        self._client = None
+        self._loop = None
+        if client is None:
+            return
+        if owner_loop is asyncio.get_running_loop():
+            await client.aclose()
+            return
+        # The owner loop is gone or not running here, so its sockets cannot be closed from this loop.
+        LOGGER.warning(
+            'Dropping %s HTTP client opened on another event loop without aclose(); '
+            'its pooled connections are released when it is garbage-collected',
+            self._name,
+        )
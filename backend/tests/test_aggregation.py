@@ -61,3 +61,40 @@ def test_aggregation_weighted_and_unweighted() -> None:
     assert abs(row.weighted_denominator - (math.log(10) + math.log(4))) < 1e-6
     assert row.score_stddev_unweighted > 0
     assert row.ci95_low_unweighted <= row.score_unweighted <= row.ci95_high_unweighted
+
+
+def test_aggregation_accepts_iterables_and_handles_all_unclear_ticker() -> None:
+    now = datetime(2026, 2, 11, 12, 0, tzinfo=timezone.utc)
+    rows = [
+        ('AAPL', 'NEUTRAL', 0.0, 0),
+        ('TSLA', 'UNCLEAR', 0.0, 5),
+        ('TSLA', 'UNCLEAR', 0.0, 1),
+    ]
+
+    scores = compute_daily_scores(
+        (
+            AggregationRecord(
+                ticker=ticker,
+                stance_label=label,
+                stance_score=score,
+                upvote_score=upvotes,
+                depth=0,
+                created_utc=now,
+            )
+            for ticker, label, score, upvotes in rows
+        ),
+        use_depth_decay=True,
+        lambda_depth=0.15,
+        use_time_decay=True,
+        lambda_time=0.05,
+        reference_time=now,
+    )
+
+    assert scores['AAPL'].neutral_count == 1
+    assert scores['AAPL'].valid_count == 1
+    assert scores['AAPL'].weighted_denominator == 0.0
+    assert scores['AAPL'].score_weighted == 0.0
+    assert scores['TSLA'].mention_count == 2
+    assert scores['TSLA'].valid_count == 0
+    assert scores['TSLA'].unclear_rate == 1.0
+    assert scores['TSLA'].ci95_low_unweighted == scores['TSLA'].ci95_high_unweighted == 0.0
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+from app.core.event_loop import configure_event_loop
+
+
+def test_event_loop_setting_rejects_unknown_values() -> None:
+    with pytest.raises(ValidationError):
+        Settings(event_loop='uvlop')
+
+
+def test_configure_event_loop_keeps_stdlib_loop_when_requested() -> None:
+    assert configure_event_loop(Settings(event_loop='asyncio')) == 'asyncio'
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pytest
+
+from app.utils.http import LoopBoundAsyncClient
+
+
+def _holder() -> LoopBoundAsyncClient:
+    return LoopBoundAsyncClient(name='test', max_keepalive_connections=2, user_agent='test-agent')
+
+
+def test_client_is_reused_within_a_loop_and_closed_on_it() -> None:
+    holder = _holder()
+
+    async def _run():
+        first = holder.get()
+        assert holder.get() is first
+        await holder.aclose()
+        return first
+
+    client = asyncio.run(_run())
+
+    assert client.is_closed
+    assert client.headers['User-Agent'] == 'test-agent'
+
+
+def test_client_is_reopened_per_loop_and_cross_loop_close_is_logged(caplog: pytest.LogCaptureFixture) -> None:
+    holder = _holder()
+
+    async def _get():
+        return holder.get()
+
+    first = asyncio.run(_get())
+    second = asyncio.run(_get())
+    assert second is not first
+
+    with caplog.at_level(logging.WARNING, logger='app.utils.http'):
+        asyncio.run(holder.aclose())
+
+    assert not second.is_closed
+    assert 'opened on another event loop' in caplog.text
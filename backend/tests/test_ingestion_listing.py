@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.core.config import get_settings
+from app.services.ingestion_service import IngestionService
+
+
+class _PagedRedditClient:
+    def __init__(self, pages: list[list[str]], fail_after: int | None = None) -> None:
+        self._pages = pages
+        self._fail_after = fail_after
+        self.requested_after: list[str | None] = []
+
+    async def get_top_listing(self, subreddit, sort, t_param, limit, *, after=None):
+        self.requested_after.append(after)
+        page_idx = 0 if after is None else int(after.removeprefix('page'))
+        if self._fail_after is not None and page_idx >= self._fail_after:
+            raise RuntimeError('listing failed')
+        children = [
+            {'kind': 't3', 'data': {'id': post_id, 'subreddit': subreddit, 'created_utc': 1_893_456_000}}
+            for post_id in self._pages[page_idx]
+        ]
+        next_after = f'page{page_idx + 1}' if page_idx + 1 < len(self._pages) else None
+        return {'kind': 'Listing', 'data': {'children': children, 'after': next_after}}
+
+
+def _build_service(**overrides) -> IngestionService:
+    settings = get_settings().model_copy(update=overrides)
+    return IngestionService(settings=settings)
+
+
+def test_fetch_listing_posts_follows_cursor_and_dedupes() -> None:
+    service = _build_service(pull_max_pages=5, pull_limit=2)
+    client = _PagedRedditClient([['a', 'b'], ['b', 'c'], ['d']])
+
+    posts = asyncio.run(service._fetch_listing_posts(reddit_client=client, subreddit='stocks'))
+
+    assert [post.id for post in posts] == ['a', 'b', 'c', 'd']
+    assert client.requested_after == [None, 'page1', 'page2']
+
+
+def test_fetch_listing_posts_respects_max_pages_and_keeps_partial_results() -> None:
+    capped = _build_service(pull_max_pages=2, pull_limit=2)
+    capped_client = _PagedRedditClient([['a'], ['b'], ['c']])
+    capped_posts = asyncio.run(capped._fetch_listing_posts(reddit_client=capped_client, subreddit='stocks'))
+
+    failing = _build_service(pull_max_pages=3, pull_limit=2)
+    failing_client = _PagedRedditClient([['a'], ['b'], ['c']], fail_after=1)
+    failing_posts = asyncio.run(failing._fetch_listing_posts(reddit_client=failing_client, subreddit='stocks'))
+
+    assert [post.id for post in capped_posts] == ['a', 'b']
+    assert capped_client.requested_after == [None, 'page1']
+    assert [post.id for post in failing_posts] == ['a']
@@ -71,3 +71,33 @@ def test_expand_morechildren_zero_batch_cap_means_unlimited() -> None:
     assert len(comments) == 3
     assert {row.id for row in comments} == {'c1', 'c2', 'c3'}
 
+
+def test_expand_morechildren_fetches_chunks_of_one_node_concurrently() -> None:
+    service = _build_service(reddit_morechildren_chunk_size=2, reddit_morechildren_max_batches=0)
+
+    class _SlowClient(_FakeRedditClient):
+        def __init__(self) -> None:
+            super().__init__()
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+        async def get_morechildren(self, post_id: str, children: list[str], sort: str = 'confidence') -> dict:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            return await super().get_morechildren(post_id, children, sort)
+
+    client = _SlowClient()
+    comments = asyncio.run(
+        service._expand_morechildren(
+            reddit_client=client,
+            submission_id='post1',
+            initial_comments=[],
+            initial_pending_more=[PendingMore(parent_id='post1', depth=0, children=['c1', 'c2', 'c3', 'c4', 'c5'])],
+        )
+    )
+
+    assert client.calls == [['c1', 'c2'], ['c3', 'c4'], ['c5']]
+    assert client.max_in_flight == 3
+    assert {row.id for row in comments} == {'c1', 'c2', 'c3', 'c4', 'c5'}
@@ -0,0 +1,912 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete, event, select
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal, engine
+from app.models.comment import Comment
+from app.models.daily_score import DailyScore
+from app.models.external_content import ExternalContent
+from app.models.image import Image
+from app.models.mention import Mention
+from app.models.pull_run import PullRun
+from app.models.stance import Stance
+from app.models.submission import Submission
+from app.schemas.reddit import ParsedComment, ParsedSubmission
+from app.services.external_extractor import ExtractionResult
+from app.services.image_service import ImageCandidate, ImageDownloadResult
+from app.services.ingestion_service import IngestionService
+
+
+class _FakeRedditClient:
+    def __init__(self, posts: dict[str, list[str]]) -> None:
+        self._posts = posts
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_top_listing(self, subreddit, sort, t_param, limit, *, after=None):
+        children = [
+            {
+                'kind': 't3',
+                'data': {
+                    'id': post_id,
+                    'subreddit': subreddit,
+                    'created_utc': 1_893_456_000,
+                    'title': f'{post_id} $AAPL thread',
+                    'selftext': '',
+                    'url': f'https://www.reddit.com/r/{subreddit}/comments/{post_id}',
+                    'score': 10,
+                    'num_comments': len(bodies),
+                    'permalink': f'/r/{subreddit}/comments/{post_id}',
+                },
+            }
+            for post_id, bodies in self._posts.items()
+        ]
+        return {'kind': 'Listing', 'data': {'children': children, 'after': None}}
+
+    async def get_thread(self, post_id: str, limit=None, depth=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if post_id.endswith('broken'):
+            raise RuntimeError('thread fetch failed')
+        comments = [
+            {
+                'kind': 't1',
+                'data': {
+                    'id': f'{post_id}-c{idx}',
+                    'parent_id': f't3_{post_id}',
+                    'author': 'tester',
+                    'created_utc': 1_893_456_000,
+                    'score': 2,
+                    'body': body,
+                    'permalink': f'/r/stocks/comments/{post_id}/_/c{idx}/',
+                    'replies': '',
+                },
+            }
+            for idx, body in enumerate(self._posts[post_id])
+        ]
+        return [
+            {'kind': 'Listing', 'data': {'children': [{'kind': 't3', 'data': {'id': post_id, 'created_utc': 1_893_456_000}}]}},
+            {'kind': 'Listing', 'data': {'children': comments}},
+        ]
+
+    async def get_morechildren(self, post_id: str, children: list[str], sort: str = 'confidence') -> dict:
+        return {}
+
+    def get_rate_limit_snapshot(self):
+        return None
+
+
+def _comment(comment_id: str, body: str, parent_id: str | None = 'persist-post') -> ParsedComment:
+    return ParsedComment(
+        id=comment_id,
+        submission_id='persist-post',
+        parent_id=parent_id,
+        depth=0,
+        author='tester',
+        created_utc=datetime(2026, 2, 11, 12, 0, tzinfo=timezone.utc),
+        score=3,
+        body=body,
+        permalink=f'/r/stocks/comments/persist-post/_/{comment_id}/',
+    )
+
+
+def test_analyze_thread_bulk_inserts_mentions_and_stance() -> None:
+    service = IngestionService(settings=get_settings())
+    submission = SimpleNamespace(id='persist-post', title='Market thread', selftext='')
+    comments = [
+        _comment('pc1', '$AAPL calls are looking strong'),
+        _comment('pc2', 'TSLA and $AAPL both rally today'),
+        _comment('pc3', 'nothing to see here'),
+    ]
+
+    with SessionLocal() as session:
+        session.execute(delete(Mention).where(Mention.target_id.in_(['pc1', 'pc2', 'pc3'])))
+        session.execute(delete(Stance).where(Stance.target_id.in_(['pc1', 'pc2', 'pc3'])))
+
+        mention_rows, stance_rows = asyncio.run(
+            service._analyze_thread(
+                submission=submission,
+                parsed_comments=comments,
+            )
+        )
+        service._insert_analysis_rows(session, mention_rows, stance_rows)
+        session.commit()
+
+        stored = session.execute(
+            select(Stance.target_id, Stance.ticker).where(Stance.target_id.in_(['pc1', 'pc2', 'pc3']))
+        ).all()
+        stored_mentions = session.execute(
+            select(Mention.target_id, Mention.ticker).where(Mention.target_id.in_(['pc1', 'pc2', 'pc3']))
+        ).all()
+
+    assert len(mention_rows) == 3
+    assert len(stance_rows) == 3
+    assert sorted(stored) == [('pc1', 'AAPL'), ('pc2', 'AAPL'), ('pc2', 'TSLA')]
+    assert sorted(stored_mentions) == sorted(stored)
+
+
+def test_recompute_daily_scores_replaces_rows_for_bucket() -> None:
+    service = IngestionService(settings=get_settings())
+    bucket = date(2031, 1, 6)
+    created = datetime(2031, 1, 6, 9, 0, tzinfo=timezone.utc)
+
+    with SessionLocal() as session:
+        pull_run = PullRun(
+            pulled_at_utc=created,
+            date_bucket_berlin=bucket,
+            subreddit='persist_sub',
+            sort='top',
+            t_param='day',
+            limit=5,
+            status='running',
+        )
+        session.add(pull_run)
+        session.flush()
+        session.add(
+            Submission(
+                id='persist-agg',
+                subreddit='persist_sub',
+                created_utc=created,
+                title='AAPL thread',
+                selftext='',
+                url='https://example.com',
+                score=12,
+                num_comments=0,
+                permalink='/r/persist_sub/comments/persist-agg',
+                pull_run_id=pull_run.id,
+            )
+        )
+        session.add(
+            Stance(
+                target_type='submission',
+                target_id='persist-agg',
+                ticker='AAPL',
+                stance_label='BULLISH',
+                stance_score=0.6,
+                confidence=0.8,
+                model_version='test',
+                context_text='',
+            )
+        )
+        session.add(
+            DailyScore(
+                date_bucket_berlin=bucket,
+                subreddit='persist_sub',
+                ticker='STALE',
+                mention_count=1,
+            )
+        )
+        session.commit()
+
+        service._recompute_daily_scores(session=session, date_bucket=bucket, subreddit='persist_sub')
+        session.commit()
+
+        rows = session.execute(
+            select(DailyScore).where(DailyScore.date_bucket_berlin == bucket, DailyScore.subreddit == 'persist_sub')
+        ).scalars().all()
+
+    assert [row.ticker for row in rows] == ['AAPL']
+    assert rows[0].mention_count == 1
+    assert rows[0].bullish_count == 1
+    assert abs(rows[0].score_unweighted - 0.6) < 1e-9
+
+
+def test_pull_fetches_threads_concurrently_and_persists_serially() -> None:
+    settings = get_settings().model_copy(update={'reddit_max_concurrency': 3, 'pull_limit': 10})
+    service = IngestionService(settings=settings)
+    client = _FakeRedditClient(
+        {
+            'pullp1': ['$TSLA puts are printing', 'meh'],
+            'pullp2': ['$MSFT looks strong'],
+            'pullp3': [],
+            'pullp4broken': ['never stored'],
+        }
+    )
+
+    with SessionLocal() as session:
+        result = asyncio.run(
+            service._pull_with_client(session=session, subreddit='pull_sub', reddit_client=client)
+        )
+        comment_ids = session.execute(
+            select(Comment.id).where(Comment.submission_id.in_(['pullp1', 'pullp2', 'pullp3', 'pullp4broken']))
+        ).scalars().all()
+        stored_submission = session.get(Submission, 'pullp4broken')
+
+    assert client.max_in_flight > 1
+    assert result.status == 'success'
+    assert result.submissions == 3
+    assert result.comments == 3
+    assert result.error is not None and 'pullp4broken' in result.error
+    assert sorted(comment_ids) == ['pullp1-c0', 'pullp1-c1', 'pullp2-c0']
+    assert stored_submission is None
+
+
+def test_pull_rolls_back_only_the_failing_submission(monkeypatch) -> None:
+    settings = get_settings().model_copy(update={'pull_commit_batch_size': 10})
+    service = IngestionService(settings=settings)
+    client = _FakeRedditClient(
+        {
+            'savep1': ['$AAPL calls all day'],
+            'savep2': ['$TSLA puts forever'],
+        }
+    )
+    original_store_images = service._store_images
+
+    def _store_images(session, submission_id, image_rows, **kwargs):
+        if submission_id == 'savep2':
+            raise RuntimeError('image storage failed')
+        original_store_images(session, submission_id, image_rows, **kwargs)
+
+    monkeypatch.setattr(service, '_store_images', _store_images)
+
+    with SessionLocal() as session:
+        result = asyncio.run(
+            service._pull_with_client(session=session, subreddit='savepoint_sub', reddit_client=client)
+        )
+
+    with SessionLocal() as session:
+        comment_ids = session.execute(
+            select(Comment.id).where(Comment.submission_id.in_(['savep1', 'savep2']))
+        ).scalars().all()
+        stance_targets = session.execute(
+            select(Stance.target_id).where(Stance.target_id.in_(['savep1', 'savep2', 'savep1-c0', 'savep2-c0']))
+        ).scalars().all()
+        failed_submission = session.get(Submission, 'savep2')
+
+    assert result.status == 'success'
+    assert result.submissions == 1
+    assert 'savep2: image storage failed' in (result.error or '')
+    assert comment_ids == ['savep1-c0']
+    assert sorted(stance_targets) == ['savep1', 'savep1-c0']
+    assert failed_submission is None
+
+
+def test_pull_deletes_comments_missing_from_refetched_thread() -> None:
+    service = IngestionService(settings=get_settings())
+
+    with SessionLocal() as session:
+        asyncio.run(
+            service._pull_with_client(
+                session=session,
+                subreddit='stale_sub',
+                reddit_client=_FakeRedditClient({'stalep1': ['$AAPL first', '$AAPL second']}),
+            )
+        )
+        asyncio.run(
+            service._pull_with_client(
+                session=session,
+                subreddit='stale_sub',
+                reddit_client=_FakeRedditClient({'stalep1': ['$AAPL first']}),
+            )
+        )
+
+    with SessionLocal() as session:
+        comment_ids = session.execute(select(Comment.id).where(Comment.submission_id == 'stalep1')).scalars().all()
+        stance_targets = session.execute(
+            select(Stance.target_id).where(Stance.target_id.in_(['stalep1-c0', 'stalep1-c1']))
+        ).scalars().all()
+
+    assert comment_ids == ['stalep1-c0']
+    assert stance_targets == ['stalep1-c0']
+
+
+def test_external_content_upsert_updates_existing_row() -> None:
+    service = IngestionService(settings=get_settings())
+    created = datetime(2031, 1, 7, 9, 0, tzinfo=timezone.utc)
+
+    with SessionLocal() as session:
+        pull_run = PullRun(
+            pulled_at_utc=created,
+            date_bucket_berlin=date(2031, 1, 7),
+            subreddit='upsert_sub',
+            sort='top',
+            t_param='day',
+            limit=5,
+            status='running',
+        )
+        session.add(pull_run)
+        session.flush()
+        session.add(
+            Submission(
+                id='upsert-ext',
+                subreddit='upsert_sub',
+                created_utc=created,
+                title='external link',
+                selftext='',
+                url='https://example.com/a',
+                score=1,
+                num_comments=0,
+                permalink='/r/upsert_sub/comments/upsert-ext',
+                pull_run_id=pull_run.id,
+            )
+        )
+        session.commit()
+
+        for status in ('fetch_failed', 'ok_trafilatura'):
+            service._upsert_external_content(
+                session=session,
+                submission_id='upsert-ext',
+                url='https://example.com/a',
+                title='',
+                text='body',
+                status=status,
+            )
+            session.commit()
+
+        rows = session.execute(
+            select(ExternalContent).where(ExternalContent.submission_id == 'upsert-ext')
+        ).scalars().all()
+
+    assert len(rows) == 1
+    assert rows[0].status == 'ok_trafilatura'
+
+
+def test_analyze_thread_resolves_parent_text_from_comment_index() -> None:
+    settings = get_settings().model_copy(update={'inherit_parent_tickers_for_comments': True})
+    service = IngestionService(settings=settings)
+    submission = SimpleNamespace(id='persist-post', title='Market thread', selftext='')
+    parent = _comment('pp1', '$NVDA is my biggest position')
+    reply = _comment('pp2', 'same here', parent_id='pp1')
+
+    with SessionLocal() as session:
+        session.execute(delete(Stance).where(Stance.target_id.in_(['pp1', 'pp2'])))
+        session.execute(delete(Mention).where(Mention.target_id.in_(['pp1', 'pp2'])))
+
+        mention_rows, stance_rows = asyncio.run(
+            service._analyze_thread(
+                submission=submission,
+                parsed_comments=[parent, reply],
+            )
+        )
+        service._insert_analysis_rows(session, mention_rows, stance_rows)
+        session.commit()
+
+        stored = session.execute(
+            select(Stance.target_id, Stance.ticker).where(Stance.target_id.in_(['pp1', 'pp2']))
+        ).all()
+
+    assert sorted(stored) == [('pp1', 'NVDA'), ('pp2', 'NVDA')]
+
+
+class _FakeImageService:
+    def __init__(self, urls: list[str]) -> None:
+        self._urls = urls
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def collect_candidates(self, submission_data: dict) -> list[ImageCandidate]:
+        return [ImageCandidate(url=url, width=640, height=480) for url in self._urls]
+
+    async def download_if_enabled(self, url: str, date_bucket: str, submission_id: str) -> ImageDownloadResult:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return ImageDownloadResult(local_path=f'data/images/{date_bucket}/{submission_id}/{url[-5:]}', status='downloaded')
+
+
+def test_store_images_downloads_candidates_concurrently_with_cap() -> None:
+    settings = get_settings().model_copy(update={'image_download_concurrency': 2})
+    service = IngestionService(settings=settings)
+    urls = [f'https://i.example.com/img{idx}.png' for idx in range(5)]
+    fake_images = _FakeImageService(urls)
+    service._image_service = fake_images
+    created = datetime(2031, 1, 8, 9, 0, tzinfo=timezone.utc)
+    submission = ParsedSubmission(
+        id='image-post',
+        subreddit='image_sub',
+        created_utc=created,
+        title='charts',
+        selftext='',
+        url=urls[0],
+        score=1,
+        num_comments=0,
+        permalink='/r/image_sub/comments/image-post',
+        raw={},
+    )
+
+    with SessionLocal() as session:
+        pull_run = PullRun(
+            pulled_at_utc=created,
+            date_bucket_berlin=date(2031, 1, 8),
+            subreddit='image_sub',
+            sort='top',
+            t_param='day',
+            limit=5,
+            status='running',
+        )
+        session.add(pull_run)
+        session.flush()
+        service._upsert_submission(session, submission, pull_run.id)
+        image_rows = asyncio.run(service._download_images(submission, submission.raw, '2031-01-08'))
+        service._store_images(session, submission.id, image_rows)
+        session.commit()
+
+        rows = session.execute(
+            select(Image.image_url, Image.status).where(Image.submission_id == 'image-post')
+        ).all()
+
+    assert fake_images.max_in_flight == 2
+    assert sorted(rows) == [(url, 'downloaded') for url in urls]
+
+
+def test_recompute_daily_scores_merges_submission_and_comment_stances() -> None:
+    settings = get_settings().model_copy(update={'use_depth_decay': True})
+    service = IngestionService(settings=settings)
+    bucket = date(2031, 1, 9)
+    created = datetime(2031, 1, 9, 9, 0, tzinfo=timezone.utc)
+
+    with SessionLocal() as session:
+        pull_run = PullRun(
+            pulled_at_utc=created,
+            date_bucket_berlin=bucket,
+            subreddit='merge_sub',
+            sort='top',
+            t_param='day',
+            limit=5,
+            status='running',
+        )
+        session.add(pull_run)
+        session.flush()
+        session.add(
+            Submission(
+                id='merge-agg',
+                subreddit='merge_sub',
+                created_utc=created,
+                title='AAPL thread',
+                selftext='',
+                url='https://example.com',
+                score=5,
+                num_comments=2,
+                permalink='/r/merge_sub/comments/merge-agg',
+                pull_run_id=pull_run.id,
+            )
+        )
+        session.flush()
+        for comment_id, depth in (('merge-c1', 0), ('merge-c2', 1)):
+            session.add(
+                Comment(
+                    id=comment_id,
+                    submission_id='merge-agg',
+                    parent_id='merge-agg',
+                    depth=depth,
+                    author='tester',
+                    created_utc=created,
+                    score=1,
+                    body='',
+                    permalink=f'/r/merge_sub/comments/merge-agg/_/{comment_id}/',
+                )
+            )
+        for target_type, target_id, ticker, label, score in (
+            ('submission', 'merge-agg', 'AAPL', 'BULLISH', 0.5),
+            ('comment', 'merge-c1', 'AAPL', 'BEARISH', -0.5),
+            ('comment', 'merge-c2', 'TSLA', 'BULLISH', 0.9),
+            ('comment', 'merge-orphan', 'TSLA', 'BULLISH', 0.9),
+        ):
+            session.add(
+                Stance(
+                    target_type=target_type,
+                    target_id=target_id,
+                    ticker=ticker,
+                    stance_label=label,
+                    stance_score=score,
+                    confidence=0.8,
+                    model_version='test',
+                    context_text='',
+                )
+            )
+        session.commit()
+
+        statements: list[str] = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append(statement)
+
+        def recompute(*, in_sql: bool) -> dict[str, DailyScore]:
+            service._supports_sql_aggregation = lambda session: in_sql
+            event.listen(engine, 'before_cursor_execute', _record)
+            try:
+                service._recompute_daily_scores(session=session, date_bucket=bucket, subreddit='merge_sub')
+            finally:
+                event.remove(engine, 'before_cursor_execute', _record)
+            session.commit()
+            return {
+                row.ticker: row
+                for row in session.execute(
+                    select(DailyScore).where(DailyScore.date_bucket_berlin == bucket, DailyScore.subreddit == 'merge_sub')
+                ).scalars()
+            }
+
+        folded = {ticker: _score_values(row) for ticker, row in recompute(in_sql=False).items()}
+        rows = recompute(in_sql=True)
+        grouped = {ticker: _score_values(row) for ticker, row in rows.items()}
+
+    assert sorted(rows) == ['AAPL', 'TSLA']
+    assert rows['AAPL'].mention_count == 2
+    assert rows['AAPL'].bullish_count == 1
+    assert rows['AAPL'].bearish_count == 1
+    assert abs(rows['AAPL'].score_unweighted) < 1e-9
+    assert rows['TSLA'].mention_count == 1
+    assert rows['TSLA'].weighted_denominator > 0
+    assert grouped.keys() == folded.keys()
+    # Only the aggregated columns are projected; full Submission/Comment rows are never loaded.
+    assert statements and not any('.body' in sql or '.selftext' in sql or '.raw' in sql for sql in statements)
+    for ticker, values in grouped.items():
+        assert values == pytest.approx(folded[ticker], abs=1e-9)
+
+
+def test_sql_and_python_aggregation_agree_on_stddev_for_clustered_scores() -> None:
+    service = IngestionService(settings=get_settings())
+    bucket = date(2031, 1, 10)
+    created = datetime(2031, 1, 10, 9, 0, tzinfo=timezone.utc)
+    # A tight cluster far from zero: E[x^2] - E[x]^2 cancels almost every digit, the two-pass form does not.
+    scores = [0.9 + 1e-6 * (idx % 5) for idx in range(40)] + [0.1, 0.1, 0.1, 0.7]
+
+    with SessionLocal() as session:
+        pull_run = PullRun(
+            pulled_at_utc=created,
+            date_bucket_berlin=bucket,
+            subreddit='stddev_sub',
+            sort='top',
+            t_param='day',
+            limit=5,
+            status='running',
+        )
+        session.add(pull_run)
+        session.flush()
+        session.add(
+            Submission(
+                id='stddev-post',
+                subreddit='stddev_sub',
+                created_utc=created,
+                title='MSFT thread',
+                selftext='',
+                url='https://example.com',
+                score=3,
+                num_comments=len(scores),
+                permalink='/r/stddev_sub/comments/stddev-post',
+                pull_run_id=pull_run.id,
+            )
+        )
+        session.flush()
+        for idx, score in enumerate(scores):
+            comment_id = f'stddev-c{idx}'
+            session.add(
+                Comment(
+                    id=comment_id,
+                    submission_id='stddev-post',
+                    parent_id='stddev-post',
+                    depth=0,
+                    author='tester',
+                    created_utc=created,
+                    score=idx,
+                    body='',
+                    permalink=f'/r/stddev_sub/comments/stddev-post/_/{comment_id}/',
+                )
+            )
+            session.add(
+                Stance(
+                    target_type='comment',
+                    target_id=comment_id,
+                    ticker='MSFT' if idx < 40 else 'NVDA',
+                    stance_label='BULLISH',
+                    stance_score=score,
+                    confidence=0.8,
+                    model_version='test',
+                    context_text='',
+                )
+            )
+        session.commit()
+
+        def recompute(*, in_sql: bool) -> dict[str, tuple[float, ...]]:
+            service._supports_sql_aggregation = lambda session: in_sql
+            service._recompute_daily_scores(session=session, date_bucket=bucket, subreddit='stddev_sub')
+            session.commit()
+            return {
+                row.ticker: _score_values(row)
+                for row in session.execute(
+                    select(DailyScore).where(DailyScore.date_bucket_berlin == bucket, DailyScore.subreddit == 'stddev_sub')
+                ).scalars()
+            }
+
+        in_python = recompute(in_sql=False)
+        in_sql = recompute(in_sql=True)
+
+    assert in_python.keys() == in_sql.keys() == {'MSFT', 'NVDA'}
+    for ticker, values in in_sql.items():
+        assert values == pytest.approx(in_python[ticker], rel=1e-12, abs=1e-12)
+
+
+def _score_values(row: DailyScore) -> tuple[float, ...]:
+    return (
+        row.mention_count,
+        row.bullish_count,
+        row.bearish_count,
+        row.neutral_count,
+        row.unclear_count,
+        row.valid_count,
+        row.score_unweighted,
+        row.score_weighted,
+        row.score_stddev_unweighted,
+        row.ci95_low_unweighted,
+        row.ci95_high_unweighted,
+        row.weighted_numerator,
+        row.weighted_denominator,
+        row.unclear_rate,
+    )
+
+
+def test_is_external_url_skips_reddit_hosts() -> None:
+    service = IngestionService(settings=get_settings())
+
+    assert service._is_external_url('https://www.reddit.com/r/stocks/comments/abc') is False
+    assert service._is_external_url('https://i.redd.it/chart.png') is False
+    assert service._is_external_url('http://np.reddit.com/r/stocks') is False
+    assert service._is_external_url('/r/stocks/comments/abc') is False
+    assert service._is_external_url('https://www.reuters.com/markets/') is True
+    assert service._is_external_url('https://NP.Reddit.com:443/r/stocks') is False
+    assert service._is_external_url('https://notreddit.com/post') is True
+
+
+def test_pull_emits_one_processing_update_per_submission() -> None:
+    service = IngestionService(settings=get_settings())
+    updates = []
+
+    with SessionLocal() as session:
+        asyncio.run(
+            service._pull_with_client(
+                session=session,
+                subreddit='progress_sub',
+                reddit_client=_FakeRedditClient({'progp1': ['$AAPL up'], 'progp2': []}),
+                on_progress=updates.append,
+            )
+        )
+
+    processing = [u for u in updates if u.phase == 'processing_submission']
+    assert [u.processed_submissions for u in processing] == [1, 2]
+    assert sorted(u.current_submission_id for u in processing) == ['progp1', 'progp2']
+    assert [u.phase for u in updates][-2:] == ['aggregating', 'finished']
+
+
+def test_pull_upserts_existing_submission_and_comments_in_place() -> None:
+    service = IngestionService(settings=get_settings())
+
+    with SessionLocal() as session:
+        for bodies in (['$AAPL first draft'], ['$AAPL edited body']):
+            asyncio.run(
+                service._pull_with_client(
+                    session=session,
+                    subreddit='upsert_pull_sub',
+                    reddit_client=_FakeRedditClient({'upsertp1': bodies}),
+                )
+            )
+
+    with SessionLocal() as session:
+        comments = session.execute(
+            select(Comment.id, Comment.body).where(Comment.submission_id == 'upsertp1')
+        ).all()
+        submission = session.get(Submission, 'upsertp1')
+        latest_run_id = session.execute(
+            select(PullRun.id).where(PullRun.subreddit == 'upsert_pull_sub').order_by(PullRun.id.desc())
+        ).scalars().first()
+
+    assert comments == [('upsertp1-c0', '$AAPL edited body')]
+    assert submission is not None
+    assert submission.pull_run_id == latest_run_id
+
+
+def test_analysis_rows_are_written_with_one_executemany_per_table() -> None:
+    service = IngestionService(settings=get_settings())
+    submission = SimpleNamespace(id='persist-post', title='Market thread', selftext='')
+    comments = [_comment(f'em{idx}', f'$AAPL and $TSLA take {idx}') for idx in range(5)]
+    inserts: list[tuple[str, bool]] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith(('INSERT INTO mentions ', 'INSERT INTO stance ')):
+            inserts.append((statement.split()[2], executemany))
+
+    with SessionLocal() as session:
+        session.execute(delete(Mention).where(Mention.target_id.in_([c.id for c in comments])))
+        session.execute(delete(Stance).where(Stance.target_id.in_([c.id for c in comments])))
+        mention_rows, stance_rows = asyncio.run(
+            service._analyze_thread(
+                submission=submission,
+                parsed_comments=comments,
+            )
+        )
+        event.listen(engine, 'before_cursor_execute', _record)
+        try:
+            service._insert_analysis_rows(session, mention_rows, stance_rows)
+        finally:
+            event.remove(engine, 'before_cursor_execute', _record)
+        session.rollback()
+
+    assert len(mention_rows) == 10
+    assert inserts == [('mentions', True), ('stance', True)]
+
+
+def test_pull_fetches_external_content_alongside_threads() -> None:
+    settings = get_settings().model_copy(update={'enable_external_extraction': True, 'reddit_max_concurrency': 2})
+    service = IngestionService(settings=settings)
+    extracted: list[str] = []
+
+    class _FakeExtractor:
+        async def extract(self, url: str) -> ExtractionResult:
+            extracted.append(url)
+            await asyncio.sleep(0.01)
+            return ExtractionResult(title='linked', text=f'text for {url}', status='ok_trafilatura')
+
+    class _LinkedRedditClient(_FakeRedditClient):
+        async def get_top_listing(self, subreddit, sort, t_param, limit, *, after=None):
+            listing = await super().get_top_listing(subreddit, sort, t_param, limit, after=after)
+            for child in listing['data']['children']:
+                child['data']['url'] = f"https://news.example.com/{child['data']['id']}"
+            return listing
+
+    service._external_extractor = _FakeExtractor()
+    client = _LinkedRedditClient({'extp1': ['$AAPL link'], 'extp2broken': ['never stored']})
+
+    with SessionLocal() as session:
+        result = asyncio.run(
+            service._pull_with_client(session=session, subreddit='extract_sub', reddit_client=client)
+        )
+        rows = session.execute(
+            select(ExternalContent.submission_id, ExternalContent.text).where(
+                ExternalContent.submission_id.in_(['extp1', 'extp2broken'])
+            )
+        ).all()
+
+    assert result.submissions == 1
+    assert sorted(extracted) == ['https://news.example.com/extp1', 'https://news.example.com/extp2broken']
+    assert rows == [('extp1', 'text for https://news.example.com/extp1')]
+
+
+def test_pull_commits_in_batches_not_per_submission() -> None:
+    settings = get_settings().model_copy(update={'pull_commit_batch_size': 2})
+    service = IngestionService(settings=settings)
+    client = _FakeRedditClient({f'batchp{idx}': [f'$AAPL take {idx}'] for idx in range(5)})
+    commits: list[int] = []
+
+    def _record(conn):
+        commits.append(1)
+
+    event.listen(engine, 'commit', _record)
+    try:
+        with SessionLocal() as session:
+            result = asyncio.run(
+                service._pull_with_client(session=session, subreddit='batch_sub', reddit_client=client)
+            )
+    finally:
+        event.remove(engine, 'commit', _record)
+
+    assert result.submissions == 5
+    # pull run creation, two full batches, the trailing batch, then scores and status together.
+    assert len(commits) == 5
+
+
+def test_pull_runs_inference_and_downloads_outside_the_savepoint(monkeypatch) -> None:
+    service = IngestionService(settings=get_settings())
+    client = _FakeRedditClient({'outsidep1': ['$AAPL up'], 'outsidep2': ['$TSLA down']})
+    nested_during_work: list[bool] = []
+
+    with SessionLocal() as session:
+        original_analyze_batch = service._analyze_batch
+        original_download_images = service._download_images
+
+        def _analyze_batch(*args, **kwargs):
+            nested_during_work.append(session.in_nested_transaction())
+            return original_analyze_batch(*args, **kwargs)
+
+        async def _download_images(*args, **kwargs):
+            nested_during_work.append(session.in_nested_transaction())
+            return await original_download_images(*args, **kwargs)
+
+        monkeypatch.setattr(service, '_analyze_batch', _analyze_batch)
+        monkeypatch.setattr(service, '_download_images', _download_images)
+        result = asyncio.run(
+            service._pull_with_client(session=session, subreddit='outside_sub', reddit_client=client)
+        )
+
+    assert result.submissions == 2
+    assert nested_during_work == [False] * 4
+
+
+def test_pull_counts_only_committed_submissions_when_batch_commit_fails(monkeypatch) -> None:
+    settings = get_settings().model_copy(update={'pull_commit_batch_size': 10})
+    service = IngestionService(settings=settings)
+    client = _FakeRedditClient({'commitp1': ['$AAPL up'], 'commitp2': ['$TSLA down']})
+
+    with SessionLocal() as session:
+        original_commit = session.commit
+        commits: list[int] = []
+
+        def _commit() -> None:
+            commits.append(1)
+            # The first commit creates the pull run; the second is the submission batch.
+            if len(commits) == 2:
+                raise RuntimeError('database went away')
+            original_commit()
+
+        monkeypatch.setattr(session, 'commit', _commit)
+        result = asyncio.run(
+            service._pull_with_client(session=session, subreddit='commit_fail_sub', reddit_client=client)
+        )
+
+    with SessionLocal() as session:
+        stored = session.execute(
+            select(Submission.id).where(Submission.id.in_(['commitp1', 'commitp2']))
+        ).scalars().all()
+        run_status = session.execute(
+            select(PullRun.status).where(PullRun.subreddit == 'commit_fail_sub')
+        ).scalars().all()
+
+    assert result.status == 'failed'
+    assert 'database went away' in (result.error or '')
+    assert (result.submissions, result.comments, result.mentions, result.stance_rows) == (0, 0, 0, 0)
+    assert stored == []
+    assert run_status == ['failed']
+
+
+def test_pull_select_count_does_not_grow_with_comment_or_submission_count() -> None:
+    service = IngestionService(settings=get_settings())
+
+    def _count_selects(prefix: str, comments_per_post: int, posts: int = 2) -> int:
+        selects: list[str] = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+                selects.append(statement)
+
+        client = _FakeRedditClient(
+            {f'{prefix}{idx}': [f'$AAPL take {n}' for n in range(comments_per_post)] for idx in range(posts)}
+        )
+        event.listen(engine, 'before_cursor_execute', _record)
+        try:
+            with SessionLocal() as session:
+                asyncio.run(service._pull_with_client(session=session, subreddit=f'{prefix}_sub', reddit_client=client))
+        finally:
+            event.remove(engine, 'before_cursor_execute', _record)
+        return len(selects)
+
+    assert _count_selects('nplusone_small', 1) == _count_selects('nplusone_large', 8)
+    # Existing comment ids for every submission in the listing come back from one bulk SELECT.
+    assert _count_selects('nplusone_few', 2, posts=1) == _count_selects('nplusone_many', 2, posts=6)
+
+
+def test_pull_only_clears_images_for_submissions_that_have_them() -> None:
+    service = IngestionService(settings=get_settings())
+    client = _FakeRedditClient({'imgdel1': ['$AAPL calls'], 'imgdel2': ['$TSLA puts']})
+
+    def _image_deletes() -> int:
+        deletes: list[str] = []
+
+        def _record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('DELETE FROM IMAGES'):
+                deletes.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', _record)
+        try:
+            with SessionLocal() as session:
+                asyncio.run(service._pull_with_client(session=session, subreddit='imgdel_sub', reddit_client=client))
+        finally:
+            event.remove(engine, 'before_cursor_execute', _record)
+        return len(deletes)
+
+    assert _image_deletes() == 0
+
+    with SessionLocal() as session:
+        session.add(Image(submission_id='imgdel1', image_url='https://i.example.com/old.png', status='skipped'))
+        session.commit()
+
+    assert _image_deletes() == 1
+    with SessionLocal() as session:
+        assert session.execute(select(Image).where(Image.submission_id == 'imgdel1')).first() is None
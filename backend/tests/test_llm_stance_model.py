@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Callable
+
+import httpx
+import pytest
+
+from app.core.config import get_settings
+from app.services.llm_stance_model import LLMStanceModel
+
+
+def _build_model(handler: Callable[[httpx.Request], httpx.Response], **overrides: Any) -> LLMStanceModel:
+    settings = get_settings().model_copy(update={'gemini_api_key': 'test-key', 'llm_max_retries': 0, **overrides})
+    model = LLMStanceModel(settings)
+    model._client = httpx.Client(transport=httpx.MockTransport(handler))
+    return model
+
+
+def _response(text: str, prompt_tokens: int) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={
+            'candidates': [{'content': {'parts': [{'text': text}]}}],
+            'usageMetadata': {'promptTokenCount': prompt_tokens, 'candidatesTokenCount': 10, 'totalTokenCount': prompt_tokens + 10},
+        },
+    )
+
+
+def test_predict_batch_sends_chunks_and_maps_items_by_index() -> None:
+    requests: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)['contents'][0]['parts'][0]['text']
+        requests.append(prompt)
+        count = prompt.count('Kontext ')
+        items = [{'index': idx, 'label': 'BULLISH' if idx % 2 == 0 else 'BEARISH', 'confidence': 0.9} for idx in range(count)]
+        return _response(json.dumps({'items': list(reversed(items))}), prompt_tokens=100)
+
+    model = _build_model(handler, llm_batch_size=2)
+    probs = model.predict_batch([f'TEXT: ctx {idx}\nTICKER: AAPL' for idx in range(3)])
+
+    assert len(requests) == 2
+    assert [max(p, key=p.get) for p in probs] == ['bullish', 'bearish', 'bullish']
+    assert model.get_last_usage() == {'prompt_tokens': 200, 'output_tokens': 20, 'total_tokens': 220}
+
+
+def test_predict_batch_keeps_returned_items_and_rerequests_missing_ones() -> None:
+    prompts: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)['contents'][0]['parts'][0]['text']
+        prompts.append(prompt)
+        if 'Kontext 0' in prompt:
+            return _response(json.dumps({'items': [{'index': 1, 'label': 'BEARISH', 'confidence': 0.9}]}), prompt_tokens=50)
+        return _response('{"label":"BULLISH","confidence":0.8}', prompt_tokens=20)
+
+    model = _build_model(handler)
+    probs = model.predict_batch(['TEXT: a\nTICKER: AAPL', 'TEXT: b\nTICKER: TSLA', 'TEXT: c\nTICKER: MSFT'])
+
+    assert len(prompts) == 3
+    assert all('Kontext 0' not in prompt for prompt in prompts[1:])
+    assert [max(p, key=lambda label: p[label]) if p else None for p in probs] == ['bullish', 'bearish', 'bullish']
+    assert model.get_last_usage() == {'prompt_tokens': 90, 'output_tokens': 30, 'total_tokens': 120}
+
+
+def test_predict_batch_ignores_out_of_range_indices_and_reports_unanswered_items() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)['contents'][0]['parts'][0]['text']
+        if 'Kontext 0' in prompt:
+            items = [{'index': 0, 'label': 'BULLISH'}, {'index': 5, 'label': 'BEARISH'}, {'index': -1, 'label': 'BEARISH'}]
+            return _response(json.dumps({'items': items}), prompt_tokens=50)
+        return httpx.Response(400)
+
+    model = _build_model(handler)
+    probs = model.predict_batch(['TEXT: a\nTICKER: AAPL', 'TEXT: b\nTICKER: TSLA'])
+
+    assert probs[0] is not None and probs[0]['bullish'] > 0.5
+    assert probs[1] is None
+    assert model.predict_batch(['TEXT: a\nTICKER: AAPL'])[0] == probs[0]
+
+
+def test_failed_chunk_keeps_answers_from_the_other_chunks() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)['contents'][0]['parts'][0]['text']
+        if 'ctx 2' in prompt:
+            return httpx.Response(500, json={})
+        count = prompt.count('Kontext ')
+        items = [{'index': idx, 'label': 'BULLISH', 'confidence': 0.9} for idx in range(count)]
+        return _response(json.dumps({'items': items}), prompt_tokens=100)
+
+    model = _build_model(handler, llm_batch_size=2)
+    contexts = [f'TEXT: ctx {idx}\nTICKER: AAPL' for idx in range(6)]
+    probs = model.predict_batch(contexts)
+
+    assert [p is not None for p in probs] == [True, True, False, False, True, True]
+    assert model.get_last_usage() == {'prompt_tokens': 200, 'output_tokens': 20, 'total_tokens': 220}
+    assert len(model._cache) == 4
+
+
+def test_failed_single_request_keeps_cached_answers() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)['contents'][0]['parts'][0]['text']
+        if 'fails' in prompt:
+            return httpx.Response(500, json={})
+        return _response('{"label":"BEARISH","confidence":0.8}', prompt_tokens=20)
+
+    model = _build_model(handler)
+    cached = model.predict_batch(['TEXT: known\nTICKER: AAPL'])
+    probs = model.predict_batch(['TEXT: known\nTICKER: AAPL', 'TEXT: fails\nTICKER: TSLA'])
+
+    assert probs[0] == cached[0]
+    assert probs[1] is None
+
+
+def test_batch_output_tokens_are_capped_at_the_model_limit() -> None:
+    configs: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        configs.append(json.loads(request.content)['generationConfig'])
+        items = [{'index': idx, 'label': 'NEUTRAL'} for idx in range(3)]
+        return _response(json.dumps({'items': items}), prompt_tokens=10)
+
+    model = _build_model(handler, llm_batch_size=16, llm_max_output_tokens=100, llm_output_token_limit=300)
+    model.predict_batch([f'TEXT: ctx {idx}\nTICKER: AAPL' for idx in range(6)])
+
+    assert len(configs) == 2
+    assert all(config['maxOutputTokens'] == 300 for config in configs)
+
+
+def test_predict_batch_runs_chunk_requests_concurrently() -> None:
+    lock = threading.Lock()
+    state = {'in_flight': 0, 'max_in_flight': 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        with lock:
+            state['in_flight'] += 1
+            state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+        time.sleep(0.02)
+        with lock:
+            state['in_flight'] -= 1
+        return _response(json.dumps({'items': [{'index': 0, 'label': 'NEUTRAL', 'confidence': 0.8}]}), prompt_tokens=10)
+
+    model = _build_model(handler, llm_batch_size=1, llm_max_concurrency=2)
+    probs = model.predict_batch([f'TEXT: ctx {idx}\nTICKER: AAPL' for idx in range(4)])
+
+    assert len(probs) == 4
+    assert state['max_in_flight'] == 2
+    assert model.get_last_usage()['prompt_tokens'] == 40
+
+
+def test_extract_ticker_uses_trailing_ticker_line() -> None:
+    model = _build_model(lambda request: _response('{}', prompt_tokens=0))
+
+    assert model._extract_ticker('TEXT: my TICKER: GME post\nTICKER: AAPL') == 'AAPL'
+    assert model._extract_ticker('TEXT: no ticker line') == 'UNKNOWN'
+
+
+def test_generate_honors_retry_after_and_skips_hopeless_statuses(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleeps: list[float] = []
+    monkeypatch.setattr('app.services.llm_stance_model.time.sleep', sleeps.append)
+    monkeypatch.setattr('app.services.llm_stance_model.random.random', lambda: 0.0)
+    statuses = [429, 503, 200]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = statuses.pop(0)
+        if status == 429:
+            return httpx.Response(429, headers={'Retry-After': '4'})
+        if status != 200:
+            return httpx.Response(status)
+        return _response(json.dumps({'label': 'BULLISH', 'confidence': 0.9}), prompt_tokens=10)
+
+    model = _build_model(handler, llm_max_retries=2)
+    probs = model.predict('TEXT: calls\nTICKER: AAPL')
+
+    assert max(probs, key=probs.get) == 'bullish'
+    assert sleeps == [4.0, 3.0]
+
+    calls = 0
+
+    def forbidden(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(403)
+
+    model = _build_model(forbidden, llm_max_retries=2)
+    with pytest.raises(RuntimeError, match='403'):
+        model.predict('TEXT: calls\nTICKER: AAPL')
+    assert calls == 1
+
+
+def test_predictions_are_cached_per_context_until_reset() -> None:
+    batch_sizes: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)['contents'][0]['parts'][0]['text']
+        count = prompt.count('Kontext ')
+        batch_sizes.append(count)
+        if count == 0:
+            return _response(json.dumps({'label': 'BEARISH', 'confidence': 0.9}), prompt_tokens=10)
+        items = [{'index': idx, 'label': 'BULLISH', 'confidence': 0.9} for idx in range(count)]
+        return _response(json.dumps({'items': items}), prompt_tokens=100)
+
+    model = _build_model(handler)
+    this = 'TEXT: This.\nTICKER: GME'
+    other = 'TEXT: calls\nTICKER: AAPL'
+
+    first = model.predict_batch([this, other, this])
+    second = model.predict_batch([other, this])
+
+    assert batch_sizes == [2]
+    assert second == [first[1], first[0]]
+    assert model.get_last_usage() == {'prompt_tokens': 0, 'output_tokens': 0, 'total_tokens': 0}
+
+    model.reset_cache()
+    model.predict(this)
+    model.predict(this)
+
+    assert batch_sizes == [2, 0]
+
+
+def test_close_shuts_down_executor_and_http_client() -> None:
+    model = _build_model(lambda request: _response('{"items":[]}', prompt_tokens=1))
+
+    model.close()
+
+    assert model._client.is_closed
+    with pytest.raises(RuntimeError):
+        model._executor.submit(lambda: None)
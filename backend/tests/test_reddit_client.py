@@ -4,6 +4,7 @@ import asyncio
 from dataclasses import dataclass
 
 import pytest
+from asyncpraw.models import MoreComments
 
 from app.core.config import get_settings
 from app.services.reddit_client import RedditClient
@@ -118,14 +119,49 @@ def test_client_initializes_asyncpraw_and_closes(monkeypatch) -> None:
         )
     )
 
-    entered = asyncio.run(client.__aenter__())
-    assert entered is client
-    assert captured['reddit'].kwargs['client_id'] == 'demo-client'
-    assert captured['reddit'].kwargs['client_secret'] == 'demo-secret'
-    assert captured['reddit'].kwargs['user_agent'] == 'demo-agent'
+    async def _run() -> None:
+        async with client as entered:
+            assert entered is client
+        first = captured['reddit']
+        assert first.kwargs['client_id'] == 'demo-client'
+        assert first.kwargs['client_secret'] == 'demo-secret'
+        assert first.kwargs['user_agent'] == 'demo-agent'
+        assert first.closed is False
 
-    asyncio.run(client.__aexit__(None, None, None))
-    assert captured['reddit'].closed is True
+        async with client:
+            assert client._reddit is first
+
+        await client.close()
+        assert first.closed is True
+
+    asyncio.run(_run())
+
+
+def test_client_opens_a_new_session_per_event_loop(monkeypatch) -> None:
+    created = []
+
+    def _factory(**kwargs):
+        reddit = _FakeReddit(**kwargs)
+        created.append(reddit)
+        return reddit
+
+    monkeypatch.setattr('app.services.reddit_client.asyncpraw.Reddit', _factory)
+    client = RedditClient(
+        _settings(
+            reddit_client_id='demo-client',
+            reddit_client_secret='demo-secret',
+            reddit_user_agent='demo-agent',
+        )
+    )
+
+    asyncio.run(client.__aenter__())
+    asyncio.run(client.__aenter__())
+    assert len(created) == 2
+    assert client._reddit is created[1]
+
+    asyncio.run(client.close())
+    assert created[1].closed is False
+    assert client._reddit is None
 
 
 def test_get_top_listing_maps_asyncpraw_to_listing_payload(monkeypatch) -> None:
@@ -149,3 +185,148 @@ def test_get_top_listing_maps_asyncpraw_to_listing_payload(monkeypatch) -> None:
     assert page1['data']['after'] == 't3_p1'
 
     assert page2['data']['children'][0]['data']['id'] == 'p2'
+
+
+def test_response_cache_evicts_least_recently_used_listing(monkeypatch) -> None:
+    monkeypatch.setattr('app.services.reddit_client.asyncpraw.Reddit', lambda **kwargs: _FakeReddit(**kwargs))
+    client = RedditClient(
+        _settings(
+            reddit_client_id='demo-client',
+            reddit_client_secret='demo-secret',
+            reddit_user_agent='demo-agent',
+            reddit_cache_max_entries=2,
+        )
+    )
+
+    asyncio.run(client.__aenter__())
+    first = asyncio.run(client.get_top_listing('stocks', 'top', 'day', 1))
+    second = asyncio.run(client.get_top_listing('stocks', 'top', 'day', 2))
+    assert asyncio.run(client.get_top_listing('stocks', 'top', 'day', 1)) is first
+    asyncio.run(client.get_top_listing('stocks', 'top', 'day', 3))
+
+    assert asyncio.run(client.get_top_listing('stocks', 'top', 'day', 1)) is first
+    assert asyncio.run(client.get_top_listing('stocks', 'top', 'day', 2)) is not second
+    asyncio.run(client.__aexit__(None, None, None))
+
+
+@dataclass
+class _FakeComment:
+    id: str
+    body: str = 'text'
+    created_utc: float = 1_700_000_000
+    score: int = 1
+    permalink: str = '/r/stocks/comments/x/_/c'
+
+
+class _FakeInfoReddit(_FakeReddit):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.info_calls: list[int] = []
+
+    def info(self, *, fullnames):
+        self.info_calls.append(len(fullnames))
+        return _FakeAsyncIterator(_FakeComment(id=name.removeprefix('t1_')) for name in fullnames)
+
+
+def test_get_morechildren_requests_info_in_chunks_of_100_and_keeps_order(monkeypatch) -> None:
+    created = []
+
+    def _factory(**kwargs):
+        reddit = _FakeInfoReddit(**kwargs)
+        created.append(reddit)
+        return reddit
+
+    monkeypatch.setattr('app.services.reddit_client.asyncpraw.Reddit', _factory)
+    client = RedditClient(
+        _settings(
+            reddit_client_id='demo-client',
+            reddit_client_secret='demo-secret',
+            reddit_user_agent='demo-agent',
+        )
+    )
+    children = [f'c{idx}' for idx in range(250)]
+
+    asyncio.run(client.__aenter__())
+    payload = asyncio.run(client.get_morechildren('p1', children))
+    asyncio.run(client.__aexit__(None, None, None))
+
+    assert created[0].info_calls == [100, 100, 50]
+    assert [thing['data']['id'] for thing in payload['json']['data']['things']] == children
+
+
+@dataclass
+class _FakeTreeComment:
+    id: str
+    replies: list[object]
+    parent_id: str = ''
+    body: str = 'text'
+    created_utc: float = 1_700_000_000
+    score: int = 1
+    permalink: str = '/r/stocks/comments/x/_/c'
+
+
+def test_comment_forest_to_listing_keeps_order_and_depth_limit() -> None:
+    client = RedditClient(_settings())
+    forest = [
+        _FakeTreeComment(id='a', replies=[_FakeTreeComment(id='a1', replies=[_FakeTreeComment(id='a1x', replies=[])])]),
+        _FakeTreeComment(id='b', replies=[MoreComments(None, {'id': 'm1', 'parent_id': 't1_b', 'children': ['b1', 'b2']})]),
+    ]
+
+    roots = client._comment_forest_to_listing(nodes=forest, max_depth=1)
+
+    assert [node['data']['id'] for node in roots] == ['a', 'b']
+    a1 = roots[0]['data']['replies']['data']['children'][0]
+    assert a1['data']['id'] == 'a1'
+    assert a1['data']['replies'] == ''
+    more = roots[1]['data']['replies']['data']['children'][0]
+    assert more['kind'] == 'more'
+    assert more['data']['children'] == ['b1', 'b2']
+
+
+def test_comment_forest_to_listing_handles_reply_chains_past_recursion_limit() -> None:
+    client = RedditClient(_settings())
+    leaf = _FakeTreeComment(id='c5000', replies=[])
+    node = leaf
+    for idx in range(4999, -1, -1):
+        node = _FakeTreeComment(id=f'c{idx}', replies=[node])
+
+    roots = client._comment_forest_to_listing(nodes=[node], max_depth=None)
+
+    depth = 0
+    current = roots[0]
+    while current['data']['replies']['data']['children']:
+        current = current['data']['replies']['data']['children'][0]
+        depth += 1
+    assert depth == 5000
+    assert current['data']['id'] == 'c5000'
+
+
+def test_concurrent_identical_morechildren_calls_share_one_fetch(monkeypatch) -> None:
+    created = []
+
+    def _factory(**kwargs):
+        reddit = _FakeInfoReddit(**kwargs)
+        created.append(reddit)
+        return reddit
+
+    monkeypatch.setattr('app.services.reddit_client.asyncpraw.Reddit', _factory)
+    client = RedditClient(
+        _settings(
+            reddit_client_id='demo-client',
+            reddit_client_secret='demo-secret',
+            reddit_user_agent='demo-agent',
+        )
+    )
+
+    async def _run():
+        await client.__aenter__()
+        return await asyncio.gather(
+            client.get_morechildren('p1', ['c1', 'c2']),
+            client.get_morechildren('p1', ['c1', 'c2']),
+        )
+
+    first, second = asyncio.run(_run())
+
+    assert created[0].info_calls == [2]
+    assert first is second
+    assert client._inflight == {}
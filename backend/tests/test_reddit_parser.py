@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from app.services.reddit_parser import parse_morechildren, parse_thread, parse_thread_with_more
+from app.services.reddit_parser import parse_listing_posts, parse_morechildren, parse_thread, parse_thread_with_more
 
 
 def test_parse_thread_nested_replies_and_depth() -> None:
@@ -169,3 +169,70 @@ def test_parse_morechildren_resolves_depth_from_parent() -> None:
     assert comments[0].parent_id == 'c2'
     assert comments[0].depth == 2
     assert pending == []
+
+
+def test_parse_thread_handles_reply_chains_past_recursion_limit() -> None:
+    node = {'kind': 't1', 'data': {'id': 'c5000', 'parent_id': 't1_c4999', 'body': 'leaf', 'replies': ''}}
+    for idx in range(4999, -1, -1):
+        parent = 't3_post1' if idx == 0 else f't1_c{idx - 1}'
+        node = {
+            'kind': 't1',
+            'data': {
+                'id': f'c{idx}',
+                'parent_id': parent,
+                'body': 'reply',
+                'replies': {'kind': 'Listing', 'data': {'children': [node]}},
+            },
+        }
+    payload = [
+        {'kind': 'Listing', 'data': {'children': [{'kind': 't3', 'data': {'id': 'post1', 'created_utc': 1700000000}}]}},
+        {'kind': 'Listing', 'data': {'children': [node]}},
+    ]
+
+    _, comments, pending_more = parse_thread_with_more(payload)
+
+    assert len(comments) == 5001
+    assert [row.id for row in comments[:3]] == ['c0', 'c1', 'c2']
+    assert comments[-1].id == 'c5000'
+    assert comments[-1].depth == 5000
+    assert pending_more == []
+
+
+def test_parse_morechildren_resolves_siblings_without_mutating_parent_depths() -> None:
+    payload = {
+        'json': {
+            'data': {
+                'things': [
+                    {'kind': 't1', 'data': {'id': 'c3', 'parent_id': 't1_c2', 'body': 'a', 'replies': ''}},
+                    {'kind': 't1', 'data': {'id': 'c4', 'parent_id': 't1_c3', 'body': 'b', 'replies': ''}},
+                    {'kind': 'more', 'data': {'parent_id': 't1_c4', 'children': ['c5']}},
+                ]
+            }
+        }
+    }
+    parent_depths = {'c2': 1}
+
+    comments, pending = parse_morechildren(
+        payload,
+        submission_id='post1',
+        parent_depths=parent_depths,
+        fallback_parent_id='post1',
+        fallback_depth=0,
+    )
+
+    assert [(row.id, row.depth) for row in comments] == [('c3', 2), ('c4', 3)]
+    assert [(row.parent_id, row.depth, row.children) for row in pending] == [('c4', 4, ['c5'])]
+    assert parent_depths == {'c2': 1}
+
+
+def test_parsers_tolerate_malformed_listing_payloads() -> None:
+    assert parse_listing_posts({'data': None}) == []
+    assert parse_listing_posts({'data': {'children': [{'kind': 't3', 'data': None}]}}) == []
+    assert parse_thread_with_more([{'data': 'x'}, {}]) == (None, [], [])
+    assert parse_morechildren(
+        {'json': {'data': None}},
+        submission_id='post1',
+        parent_depths={},
+        fallback_parent_id='post1',
+        fallback_depth=0,
+    ) == ([], [])
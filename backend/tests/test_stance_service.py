@@ -5,8 +5,8 @@ from dataclasses import dataclass
 from app.core.config import get_settings
 from app.schemas.common import StanceLabel, TargetType
 from app.services.stance_model import StanceProbabilities
-from app.services.stance_service import StanceService
-from app.services.ticker_extractor import TickerExtractor
+from app.services.stance_service import StanceService, StanceTarget
+from app.services.ticker_extractor import ExtractedTicker, TickerExtractor
 
 
 @dataclass
@@ -24,6 +24,49 @@ class _FakeModel:
         return self.usage
 
 
+@dataclass
+class _FakeBatchModel:
+    model_version: str
+    probs: StanceProbabilities
+    batch_sizes: list[int]
+
+    def predict(self, context_text: str) -> StanceProbabilities:
+        raise AssertionError('predict_batch should be used')
+
+    def predict_batch(self, context_texts: list[str]) -> list[StanceProbabilities]:
+        self.batch_sizes.append(len(context_texts))
+        return [self.probs.copy() for _ in context_texts]
+
+
+@dataclass
+class _PartialBatchLLM:
+    model_version: str
+    probs: StanceProbabilities
+
+    def predict(self, context_text: str) -> StanceProbabilities:
+        raise AssertionError('predict_batch should be used')
+
+    def predict_batch(self, context_texts: list[str]) -> list[StanceProbabilities | None]:
+        return [self.probs.copy() if idx == 0 else None for idx in range(len(context_texts))]
+
+
+@dataclass
+class _FakeBatchLLM:
+    model_version: str
+    probs: StanceProbabilities
+    batch_sizes: list[int]
+
+    def predict(self, context_text: str) -> StanceProbabilities:
+        raise AssertionError('predict_batch should be used')
+
+    def predict_batch(self, context_texts: list[str]) -> list[StanceProbabilities]:
+        self.batch_sizes.append(len(context_texts))
+        return [self.probs.copy() for _ in context_texts]
+
+    def get_last_usage(self) -> dict[str, int]:
+        return {'prompt_tokens': 500, 'output_tokens': 40, 'total_tokens': 540}
+
+
 def _build_service(
     *,
     base_model=None,
@@ -231,3 +274,129 @@ def test_runtime_metrics_reset_clears_counters() -> None:
     assert after.llm_calls == 0
     assert after.llm_prompt_tokens == 0
     assert after.llm_estimated_cost_usd == 0.0
+
+
+def test_analyze_batch_runs_one_model_batch_for_all_targets() -> None:
+    base = _FakeBatchModel(
+        model_version='batch-v1',
+        probs={'bullish': 0.8, 'bearish': 0.1, 'neutral': 0.1},
+        batch_sizes=[],
+    )
+    service = _build_service(base_model=base)
+
+    results = service.analyze_batch(
+        [
+            StanceTarget(target_type=TargetType.comment, text='$AAPL and $TSLA calls', title='', selftext='', parent_text=''),
+            StanceTarget(target_type=TargetType.comment, text='nothing relevant', title='', selftext='', parent_text=''),
+            StanceTarget(target_type=TargetType.comment, text='buying more $MSFT', title='', selftext='', parent_text=''),
+        ]
+    )
+
+    assert base.batch_sizes == [3]
+    assert [[r.mention.ticker for r in row] for row in results] == [['AAPL', 'TSLA'], [], ['MSFT']]
+    assert all(r.label == StanceLabel.bullish for row in results for r in row)
+    assert service.get_runtime_metrics().base_model_calls == 3
+
+
+def test_llm_fallback_sends_all_unclear_mentions_in_one_batch() -> None:
+    base = _FakeModel(
+        model_version='base-v1',
+        probs={'bullish': 0.34, 'bearish': 0.33, 'neutral': 0.33},
+    )
+    llm = _FakeBatchLLM(
+        model_version='llm-v1',
+        probs={'bullish': 0.05, 'bearish': 0.9, 'neutral': 0.05},
+        batch_sizes=[],
+    )
+    service = _build_service(
+        use_llm_model=True,
+        llm_unclear_only=True,
+        llm_enable_sarcasm_trigger=False,
+        base_model=base,
+        llm_model=llm,
+    )
+
+    results = service.analyze_batch(
+        [
+            StanceTarget(target_type=TargetType.comment, text='$AAPL and $TSLA maybe', title='', selftext='', parent_text=''),
+            StanceTarget(target_type=TargetType.comment, text='$MSFT who knows', title='', selftext='', parent_text=''),
+        ]
+    )
+
+    assert llm.batch_sizes == [3]
+    assert all(r.label == StanceLabel.bearish and r.model_version == 'llm-v1' for row in results for r in row)
+    metrics = service.get_runtime_metrics()
+    assert metrics.llm_calls == 3
+    assert metrics.llm_failures == 0
+    assert metrics.llm_total_tokens == 540
+
+
+def test_label_from_probs_breaks_ties_bullish_then_bearish() -> None:
+    service = _build_service(unclear_threshold=0.0)
+    mention = ExtractedTicker(ticker='AAPL', confidence=0.9, source='cashtag', span_start=0, span_end=5)
+    text = 'long enough text to pass the short-text check'
+
+    def label_for(bullish: float, bearish: float, neutral: float) -> StanceLabel:
+        label, _ = service._label_from_probs(
+            mention=mention,
+            normalized_text=text,
+            bullish=bullish,
+            bearish=bearish,
+            neutral=neutral,
+        )
+        return label
+
+    assert label_for(0.4, 0.4, 0.2) == StanceLabel.bullish
+    assert label_for(0.2, 0.4, 0.4) == StanceLabel.bearish
+    assert label_for(0.3, 0.2, 0.5) == StanceLabel.neutral
+
+
+def test_merge_mentions_keeps_best_ranked_mention_per_ticker() -> None:
+    service = _build_service()
+    mentions = [
+        ExtractedTicker(ticker='TSLA', confidence=0.8, source='token', span_start=0, span_end=4),
+        ExtractedTicker(ticker='AAPL', confidence=0.8, source='token', span_start=10, span_end=14),
+        ExtractedTicker(ticker='AAPL', confidence=0.8, source='cashtag', span_start=20, span_end=25),
+        ExtractedTicker(ticker='AAPL', confidence=0.7, source='cashtag', span_start=30, span_end=35),
+    ]
+
+    merged = service._merge_mentions_by_ticker(mentions)
+
+    assert [(m.ticker, m.source, m.span_start) for m in merged] == [('AAPL', 'cashtag', 20), ('TSLA', 'token', 0)]
+
+
+def test_merge_mentions_keeps_first_of_equally_ranked_mentions() -> None:
+    service = _build_service()
+    mentions = [
+        ExtractedTicker(ticker='AAPL', confidence=0.8, source='token', span_start=10, span_end=14),
+        ExtractedTicker(ticker='AAPL', confidence=0.8, source='token', span_start=30, span_end=34),
+    ]
+
+    merged = service._merge_mentions_by_ticker(mentions)
+
+    assert [(m.ticker, m.span_start) for m in merged] == [('AAPL', 10)]
+
+
+def test_unanswered_llm_batch_items_keep_base_label_and_count_as_failures() -> None:
+    base = _FakeModel(
+        model_version='base-v1',
+        probs={'bullish': 0.34, 'bearish': 0.33, 'neutral': 0.33},
+    )
+    llm = _PartialBatchLLM(
+        model_version='llm-v1',
+        probs={'bullish': 0.05, 'bearish': 0.9, 'neutral': 0.05},
+    )
+    service = _build_service(
+        use_llm_model=True,
+        llm_unclear_only=True,
+        llm_enable_sarcasm_trigger=False,
+        base_model=base,
+        llm_model=llm,
+    )
+
+    [results] = service.analyze_batch(
+        [StanceTarget(target_type=TargetType.comment, text='$AAPL and $TSLA maybe', title='', selftext='', parent_text='')]
+    )
+
+    assert [(r.mention.ticker, r.model_version) for r in results] == [('AAPL', 'llm-v1'), ('TSLA', 'base-v1')]
+    assert service.get_runtime_metrics().llm_failures == 1
@@ -59,3 +59,33 @@ def test_cashtag_can_override_stoplist_when_ticker_exists(tmp_path: Path) -> Non
 
     assert all(m.ticker != 'AI' for m in plain_mentions)
     assert any(m.ticker == 'AI' and m.source == 'cashtag' for m in cashtag_mentions)
+
+
+def test_synonyms_are_matched_in_single_pass_with_word_boundaries() -> None:
+    extractor = TickerExtractor(get_settings())
+
+    mentions = extractor.extract('Google, Microsoft and NVIDIA earnings beat; googleplex is not a ticker')
+    synonym_hits = sorted((m.ticker, m.span_start) for m in mentions if m.source == 'synonym')
+
+    assert synonym_hits == [('GOOG', 0), ('MSFT', 8), ('NVDA', 22)]
+
+
+def test_overlapping_synonyms_are_all_matched(tmp_path: Path) -> None:
+    ticker_file = tmp_path / 'tickers_custom.csv'
+    ticker_file.write_text('ticker,name\nMETA,Meta\nBAC,Bank of America\nAMX,America Movil\n', encoding='utf-8')
+    synonyms_file = tmp_path / 'synonyms_custom.json'
+    synonyms_file.write_text(
+        '{"meta platforms": "FB", "meta": "META", "bank of america": "BAC", "america": "AMX"}',
+        encoding='utf-8',
+    )
+
+    settings = get_settings().model_copy(
+        update={'ticker_master_path': str(ticker_file), 'synonyms_path': str(synonyms_file)}
+    )
+    extractor = TickerExtractor(settings)
+
+    mentions = extractor.extract('Meta Platforms stock and Bank of America shares')
+    synonym_hits = sorted((m.ticker, m.span_start, m.span_end) for m in mentions if m.source == 'synonym')
+
+    # 'meta platforms' maps to a ticker outside the universe, so the shorter 'meta' at the same start still counts.
+    assert synonym_hits == [('AMX', 33, 40), ('BAC', 25, 40), ('META', 0, 4)]
@@ -253,6 +253,19 @@ export type PullStatusOverview = {
   last_success_by_subreddit: PullRunStatus[];
 };
 
+export type PullSubredditProgress = {
+  subreddit: string;
+  phase: string;
+  progress: number;
+  total_submissions: number | null;
+  processed_submissions: number;
+  submissions: number;
+  comments: number;
+  mentions: number;
+  stance_rows: number;
+  partial_errors: number;
+};
+
 export type PullJobStatus = {
   job_id: string;
   mode: string;
@@ -274,6 +287,7 @@ export type PullJobStatus = {
   current_mentions: number;
   current_stance_rows: number;
   current_partial_errors: number;
+  active_subreddits: PullSubredditProgress[];
   heartbeat_utc: string | null;
   summaries: PullSummary[];
   error: string | null;
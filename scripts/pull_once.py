@@ -10,6 +10,7 @@ sys.path.insert(0, str(BACKEND_ROOT))
 
 from app.api.deps import get_ingestion_service
 from app.core.config import get_settings
+from app.core.event_loop import configure_event_loop
 from app.db.session import SessionLocal
 
 
@@ -17,18 +18,23 @@ async def main(subreddit: str | None = None) -> None:
     settings = get_settings()
     service = get_ingestion_service()
 
-    with SessionLocal() as session:
-        if subreddit:
-            result = await service.pull_subreddit(session, subreddit=subreddit)
-            print(result)
-        else:
-            results = await service.pull_all(session)
-            for row in results:
-                print(row)
+    try:
+        with SessionLocal() as session:
+            if subreddit:
+                result = await service.pull_subreddit(session, subreddit=subreddit)
+                print(result)
+            else:
+                results = await service.pull_all(session)
+                for row in results:
+                    print(row)
+    finally:
+        await service.close()
 
 
 if __name__ == '__main__':
     arg = sys.argv[1] if len(sys.argv) > 1 else None
     if arg and arg not in get_settings().subreddits:
         raise SystemExit(f'Subreddit must be one of: {get_settings().subreddits}')
+    loop_name = configure_event_loop(get_settings())
+    print(f'event loop: {loop_name}')
     asyncio.run(main(arg))